@@ -2,18 +2,37 @@
 from __future__ import annotations
 
 import logging
+import time
 from datetime import timedelta
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
 from .const import (
     DOMAIN, PLATFORMS,
-    CONF_HOST, CONF_PORT, CONF_SLAVE_ID,
-    DEFAULT_SCAN_INTERVAL,
+    CONF_HOST, CONF_PORT, CONF_SLAVE_ID, CONF_PIPELINE_WINDOW,
+    CONF_FAST_SCAN_INTERVAL, CONF_IDLE_SCAN_INTERVAL,
+    CONF_GRID_POWER_ENTITY, CONF_CONTROL_PERIOD, DEFAULT_CONTROL_PERIOD,
+    DEFAULT_SCAN_INTERVAL, DEFAULT_PIPELINE_WINDOW,
+    DEFAULT_FAST_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL,
+    ACTIVE_STATUSES, IDLE_STATUSES, WRITE_BOOST_DURATION, CONFIG_REFRESH_CYCLES,
+    REG_MAX_CHARGING_CURRENT, METRICS_CONTEXT,
 )
-from .modbus_client import FoxESSModbusClient
+from .fleet import async_get_fleet
+from .keepalive import FoxESSKeepalive
+from .history import FoxESSHistory
+from .metrics import PollMetrics
+from .modbus_client import AsyncFoxESSModbusClient
+from .registers import (
+    TIER_LIVE, TIER_CONFIG, TIER_STATIC, TIER_KEYS, read_plan,
+)
+from .services import async_setup_services, async_unload_services
+from .sessions import FoxESSSessionTracker
+from .surplus import FoxESSSurplusController
+from .write_queue import FoxESSWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,18 +42,62 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     port      = entry.data[CONF_PORT]
     slave_id  = entry.data[CONF_SLAVE_ID]
     scan_interval = entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+    fast_interval = entry.options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+    idle_interval = entry.options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+    pipeline_window = entry.options.get(CONF_PIPELINE_WINDOW, DEFAULT_PIPELINE_WINDOW)
 
-    client      = FoxESSModbusClient(host, port, slave_id)
-    coordinator = FoxESSChargerCoordinator(hass, client, scan_interval)
+    # Entries mit gleichem host:port (RS485-Gateway) teilen eine Verbindung
+    fleet       = async_get_fleet(hass)
+    connection  = fleet.async_acquire_connection(host, port, pipeline_window)
+    client      = AsyncFoxESSModbusClient(host, port, slave_id, connection=connection)
+    coordinator = FoxESSChargerCoordinator(
+        hass, client, scan_interval, fast_interval, idle_interval,
+    )
 
-    await coordinator.async_config_entry_first_refresh()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryNotReady:
+        await fleet.async_release_connection(host, port)
+        raise
+    fleet.async_add_coordinator(coordinator, host, port)
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = {
+    # Ab hier hält der Entry Verbindung und Fleet-Platz: scheitert ein
+    # weiterer Schritt, wird wie beim Entladen aufgeräumt
+    data: dict[str, Any] = {
         "coordinator": coordinator,
         "client":      client,
+        "surplus":     None,
+        "sessions":    None,
+        "history":     None,
     }
+    try:
+        sessions = FoxESSSessionTracker(hass, coordinator, entry.entry_id)
+        await sessions.async_load()
+        sessions.async_start()
+        data["sessions"] = sessions
+
+        history = FoxESSHistory(hass, coordinator, entry.entry_id)
+        await history.async_load()
+        history.async_start()
+        data["history"] = history
+
+        # Optional: PV-Überschussregelung auf Basis eines Netzleistungs-Sensors
+        if grid_entity := entry.options.get(CONF_GRID_POWER_ENTITY):
+            data["surplus"] = FoxESSSurplusController(
+                hass, coordinator, grid_entity,
+                entry.options.get(CONF_CONTROL_PERIOD, DEFAULT_CONTROL_PERIOD),
+            )
+
+        hass.data.setdefault(DOMAIN, {})[entry.entry_id] = data
+        async_setup_services(hass)
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        if data["surplus"] is not None:
+            data["surplus"].async_start()
+    except Exception:
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        await _async_teardown(hass, entry, data)
+        raise
     entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
@@ -47,84 +110,238 @@ async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> Non
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        data = hass.data[DOMAIN].pop(entry.entry_id)
-        await hass.async_add_executor_job(data["client"].disconnect)
+        await _async_teardown(hass, entry, hass.data[DOMAIN].pop(entry.entry_id))
     return unload_ok
 
 
+async def _async_teardown(hass: HomeAssistant, entry: ConfigEntry, data: dict[str, Any]) -> None:
+    """Gibt frei, was ein Entry hält (`data` ohne noch nicht gestartete Teile)."""
+    coordinator = data["coordinator"]
+    # Regelung zuerst: danach entsteht kein Stellwert mehr, der nach dem
+    # Flush oder nach der Freigabe der Verbindung geschrieben würde
+    if data["surplus"] is not None:
+        await data["surplus"].async_stop()
+    await coordinator.write_queue.async_flush()
+    coordinator.keepalive.async_cancel()
+    if data["sessions"] is not None:
+        await data["sessions"].async_stop()
+    if data["history"] is not None:
+        await data["history"].async_stop()
+    fleet = async_get_fleet(hass)
+    fleet.async_remove_coordinator(coordinator, entry.data[CONF_HOST], entry.data[CONF_PORT])
+    await fleet.async_release_connection(entry.data[CONF_HOST], entry.data[CONF_PORT])
+    # Services gibt es genau so lange wie hass.data[DOMAIN]
+    if DOMAIN in hass.data and not hass.data[DOMAIN]:
+        del hass.data[DOMAIN]
+        async_unload_services(hass)
+
+
 class FoxESSChargerCoordinator(DataUpdateCoordinator):
-    """Coordinator: pollt alle Modbus-Register des Chargers."""
+    """
+    Coordinator: pollt alle Modbus-Register des Chargers.
+
+    Den Poll-Takt (`poll_interval`) gibt der FoxESSFleet vor, damit Charger
+    hinter einem Gateway gestaffelt abgefragt werden – daher kein
+    `update_interval` im DataUpdateCoordinator selbst.
+
+    Adaptiv: schnell während einer Sitzung (Status connected…paused) und
+    nach jedem Schreibzugriff, langsam bei Idle/Finished, sonst `scan_interval`.
 
-    def __init__(self, hass: HomeAssistant, client: FoxESSModbusClient,
-                 scan_interval: int) -> None:
+    Refresh-Tiers: Live-Register jeden Poll, Config-Register jeden
+    CONFIG_REFRESH_CYCLES-ten Poll (geschriebene Register werden gezielt
+    zurückgelesen, siehe `async_write_register`), statische Gerätedaten
+    nur beim Start. Zwischengespeicherte Werte werden in `data` übernommen.
+
+    Schreibzugriffe auf R/W Register laufen über `write_queue`
+    (debounced, zusammengefasst), W-Only Kommandos direkt über
+    `async_write_register`. Im Controlled-Modus hält `keepalive` den
+    zuletzt geschriebenen Ladestrom über `time_validity` hinaus gültig.
+
+    Change-only: Listener werden mit ihren Rohdaten-Schlüsseln als Context
+    registriert (`CoordinatorEntity(coordinator, context=...)`) und nur
+    benachrichtigt, wenn sich einer davon geändert hat. Listener ohne
+    Context sowie Wechsel der Verfügbarkeit erreichen weiterhin alle.
+    Listener mit METRICS_CONTEXT (Diagnose-Sensoren, Verlauf) laufen nach
+    jedem erfolgreichen Poll, nicht nach Schreibzugriffen.
+
+    `metrics` erfasst Dauer und Ergebnis jedes Polls, die Request-Metriken
+    der Verbindung liegen in `client.metrics`.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: AsyncFoxESSModbusClient,
+                 scan_interval: int,
+                 fast_interval: int = DEFAULT_FAST_SCAN_INTERVAL,
+                 idle_interval: int = DEFAULT_IDLE_SCAN_INTERVAL) -> None:
         self.client = client
-        super().__init__(
-            hass, _LOGGER, name=DOMAIN,
-            update_interval=timedelta(seconds=scan_interval),
-        )
+        self._scan_interval = timedelta(seconds=scan_interval)
+        self._fast_interval = timedelta(seconds=fast_interval)
+        self._idle_interval = timedelta(seconds=idle_interval)
+        self._boost_until   = 0.0
+        self.poll_interval  = self._scan_interval
+        self._cached: dict[str, int] = {}   # Config- und Static-Tier
+        self._config_age    = CONFIG_REFRESH_CYCLES   # erster Poll liest alles
+        self._notified: tuple[bool, dict] | None = None  # Stand der letzten Benachrichtigung
+        self._polled        = False   # Benachrichtigung folgt auf einen erfolgreichen Poll
+        self.metrics        = PollMetrics()
+        super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=None)
+        self.write_queue = FoxESSWriteQueue(hass, self)
+        self.keepalive   = FoxESSKeepalive(hass, self)
 
     async def _async_update_data(self) -> dict:
+        started = time.perf_counter()
         try:
-            return await self.hass.async_add_executor_job(self._fetch)
+            data = await self._fetch()
         except Exception as err:
+            self.metrics.record(time.perf_counter() - started, False)
             raise UpdateFailed(f"Modbus error: {err}") from err
+        self.metrics.record(time.perf_counter() - started, True)
+        self.poll_interval = self._adaptive_interval(data.get("status"))
+        self._polled = True
+        return data
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Nur Listener benachrichtigen, deren Schlüssel sich geändert haben."""
+        previous = self._notified
+        # Kopie: optimistische Updates der Entities ändern `data` in-place
+        self._notified = (self.last_update_success, dict(self.data or {}))
+        polled, self._polled = self._polled, False
 
-    def _fetch(self) -> dict:
+        if previous is None or previous[0] != self.last_update_success:
+            super().async_update_listeners()
+            return
+
+        changed: set[str] = set()
+        if self.last_update_success:
+            old, new = previous[1], self._notified[1]
+            changed.update(key for key in old.keys() | new.keys() if old.get(key) != new.get(key))
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                if changed:
+                    update_callback()
+            # METRICS_CONTEXT nur nach einem Poll, nicht nach async_set_key/Read-back
+            elif not changed.isdisjoint(context) or (polled and METRICS_CONTEXT in context):
+                update_callback()
+
+    def _adaptive_interval(self, status: int | None) -> timedelta:
+        if time.monotonic() < self._boost_until or status in ACTIVE_STATUSES:
+            return self._fast_interval
+        if status in IDLE_STATUSES:
+            return self._idle_interval
+        return self._scan_interval
+
+    @callback
+    def async_note_write(self) -> None:
+        """Nach einem Schreibzugriff sofort auf schnelles Polling wechseln."""
+        self._boost_until  = time.monotonic() + WRITE_BOOST_DURATION
+        self.poll_interval = self._fast_interval
+        async_get_fleet(self.hass).async_reschedule(self)
+
+    def value(self, key: str) -> int | None:
+        """Rohwert für `key`, ein noch nicht gesendeter Schreibwert hat Vorrang."""
+        pending = self.write_queue.pending_value(key)
+        if pending is not None:
+            return pending
+        return (self.data or {}).get(key)
+
+    def _store(self, key: str, value: int) -> None:
+        if key in self._cached:
+            self._cached[key] = value
+        if self.data is not None:
+            self.data[key] = value
+
+    @callback
+    def async_set_key(self, key: str, value: int) -> None:
+        """Einen einzelnen Rohwert übernehmen und nur betroffene Listener benachrichtigen."""
+        self._store(key, value)
+        self.async_update_listeners()
+
+    async def async_write_register(
+        self, address: int, value: int, data_key: str | None = None,
+    ) -> bool:
+        """
+        Schreibt ein Register sofort, ohne anschließenden Voll-Refresh.
+
+        W-Only Kommandos (ohne `data_key`): die Auswirkungen holt der
+        nächste (beschleunigte) Poll ab. R/W Register: siehe
+        `async_write_registers`.
+        """
+        if data_key is not None:
+            return await self.async_write_registers(address, [value], [data_key])
+        success = await self.client.write_holding_register(address, value)
+        self.async_note_write()
+        return success
+
+    async def async_write_registers(
+        self, address: int, values: list[int], data_keys: list[str | None],
+    ) -> bool:
+        """
+        Schreibt aufeinanderfolgende R/W Register per FC 0x10 (an den
+        reservierten Registern 0x3007–0x3009 geteilt, `data_key` None).
+
+        Danach werden nur diese Register zurückgelesen und in `data`
+        übernommen; schlägt der Read-back fehl, gilt das bereits geprüfte
+        FC 0x10 Echo.
+        """
+        success = await self.client.write_registers(address, values)
+        if success:
+            regs = await self.client.read_registers(address, len(values))
+            for offset, (key, value) in enumerate(zip(data_keys, values)):
+                if key is None:
+                    continue
+                actual = regs[offset] if regs else value
+                if actual != value:
+                    _LOGGER.warning(
+                        "Register 0x%04X: wrote %d, charger reports %d",
+                        address + offset, value, actual,
+                    )
+                self._store(key, actual)
+            self.async_update_listeners()
+            if address <= REG_MAX_CHARGING_CURRENT < address + len(values):
+                self.keepalive.async_note_setpoint(values[REG_MAX_CHARGING_CURRENT - address])
+        self.async_note_write()
+        return success
+
+    def _due_tiers(self) -> frozenset[str]:
+        tiers = {TIER_LIVE}
+        if self._config_age >= CONFIG_REFRESH_CYCLES:
+            tiers.add(TIER_CONFIG)
+        if not TIER_KEYS[TIER_STATIC] <= self._cached.keys():
+            tiers.add(TIER_STATIC)
+        return frozenset(tiers)
+
+    async def _fetch(self) -> dict:
         data: dict = {}
 
-        # ── 0x1000–0x1015: 22 Status-Register ────────────────────────────────
-        regs = self.client.read_registers(0x1000, 22)
-        if regs and len(regs) >= 22:
-            data["device_address"]  = regs[0]
-            data["software_version"]= regs[1]
-            data["stop_reason"]     = regs[2]
-            data["status"]          = regs[3]
-            data["cp_status"]       = regs[4]
-            data["cc_status"]       = regs[5]
-            data["port_temp_raw"]   = regs[6]
-            data["ambient_temp_raw"]= regs[7]
-            data["l1_voltage_raw"]  = regs[8]
-            data["l2_voltage_raw"]  = regs[9]
-            data["l3_voltage_raw"]  = regs[10]
-            data["l1_current_raw"]  = regs[11]
-            data["l2_current_raw"]  = regs[12]
-            data["l3_current_raw"]  = regs[13]
-            data["power_raw"]       = regs[14]
-            data["lock_status"]     = regs[15]
-            data["phase_sequence"]  = regs[16]
-            data["max_power_raw"]   = regs[17]
-            data["min_power_raw"]   = regs[18]
-            data["max_current_raw"] = regs[19]
-            data["min_current_raw"] = regs[20]
-            data["alarm_code"]      = regs[21]
-        else:
-            _LOGGER.warning("Could not read status registers 0x1000–0x1015")
-
-        # ── 0x1016/0x1018/0x101A/0x101C: UINT32 Register ─────────────────────
-        for key, addr in [
-            ("current_energy_raw", 0x1016),
-            ("total_energy_raw",   0x1018),
-            ("fault_code",         0x101A),
-            ("rfid_card",          0x101C),
-        ]:
-            val = self.client.read_uint32(addr)
-            if val is not None:
-                data[key] = val
-
-        # ── 0x3000–0x300B: R/W Config Register ───────────────────────────────
-        cfg = self.client.read_registers(0x3000, 12)
-        if cfg and len(cfg) >= 12:
-            data["work_mode"]                = cfg[0]
-            data["max_charging_current_raw"] = cfg[1]
-            data["max_charging_power_raw"]   = cfg[2]
-            data["allowed_charge_time"]      = cfg[3]
-            data["allowed_charge_energy"]    = cfg[4]
-            data["time_validity"]            = cfg[5]
-            data["default_current_raw"]      = cfg[6]
-            # cfg[7..9] reserviert
-            data["auto_phase_switch"]        = cfg[10]
-            data["min_switch_interval"]      = cfg[11]
-        else:
-            _LOGGER.warning("Could not read config registers 0x3000–0x300B")
+        # Normalfall nur 0x1002–0x101D; 0x3000–0x300B bzw. 0x1000–0x1001 und
+        # 0x1011–0x1014 nur wenn fällig. Bei Pipelining in einem Round Trip.
+        tiers   = self._due_tiers()
+        plan    = read_plan(tiers)
+        results = await self.client.read_blocks(
+            [(block.address, block.count) for block in plan]
+        )
+        live_missing = False
+        for block, payload in zip(plan, results):
+            if payload is not None:
+                data.update(block.decode(payload))
+            else:
+                self.metrics.skipped_blocks += 1
+                live_missing |= any(reg.tier == TIER_LIVE for reg in block.registers)
+                _LOGGER.warning(
+                    "Could not read registers 0x%04X–0x%04X",
+                    block.address, block.end - 1,
+                )
 
-        return data
+        for tier in (TIER_CONFIG, TIER_STATIC):
+            if tier in tiers:
+                self._cached.update((key, data[key]) for key in TIER_KEYS[tier] if key in data)
+        if TIER_CONFIG in tiers and TIER_KEYS[TIER_CONFIG] <= data.keys():
+            self._config_age = 0
+        self._config_age += 1
+
+        # Ohne Live-Werte ist der Poll fehlgeschlagen: der Cache allein würde
+        # Entities "unknown" statt "unavailable" zeigen und Sitzungen/Verlauf
+        # mit fehlenden Werten füttern.
+        if live_missing:
+            raise UpdateFailed("Live registers could not be read")
+        return {**self._cached, **data}
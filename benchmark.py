@@ -0,0 +1,326 @@
+"""
+Benchmark harness for FoxESS EV Charger polling.
+
+Polls N simulated chargers through `FoxESSChargerCoordinator` at a fixed
+interval and reports poll latency (p50/p99/max), requests/s, executor
+occupancy, CPU per poll and memory per charger. Transport modes:
+
+- ``per-request``      blocking client, new TCP connection per request (executor)
+- ``persistent-sync``  blocking client, persistent socket per charger (executor)
+- ``persistent``       asyncio client, one shared connection per gateway
+- ``pipelined``        like ``persistent`` with a pipeline window > 1
+
+The chargers run in `simulator.py` subprocesses (up to 247 per gateway) so
+the measured CPU time belongs to the integration only. Results are written
+as JSON for regression tracking::
+
+    python -m custom_components.foxess_charger.benchmark \\
+        --chargers 1,10,100,500 --rtt 0.005 --output bench.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from . import FoxESSChargerCoordinator
+from .modbus_client import AsyncFoxESSModbusClient, FoxESSModbusClient, ModbusTcpConnection
+from .simulator import MAX_SLAVE_ID
+
+MODES            = ("per-request", "persistent-sync", "persistent", "pipelined")
+SYNC_MODES       = {"per-request", "persistent-sync"}
+EXECUTOR_WORKERS = 64     # wie der Default-Executor von Home Assistant
+STARTUP_TIMEOUT  = 15.0   # s, bis ein Simulator-Prozess Verbindungen annimmt
+
+
+@dataclass
+class BenchResult:
+    """Eine Zeile der Ergebnisdatei: ein Modus × eine Charger-Anzahl."""
+
+    mode:               str
+    chargers:           int
+    gateways:           int
+    interval:           float
+    duration:           float
+    rtt:                float
+    polls:              int
+    failed_polls:       int
+    overruns:           int       # Polls, die ihren nächsten Slot verpasst haben
+    p50_ms:             float
+    p99_ms:             float
+    max_ms:             float
+    requests_per_s:     float
+    cpu_ms_per_poll:    float
+    executor_occupancy: float     # belegte Worker-Zeit / (Dauer × Worker)
+    executor_peak:      int       # max. gleichzeitig belegte Worker
+    memory_per_charger_kb: float
+
+
+class _Stats:
+    """Zähler, die Bench-Clients aus Event Loop und Executor-Threads erhöhen."""
+
+    def __init__(self) -> None:
+        self._lock    = threading.Lock()
+        self.requests = 0
+        self.busy     = 0.0
+        self.active   = 0
+        self.peak     = 0
+
+    def enter(self) -> None:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+
+    def leave(self, busy: float) -> None:
+        with self._lock:
+            self.active -= 1
+            self.busy   += busy
+
+
+class _BenchClient:
+    """
+    Was der Coordinator vom Client braucht (`read_blocks`), plus Zählung.
+    Blockierende Clients laufen wie früher über einen Executor.
+    """
+
+    def __init__(self, client: Any, stats: _Stats,
+                 executor: ThreadPoolExecutor | None = None) -> None:
+        self._client   = client
+        self._stats    = stats
+        self._executor = executor
+
+    async def read_blocks(self, blocks: list[tuple[int, int]]) -> list[memoryview | None]:
+        self._stats.requests += len(blocks)
+        if self._executor is None:
+            return await self._client.read_blocks(blocks)
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self._read_blocking, blocks
+        )
+
+    def _read_blocking(self, blocks: list[tuple[int, int]]) -> list[memoryview | None]:
+        self._stats.enter()
+        start = time.perf_counter()
+        try:
+            return self._client.read_blocks(blocks)
+        finally:
+            self._stats.leave(time.perf_counter() - start)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start_gateways(
+    chargers: int, rtt: float, bus_time: float,
+) -> tuple[list[tuple[int, int]], list[subprocess.Popen]]:
+    """Startet ceil(chargers / 247) Simulatoren; liefert [(port, slaves)] und Prozesse."""
+    gateways: list[tuple[int, int]] = []
+    procs:    list[subprocess.Popen] = []
+    remaining = chargers
+    while remaining > 0:
+        slaves = min(remaining, MAX_SLAVE_ID)
+        port   = _free_port()
+        procs.append(subprocess.Popen(
+            [
+                sys.executable, "-m", f"{__package__}.simulator",
+                "--port", str(port), "--slaves", f"1-{slaves}",
+                "--latency", str(rtt), "--bus-time", str(bus_time),
+            ],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        ))
+        gateways.append((port, slaves))
+        remaining -= slaves
+
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    for port, _slaves in gateways:
+        while True:
+            try:
+                _reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"simulator on port {port} did not start")
+                await asyncio.sleep(0.1)
+                continue
+            writer.close()
+            break
+    return gateways, procs
+
+
+async def run_case(
+    hass: HomeAssistant, mode: str, chargers: int, *,
+    interval: float, duration: float, rtt: float,
+    bus_time: float = 0.0, window: int = 4, workers: int = EXECUTOR_WORKERS,
+) -> BenchResult:
+    """Ein Benchmark-Lauf: Simulatoren starten, pollen, messen, aufräumen."""
+    gateways, procs = await _start_gateways(chargers, rtt, bus_time)
+    stats    = _Stats()
+    executor = ThreadPoolExecutor(workers) if mode in SYNC_MODES else None
+    connections:  list[ModbusTcpConnection] = []
+    sync_clients: list[FoxESSModbusClient] = []
+    coordinators: list[FoxESSChargerCoordinator] = []
+
+    try:
+        tracemalloc.start()
+        for port, slaves in gateways:
+            connection = None
+            if executor is None:
+                connection = ModbusTcpConnection(
+                    "127.0.0.1", port, pipeline_window=window if mode == "pipelined" else 1,
+                )
+                connections.append(connection)
+            for slave_id in range(1, slaves + 1):
+                if connection is not None:
+                    client: Any = AsyncFoxESSModbusClient(
+                        "127.0.0.1", port, slave_id, connection=connection,
+                    )
+                else:
+                    client = FoxESSModbusClient(
+                        "127.0.0.1", port, slave_id, persistent=mode == "persistent-sync",
+                    )
+                    sync_clients.append(client)
+                coordinators.append(FoxESSChargerCoordinator(
+                    hass, _BenchClient(client, stats, executor), int(interval),
+                ))
+        # Erster Poll füllt data/Cache und öffnet Verbindungen (zählt zum Speicher)
+        await asyncio.gather(*(c.async_refresh() for c in coordinators))
+        memory = tracemalloc.get_traced_memory()[0] / chargers / 1024
+        tracemalloc.stop()
+
+        stats.requests, stats.busy, stats.peak = 0, 0.0, stats.active
+        latencies: list[float] = []
+        counters = {"failed": 0, "overruns": 0}
+        loop  = asyncio.get_running_loop()
+        start = loop.time()
+        end   = start + duration
+        cpu   = time.process_time()
+
+        async def poll_loop(coordinator: FoxESSChargerCoordinator, offset: float) -> None:
+            next_at = start + offset
+            while next_at < end:
+                await asyncio.sleep(max(0.0, next_at - loop.time()))
+                began = time.perf_counter()
+                await coordinator.async_refresh()
+                latencies.append(time.perf_counter() - began)
+                if not coordinator.last_update_success:
+                    counters["failed"] += 1
+                next_at += interval
+                if next_at < loop.time():
+                    counters["overruns"] += 1
+                    next_at += interval * math.ceil((loop.time() - next_at) / interval)
+
+        # Gestaffelt wie im FoxESSFleet
+        await asyncio.gather(*(
+            poll_loop(c, interval * i / chargers) for i, c in enumerate(coordinators)
+        ))
+        elapsed = loop.time() - start
+        cpu     = time.process_time() - cpu
+    finally:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        for connection in connections:
+            await connection.close()
+        for client in sync_clients:
+            client.disconnect()
+        if executor is not None:
+            executor.shutdown(wait=True)
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+    polls = len(latencies)
+    return BenchResult(
+        mode=mode, chargers=chargers, gateways=len(gateways),
+        interval=interval, duration=round(elapsed, 3), rtt=rtt,
+        polls=polls, failed_polls=counters["failed"], overruns=counters["overruns"],
+        p50_ms=round(_percentile(latencies, 50) * 1000, 3),
+        p99_ms=round(_percentile(latencies, 99) * 1000, 3),
+        max_ms=round(max(latencies, default=0.0) * 1000, 3),
+        requests_per_s=round(stats.requests / elapsed, 1),
+        cpu_ms_per_poll=round(cpu / polls * 1000, 3) if polls else 0.0,
+        executor_occupancy=round(stats.busy / (elapsed * workers), 4) if executor else 0.0,
+        executor_peak=stats.peak,
+        memory_per_charger_kb=round(memory, 1),
+    )
+
+
+async def _main(args: argparse.Namespace) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        results = []
+        for chargers in args.chargers:
+            for mode in args.modes:
+                result = await run_case(
+                    hass, mode, chargers,
+                    interval=args.interval, duration=args.duration, rtt=args.rtt,
+                    bus_time=args.bus_time, window=args.window, workers=args.workers,
+                )
+                print(
+                    f"{mode:>16} {chargers:>4} chargers: p50 {result.p50_ms:8.2f} ms "
+                    f"p99 {result.p99_ms:8.2f} ms  {result.requests_per_s:8.1f} req/s  "
+                    f"cpu {result.cpu_ms_per_poll:6.3f} ms/poll  "
+                    f"executor {result.executor_occupancy:6.1%}  "
+                    f"{result.memory_per_charger_kb:7.1f} KiB/charger",
+                    file=sys.stderr,
+                )
+                results.append(asdict(result))
+    return {
+        "meta": {
+            "python":    platform.python_version(),
+            "platform":  platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "args":      {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="FoxESS charger polling benchmark")
+    parser.add_argument("--modes", default=",".join(MODES),
+                        type=lambda s: [m for m in s.split(",") if m in MODES])
+    parser.add_argument("--chargers", default="1,10,100",
+                        type=lambda s: [int(n) for n in s.split(",")])
+    parser.add_argument("--interval", type=float, default=10.0, help="Poll-Intervall (s)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Messdauer (s)")
+    parser.add_argument("--rtt", type=float, default=0.005, help="Simulierte RTT (s)")
+    parser.add_argument("--bus-time", type=float, default=0.0, help="RS485-Zeit pro Request (s)")
+    parser.add_argument("--window", type=int, default=4, help="Pipeline-Fenster für 'pipelined'")
+    parser.add_argument("--workers", type=int, default=EXECUTOR_WORKERS)
+    parser.add_argument("--output", help="JSON-Datei (Standard: stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(_main(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ from .__init__ import FoxESSChargerCoordinator
 @dataclass(frozen=True, kw_only=True)
 class FoxESSBinarySensorDescription(BinarySensorEntityDescription):
     value_fn: Callable[[dict], bool] = lambda _: False
+    data_keys: tuple[str, ...] = ()   # Rohdaten-Schlüssel; leer = bei jedem Update
 
 
 BINARY_SENSORS: tuple[FoxESSBinarySensorDescription, ...] = (
@@ -27,31 +28,37 @@ BINARY_SENSORS: tuple[FoxESSBinarySensorDescription, ...] = (
         key="is_charging", name="Charging",
         device_class=BinarySensorDeviceClass.BATTERY_CHARGING,
         icon="mdi:battery-charging",
+        data_keys=("status",),
         value_fn=lambda d: d.get("status") == 3,
     ),
     FoxESSBinarySensorDescription(
         key="vehicle_connected", name="Vehicle Connected",
         device_class=BinarySensorDeviceClass.PLUG, icon="mdi:power-plug",
+        data_keys=("cc_status",),
         value_fn=lambda d: d.get("cc_status") == 1,
     ),
     FoxESSBinarySensorDescription(
         key="has_fault", name="Fault",
         device_class=BinarySensorDeviceClass.PROBLEM, icon="mdi:alert-circle",
+        data_keys=("fault_code",),
         value_fn=lambda d: d.get("fault_code", 0) > 0,
     ),
     FoxESSBinarySensorDescription(
         key="has_alarm", name="Alarm",
         device_class=BinarySensorDeviceClass.PROBLEM, icon="mdi:alert",
+        data_keys=("alarm_code",),
         value_fn=lambda d: d.get("alarm_code", 0) > 0,
     ),
     FoxESSBinarySensorDescription(
         key="is_locked", name="Locked",
         device_class=BinarySensorDeviceClass.LOCK, icon="mdi:lock",
+        data_keys=("lock_status",),
         value_fn=lambda d: d.get("lock_status") == 1,
     ),
     FoxESSBinarySensorDescription(
         key="auto_phase_switch", name="Auto Phase Switch",
         icon="mdi:auto-fix",
+        data_keys=("auto_phase_switch",),
         value_fn=lambda d: d.get("auto_phase_switch") == 1,
     ),
 )
@@ -73,7 +80,8 @@ class FoxESSBinarySensor(CoordinatorEntity, BinarySensorEntity):
 
     def __init__(self, coordinator: FoxESSChargerCoordinator,
                  description: FoxESSBinarySensorDescription, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
+        # Nur bei Änderung eines der `data_keys` benachrichtigt werden
+        super().__init__(coordinator, context=frozenset(description.data_keys) or None)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = DeviceInfo(
@@ -8,10 +8,16 @@ import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry, ConfigFlow, OptionsFlow
 from homeassistant.core import callback
+from homeassistant.helpers import selector
 
 from .const import (
-    DOMAIN, CONF_HOST, CONF_PORT, CONF_SLAVE_ID,
+    DOMAIN, CONF_HOST, CONF_PORT, CONF_SLAVE_ID, CONF_PIPELINE_WINDOW,
+    CONF_FAST_SCAN_INTERVAL, CONF_IDLE_SCAN_INTERVAL, CONF_MAX_SILENCE,
+    CONF_GRID_POWER_ENTITY, CONF_CONTROL_PERIOD, DEFAULT_CONTROL_PERIOD,
     DEFAULT_PORT, DEFAULT_SLAVE_ID, DEFAULT_SCAN_INTERVAL,
+    DEFAULT_PIPELINE_WINDOW, MAX_PIPELINE_WINDOW,
+    DEFAULT_FAST_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL, DEFAULT_MAX_SILENCE,
+    MIN_SCAN_INTERVAL, MIN_FAST_SCAN_INTERVAL,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -64,18 +70,57 @@ class FoxESSChargerOptionsFlow(OptionsFlow):
     async def async_step_init(self, user_input: dict[str, Any] | None = None):
         errors: dict[str, str] = {}
         current_interval = self._entry.options.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+        current_window   = self._entry.options.get(CONF_PIPELINE_WINDOW, DEFAULT_PIPELINE_WINDOW)
+        current_fast     = self._entry.options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+        current_idle     = self._entry.options.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+        current_silence  = self._entry.options.get(CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE)
+        current_grid     = self._entry.options.get(CONF_GRID_POWER_ENTITY)
+        current_period   = self._entry.options.get(CONF_CONTROL_PERIOD, DEFAULT_CONTROL_PERIOD)
 
         if user_input is not None:
             interval = user_input.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-            if interval < 5:
+            fast     = user_input.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+            idle     = user_input.get(CONF_IDLE_SCAN_INTERVAL, DEFAULT_IDLE_SCAN_INTERVAL)
+            # Untergrenzen für alle drei Intervalle: Idle ≥ Standard ≥ 5 s
+            if interval < MIN_SCAN_INTERVAL:
                 errors["base"] = "scan_interval_too_low"
+            elif fast < MIN_FAST_SCAN_INTERVAL:
+                errors["base"] = "fast_scan_interval_too_low"
+            elif not fast <= interval <= idle:
+                errors["base"] = "scan_interval_order"
             else:
-                return self.async_create_entry(title="", data={"scan_interval": interval})
+                return self.async_create_entry(title="", data={
+                    "scan_interval":         interval,
+                    CONF_FAST_SCAN_INTERVAL: fast,
+                    CONF_IDLE_SCAN_INTERVAL: idle,
+                    CONF_PIPELINE_WINDOW:    user_input.get(CONF_PIPELINE_WINDOW, DEFAULT_PIPELINE_WINDOW),
+                    CONF_MAX_SILENCE:        user_input.get(CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE),
+                    CONF_GRID_POWER_ENTITY:  user_input.get(CONF_GRID_POWER_ENTITY),
+                    CONF_CONTROL_PERIOD:     user_input.get(CONF_CONTROL_PERIOD, DEFAULT_CONTROL_PERIOD),
+                })
 
         return self.async_show_form(
             step_id="init",
             errors=errors,
             data_schema=vol.Schema({
                 vol.Required("scan_interval", default=current_interval): int,
+                vol.Required(CONF_FAST_SCAN_INTERVAL, default=current_fast): int,
+                vol.Required(CONF_IDLE_SCAN_INTERVAL, default=current_idle): int,
+                vol.Required(CONF_PIPELINE_WINDOW, default=current_window): vol.All(
+                    int, vol.Range(min=1, max=MAX_PIPELINE_WINDOW)
+                ),
+                vol.Required(CONF_MAX_SILENCE, default=current_silence): vol.All(
+                    int, vol.Range(min=0)
+                ),
+                # Leer = keine PV-Überschussregelung
+                vol.Optional(
+                    CONF_GRID_POWER_ENTITY,
+                    description={"suggested_value": current_grid},
+                ): selector.EntitySelector(
+                    selector.EntitySelectorConfig(domain="sensor", device_class="power")
+                ),
+                vol.Required(CONF_CONTROL_PERIOD, default=current_period): vol.All(
+                    int, vol.Range(min=1, max=60)
+                ),
             }),
         )
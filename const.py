@@ -2,6 +2,7 @@
 from homeassistant.const import Platform
 
 DOMAIN = "foxess_charger"
+DATA_FLEET = f"{DOMAIN}_fleet"   # hass.data-Key des FoxESSFleet
 
 PLATFORMS = [
     Platform.SENSOR,
@@ -15,11 +16,67 @@ PLATFORMS = [
 CONF_HOST     = "host"
 CONF_PORT     = "port"
 CONF_SLAVE_ID = "slave_id"
+CONF_PIPELINE_WINDOW = "pipeline_window"
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_IDLE_SCAN_INTERVAL = "idle_scan_interval"
+CONF_MAX_SILENCE = "max_silence"
+CONF_GRID_POWER_ENTITY = "grid_power_entity"
+CONF_CONTROL_PERIOD    = "control_period"
 
 # Defaults
 DEFAULT_PORT          = 1502
 DEFAULT_SLAVE_ID      = 1
 DEFAULT_SCAN_INTERVAL = 10
+DEFAULT_PIPELINE_WINDOW = 1   # 1 = seriell, >1 = Requests pipelinen
+MAX_PIPELINE_WINDOW     = 8
+DEFAULT_FAST_SCAN_INTERVAL = 2    # s, während einer Ladesitzung
+DEFAULT_IDLE_SCAN_INTERVAL = 60   # s, Idle/Finished
+MIN_SCAN_INTERVAL          = 5    # s, Standard-Intervall (Idle ist ≥ Standard)
+MIN_FAST_SCAN_INTERVAL     = 2    # s, ein Live-Block je Poll; kürzer sättigt den RS485-Bus eines Gateways
+WRITE_BOOST_DURATION       = 60   # s schnelles Polling nach jedem Schreibzugriff
+WRITE_DEBOUNCE_DELAY       = 1.0  # s, R/W Schreibzugriffe sammeln und zusammenfassen
+TIME_VALIDITY_MARGIN       = 3    # s, Ladestrom so lange vor Ablauf von time_validity erneuern
+CONFIG_REFRESH_CYCLES      = 10   # R/W Config (0x3000–0x300B) nur jeden N-ten Poll lesen
+
+# Adaptives Polling: Status (0x1003) → Takt
+ACTIVE_STATUSES = {1, 2, 3, 4}   # connected, ready, charging, paused → schnell
+IDLE_STATUSES   = {0, 5}         # idle, finished → langsam
+
+# Deadband für Messwert-Sensoren: Änderungen unterhalb der Schwelle werden
+# nicht publiziert, spätestens nach DEFAULT_MAX_SILENCE aber doch (Heartbeat)
+DEFAULT_MAX_SILENCE   = 300    # s, 0 = Deadband aus
+DEADBAND_VOLTAGE      = 1.0    # V
+DEADBAND_CURRENT      = 0.3    # A
+DEADBAND_POWER        = 0.2    # kW
+DEADBAND_POWER_REL    = 0.02   # 2 % des zuletzt publizierten Werts
+
+# Ladesitzungen: Store-Log und Erkennung
+SESSION_STORAGE_VERSION = 1
+SESSION_SAVE_DELAY      = 10       # s, Schreibzugriffe auf den Store bündeln
+SESSION_LOG_MAX         = 10000    # älteste Sitzungen fallen aus dem Log
+SESSION_PHASE_CURRENT   = 1.0      # A, ab diesem Strom gilt eine Phase als genutzt
+
+# Messwertverlauf: Ring je Charger (Roh) und verdichtete Stufen (Binärdatei)
+HISTORY_RAW_SIZE      = 1800     # Samples, ~1 h bei 2 s Poll-Intervall
+HISTORY_MINUTE_SIZE   = 1440     # 1-min-Werte, 24 h
+HISTORY_QUARTER_SIZE  = 2976     # 15-min-Werte, 31 Tage
+HISTORY_SAVE_INTERVAL = 900      # s, Datei periodisch, beim Entladen und beim HA-Stopp schreiben
+
+# Export-Service: Zielverzeichnis (relativ zum Konfigurationsverzeichnis)
+EXPORT_DIRECTORY = "foxess_charger_exports"
+
+# Listener-Context der Diagnose-Sensoren: nach jedem Poll benachrichtigen
+METRICS_CONTEXT = "_metrics"
+
+# PV-Überschussregelung: Netzleistung (+ Bezug / − Einspeisung) → Ladestrom
+DEFAULT_CONTROL_PERIOD  = 5       # s, Regelperiode (und Mindestabstand zweier Stellwerte)
+SURPLUS_NOMINAL_VOLTAGE = 230.0   # V, falls keine plausible Spannungsmessung vorliegt
+SURPLUS_MIN_CURRENT     = 6.0     # A, Minimum nach IEC 61851
+SURPLUS_HYSTERESIS      = 1.0     # A, kleinere Änderungen werden nicht geschrieben
+SURPLUS_RAMP_UP         = 2.0     # A pro Regelperiode aufwärts, abwärts sofort
+SURPLUS_PHASE_MARGIN    = 1.0     # A Reserve pro Phase vor dem Wechsel 1 → 3 Phasen
+SURPLUS_SINGLE_PHASE    = 1       # REG_PHASE_SWITCHING-Wert für einphasig (L2)
+SURPLUS_PHASE_SETTLE    = 30      # s, so lange gilt die kommandierte Phasenzahl vor der gemeldeten
 
 # ── Read-Only Input Registers (0x1000–0x101C) ─────────────────────────────────
 REG_DEVICE_ADDRESS  = 0x1000
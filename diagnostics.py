@@ -0,0 +1,34 @@
+"""Diagnostics support for FoxESS EV Charger."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_HOST
+from .__init__ import FoxESSChargerCoordinator
+
+TO_REDACT = {CONF_HOST, "rfid_card"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry,
+) -> dict[str, Any]:
+    """Poll- und Request-Metriken für den Diagnose-Download."""
+    coordinator: FoxESSChargerCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    return {
+        "entry": {
+            "data":    async_redact_data(dict(entry.data), TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "poll_interval_s":     coordinator.poll_interval.total_seconds(),
+            "poll":                coordinator.metrics.as_dict(),
+        },
+        # Gilt für die Verbindung – bei einem Gateway für alle Slave IDs dahinter
+        "modbus": coordinator.client.metrics.as_dict(),
+        "data":   async_redact_data(coordinator.data or {}, TO_REDACT),
+    }
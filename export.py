@@ -0,0 +1,83 @@
+"""Bulk CSV export of session log and sample history for FoxESS EV Charger."""
+from __future__ import annotations
+
+import csv
+import os
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+import homeassistant.util.dt as dt_util
+
+from .const import STOP_REASON_MAP
+from .sessions import ChargingSession
+
+SESSION_HEADER = [
+    "charger", "start", "end", "energy_kwh", "charging_s",
+    "peak_kw", "phases", "rfid", "stop_reason",
+]
+
+
+def _iso(timestamp: int | None) -> str:
+    return dt_util.utc_from_timestamp(timestamp).isoformat() if timestamp is not None else ""
+
+
+def session_rows(title: str, sessions: Iterable[ChargingSession]) -> Iterator[tuple[Any, ...]]:
+    """Eine Zeile je Sitzung, Einheiten und Kodierung wie in den Sensoren."""
+    for session in sessions:
+        yield (
+            title, _iso(session.start), _iso(session.end),
+            session.energy_wh / 1000, session.charging_s, session.peak_w / 1000,
+            session.phases,
+            f"{session.rfid:08X}" if session.rfid else "",
+            STOP_REASON_MAP.get(session.stop_reason, "") if session.stop_reason is not None else "",
+        )
+
+
+def sample_rows(title: str, rows: Iterable[tuple[Any, ...]]) -> Iterator[tuple[Any, ...]]:
+    """Verlaufszeilen mit vorangestelltem Charger-Namen."""
+    for row in rows:
+        yield (title, *row)
+
+
+def _reserve(path: str) -> str:
+    """
+    Legt die Zieldatei exklusiv (leer) an, damit kein Export einen anderen
+    überschreibt – bei belegtem Namen (z.B. zwei Exporte in derselben
+    Sekunde) mit Zähler: `samples_…_2.csv`, `_3`, …
+    """
+    base, ext = os.path.splitext(path)
+    candidate, n = path, 1
+    while True:
+        try:
+            with open(candidate, "x", encoding="utf-8"):
+                return candidate
+        except FileExistsError:
+            n += 1
+            candidate = f"{base}_{n}{ext}"
+
+
+def write_csv(path: str, header: list[str], rows: Iterable[tuple[Any, ...]]) -> tuple[str, int]:
+    """
+    Schreibt die Zeilen zeilenweise (konstanter Speicher, auch für lange
+    Zeiträume) in eine temporäre Datei und benennt sie danach um. Läuft
+    im Executor; liefert den tatsächlichen Pfad und die Anzahl der
+    Datenzeilen.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    path  = _reserve(path)
+    tmp   = f"{path}.tmp"
+    count = 0
+    try:
+        with open(tmp, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(header)
+            for row in rows:
+                writer.writerow(("" if value is None else value for value in row))
+                count += 1
+        os.replace(tmp, path)
+    except BaseException:
+        for leftover in (tmp, path):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        raise
+    return path, count
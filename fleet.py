@@ -0,0 +1,159 @@
+"""Fleet layer for FoxESS EV Charger: shared gateway connections and staggered polls."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from typing import TYPE_CHECKING
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_FLEET
+from .modbus_client import ModbusTcpConnection
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Gateway:
+    """Eine host:port-Verbindung und alle Charger (Slave IDs) dahinter."""
+
+    connection: ModbusTcpConnection
+    users:      int = 0
+    members:    list[FoxESSChargerCoordinator] = field(default_factory=list)
+
+
+class FoxESSFleet:
+    """
+    Alle FoxESS Charger einer HA-Instanz.
+
+    Config Entries mit gleichem host:port teilen sich eine Verbindung (und
+    damit eine serialisierte Request-Queue). Die Polls aller Teilnehmer
+    eines Gateways werden gleichmäßig über das Scan-Intervall verteilt,
+    statt auf die gleiche Sekunde zu fallen. Alles läuft im Event Loop –
+    ein Timer pro Charger, kein Thread.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass      = hass
+        self._gateways: dict[tuple[str, int], _Gateway] = {}
+        self._timers:   dict[FoxESSChargerCoordinator, CALLBACK_TYPE] = {}
+        self._next_poll: dict[FoxESSChargerCoordinator, float] = {}
+
+    # ── Verbindungen ──────────────────────────────────────────────────────────
+
+    @callback
+    def async_acquire_connection(
+        self, host: str, port: int, pipeline_window: int,
+    ) -> ModbusTcpConnection:
+        key = (host, port)
+        gateway = self._gateways.get(key)
+        if gateway is None:
+            gateway = self._gateways[key] = _Gateway(
+                ModbusTcpConnection(host, port, pipeline_window=pipeline_window)
+            )
+        else:
+            # Ein Gateway pipelinet nur so weit wie der vorsichtigste Teilnehmer
+            gateway.connection.pipeline_window = min(
+                gateway.connection.pipeline_window, max(1, pipeline_window)
+            )
+        gateway.users += 1
+        return gateway.connection
+
+    async def async_release_connection(self, host: str, port: int) -> None:
+        key = (host, port)
+        gateway = self._gateways.get(key)
+        if gateway is None:
+            return
+        gateway.users -= 1
+        if gateway.users <= 0:
+            del self._gateways[key]
+            await gateway.connection.close()
+
+    # ── Gestaffeltes Polling ──────────────────────────────────────────────────
+
+    @callback
+    def async_add_coordinator(
+        self, coordinator: FoxESSChargerCoordinator, host: str, port: int,
+    ) -> None:
+        gateway = self._gateways[(host, port)]
+        gateway.members.append(coordinator)
+        self._stagger(gateway)
+
+    @callback
+    def async_remove_coordinator(
+        self, coordinator: FoxESSChargerCoordinator, host: str, port: int,
+    ) -> None:
+        if cancel := self._timers.pop(coordinator, None):
+            cancel()
+        self._next_poll.pop(coordinator, None)
+        gateway = self._gateways.get((host, port))
+        if gateway and coordinator in gateway.members:
+            gateway.members.remove(coordinator)
+            self._stagger(gateway)
+
+    @callback
+    def async_reschedule(self, coordinator: FoxESSChargerCoordinator) -> None:
+        """Nächsten Poll vorziehen, falls `poll_interval` kürzer geworden ist."""
+        if coordinator not in self._next_poll:
+            return
+        when = self._hass.loop.time() + coordinator.poll_interval.total_seconds()
+        if coordinator in self._timers and when < self._next_poll[coordinator]:
+            self._schedule(coordinator, when)
+
+    @callback
+    def _stagger(self, gateway: _Gateway) -> None:
+        """Verteilt die nächsten Polls der Gateway-Teilnehmer über das Intervall."""
+        now   = self._hass.loop.time()
+        count = len(gateway.members)
+        for slot, coordinator in enumerate(gateway.members):
+            interval = coordinator.poll_interval.total_seconds()
+            self._schedule(coordinator, now + interval * (slot + 1) / count)
+
+    @callback
+    def _schedule(self, coordinator: FoxESSChargerCoordinator, when: float) -> None:
+        if cancel := self._timers.pop(coordinator, None):
+            cancel()
+        self._next_poll[coordinator] = when
+        self._timers[coordinator] = async_call_later(
+            self._hass,
+            max(0.0, when - self._hass.loop.time()),
+            partial(self._async_poll, coordinator),
+        )
+
+    @callback
+    def _async_shutdown(self, _event: Event) -> None:
+        """Beim HA-Stopp keine weiteren Polls mehr starten."""
+        for cancel in self._timers.values():
+            cancel()
+        self._timers.clear()
+        self._next_poll.clear()
+
+    async def _async_poll(self, coordinator: FoxESSChargerCoordinator, _now: datetime) -> None:
+        self._timers.pop(coordinator, None)
+        await coordinator.async_refresh()
+        if coordinator not in self._next_poll:
+            return  # während des Polls entladen
+
+        # Phase halten: vom geplanten Zeitpunkt weiterzählen, nicht von jetzt
+        interval = coordinator.poll_interval.total_seconds()
+        now      = self._hass.loop.time()
+        when     = self._next_poll[coordinator] + interval
+        if when <= now:
+            _LOGGER.debug("%s: Poll länger als Intervall, Slot übersprungen", coordinator.name)
+            when += interval * ((now - when) // interval + 1)
+        self._schedule(coordinator, when)
+
+
+@callback
+def async_get_fleet(hass: HomeAssistant) -> FoxESSFleet:
+    if (fleet := hass.data.get(DATA_FLEET)) is None:
+        fleet = hass.data[DATA_FLEET] = FoxESSFleet(hass)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, fleet._async_shutdown)
+    return fleet
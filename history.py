@@ -0,0 +1,362 @@
+"""High-resolution sample history with downsampled tiers for FoxESS EV Charger."""
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    DOMAIN, METRICS_CONTEXT,
+    HISTORY_RAW_SIZE, HISTORY_MINUTE_SIZE, HISTORY_QUARTER_SIZE, HISTORY_SAVE_INTERVAL,
+)
+from .registers import REGISTER_MAP, RegisterDef
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Aufgezeichnete Rohwerte (UINT16), Skalierung beim Auslesen über REGISTER_MAP
+CHANNELS = (
+    "power_raw",
+    "l1_current_raw", "l2_current_raw", "l3_current_raw",
+    "l1_voltage_raw", "l2_voltage_raw", "l3_voltage_raw",
+)
+
+RESOLUTION_RAW     = "raw"
+RESOLUTION_MINUTE  = "1min"
+RESOLUTION_QUARTER = "15min"
+RESOLUTIONS = (RESOLUTION_RAW, RESOLUTION_MINUTE, RESOLUTION_QUARTER)
+
+_FILE_MAGIC    = b"FXH2"
+_FILE_MAGIC_V1 = b"FXH1"                # ohne offene Intervalle
+_FILE_HEADER   = struct.Struct("<4sHH")   # Magic, Kanäle, Tiers
+_TIER_HEADER   = struct.Struct("<I")      # Zeilen
+# Offenes Intervall je Tier: Beginn, Anzahl (0 = keins), Min/Max/Summe je Kanal
+_BUCKET = struct.Struct(f"<II{len(CHANNELS)}H{len(CHANNELS)}H{len(CHANNELS)}Q")
+
+
+class SampleRing:
+    """
+    Ringpuffer fester Größe mit einer typisierten `array`-Spalte pro Wert –
+    keine Objekte pro Sample. Spalte "t" (Zeitstempel) steigt monoton,
+    Zeitfenster werden per Binärsuche über die logische Reihenfolge gefunden.
+    """
+
+    def __init__(self, capacity: int, columns: dict[str, str]) -> None:
+        self.capacity = capacity
+        self.size     = 0
+        self._head    = 0   # nächste Schreibposition
+        self.columns  = {
+            name: array(code, bytes(array(code).itemsize * capacity))
+            for name, code in columns.items()
+        }
+        self._order   = tuple(self.columns.values())
+
+    def append(self, values: tuple[float, ...]) -> None:
+        """Eine Zeile in Spaltenreihenfolge; überschreibt die älteste."""
+        head = self._head
+        for column, value in zip(self._order, values):
+            column[head] = value
+        self._head = (head + 1) % self.capacity
+        self.size  = min(self.size + 1, self.capacity)
+
+    def _physical(self, index: int) -> int:
+        return (self._head - self.size + index) % self.capacity
+
+    def _view(self, name: str) -> array:
+        """Kopie der Spalte in zeitlicher Reihenfolge (älteste zuerst)."""
+        column = self.columns[name]
+        start  = (self._head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return column[start:start + self.size]
+        return column[start:] + column[:self._head]
+
+    def window(self, start: float, end: float, names: tuple[str, ...]) -> dict[str, array]:
+        """Spalten `names` für alle Zeilen mit start ≤ t < end."""
+        times = _LazyColumn(self, "t")
+        lo = bisect_left(times, start)
+        hi = bisect_left(times, end, lo)
+        return {name: self._view(name)[lo:hi] for name in ("t", *names)}
+
+    # ── Binärformat ───────────────────────────────────────────────────────────
+
+    def to_bytes(self) -> bytes:
+        """Zeilen in zeitlicher Reihenfolge, spaltenweise, little-endian."""
+        parts = [_TIER_HEADER.pack(self.size)]
+        for name in self.columns:
+            ordered = self._view(name)
+            if sys.byteorder == "big":
+                ordered.byteswap()
+            parts.append(ordered.tobytes())
+        return b"".join(parts)
+
+    def load_bytes(self, buffer: memoryview, offset: int) -> int:
+        """Gegenstück zu `to_bytes`; liefert das Ende im Puffer."""
+        (rows,) = _TIER_HEADER.unpack_from(buffer, offset)
+        offset += _TIER_HEADER.size
+        loaded: list[array] = []
+        for column in self.columns.values():
+            size = rows * column.itemsize
+            values = array(column.typecode)
+            values.frombytes(buffer[offset:offset + size])
+            if sys.byteorder == "big":
+                values.byteswap()
+            loaded.append(values)
+            offset += size
+        keep = min(rows, self.capacity)
+        for row in zip(*(values[rows - keep:] for values in loaded)):
+            self.append(row)
+        return offset
+
+
+class _LazyColumn:
+    """Sequenz-Sicht auf eine Ring-Spalte für `bisect`, ohne sie zu kopieren."""
+
+    def __init__(self, ring: SampleRing, name: str) -> None:
+        self._ring   = ring
+        self._column = ring.columns[name]
+
+    def __len__(self) -> int:
+        return self._ring.size
+
+    def __getitem__(self, index: int) -> float:
+        return self._column[self._ring._physical(index)]
+
+
+class _Bucket:
+    """Min/Max/Summe aller Samples eines Zeitintervalls."""
+
+    __slots__ = ("start", "count", "mins", "maxs", "sums")
+
+    def __init__(self, start: int, values: tuple[int, ...]) -> None:
+        self.start = start
+        self.count = 1
+        self.mins  = list(values)
+        self.maxs  = list(values)
+        self.sums  = list(values)
+
+    def add(self, values: tuple[int, ...]) -> None:
+        self.count += 1
+        for i, value in enumerate(values):
+            if value < self.mins[i]:
+                self.mins[i] = value
+            elif value > self.maxs[i]:
+                self.maxs[i] = value
+            self.sums[i] += value
+
+    def row(self) -> tuple[int, ...]:
+        avgs = [round(total / self.count) for total in self.sums]
+        return (self.start, *(v for i in range(len(avgs)) for v in (self.mins[i], self.maxs[i], avgs[i])))
+
+    @staticmethod
+    def pack(bucket: _Bucket | None) -> bytes:
+        if bucket is None:
+            return _BUCKET.pack(0, 0, *[0] * (3 * len(CHANNELS)))
+        return _BUCKET.pack(bucket.start, bucket.count, *bucket.mins, *bucket.maxs, *bucket.sums)
+
+    @classmethod
+    def unpack_from(cls, buffer: memoryview, offset: int) -> _Bucket | None:
+        start, count, *values = _BUCKET.unpack_from(buffer, offset)
+        if not count:
+            return None
+        n = len(CHANNELS)
+        bucket = cls(start, tuple(values[:n]))
+        bucket.count = count
+        bucket.maxs  = list(values[n:2 * n])
+        bucket.sums  = list(values[2 * n:])
+        return bucket
+
+
+def _tier_columns() -> dict[str, str]:
+    columns = {"t": "I"}
+    for channel in CHANNELS:
+        columns.update({f"{channel}_min": "H", f"{channel}_max": "H", f"{channel}_avg": "H"})
+    return columns
+
+
+class FoxESSHistory:
+    """
+    Verlauf der Messwerte eines Chargers außerhalb des Recorders.
+
+    - Roh: jeder Poll als Zeile im Ring (HISTORY_RAW_SIZE Samples)
+    - 1 min / 15 min: Min/Max/Mittel je Kanal, beim Wechsel des Intervalls
+      aus den Roh-Samples gebildet
+    Die beiden verdichteten Stufen werden alle HISTORY_SAVE_INTERVAL
+    Sekunden, beim Entladen und beim Beenden von HA als Binärdatei
+    (spaltenweise) gespeichert – samt der noch offenen Intervalle, die nach
+    einem Neustart weiter gefüllt oder beim nächsten Sample abgeschlossen
+    werden.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FoxESSChargerCoordinator,
+                 entry_id: str) -> None:
+        self._hass        = hass
+        self._coordinator = coordinator
+        self._path = hass.config.path(".storage", f"{DOMAIN}.history.{entry_id}.bin")
+        self.raw   = SampleRing(HISTORY_RAW_SIZE, {"t": "d", **dict.fromkeys(CHANNELS, "H")})
+        self.tiers: dict[str, tuple[int, SampleRing]] = {
+            RESOLUTION_MINUTE:  (60,  SampleRing(HISTORY_MINUTE_SIZE,  _tier_columns())),
+            RESOLUTION_QUARTER: (900, SampleRing(HISTORY_QUARTER_SIZE, _tier_columns())),
+        }
+        self._buckets: dict[str, _Bucket | None] = dict.fromkeys(self.tiers)
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._unsub_final_write: CALLBACK_TYPE | None = None
+
+    # ── Lebenszyklus ──────────────────────────────────────────────────────────
+
+    async def async_load(self) -> None:
+        await self._hass.async_add_executor_job(self._load)
+
+    @callback
+    def async_start(self) -> None:
+        # METRICS_CONTEXT: nach jedem Poll, auch wenn sich nichts geändert hat
+        self._unsubs = [
+            self._coordinator.async_add_listener(self._handle_update, frozenset({METRICS_CONTEXT})),
+            async_track_time_interval(
+                self._hass, self._async_save, timedelta(seconds=HISTORY_SAVE_INTERVAL),
+            ),
+        ]
+        # Wie Store: offene Daten vor dem Beenden von HA schreiben
+        self._unsub_final_write = self._hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_FINAL_WRITE, self._async_final_write,
+        )
+
+    async def async_stop(self) -> None:
+        while self._unsubs:
+            self._unsubs.pop()()
+        if self._unsub_final_write is not None:
+            self._unsub_final_write()
+            self._unsub_final_write = None
+        await self._async_save()
+
+    async def _async_final_write(self, _event: Event) -> None:
+        self._unsub_final_write = None
+        await self._async_save()
+
+    async def _async_save(self, _now: datetime | None = None) -> None:
+        payload = _FILE_HEADER.pack(_FILE_MAGIC, len(CHANNELS), len(self.tiers)) + b"".join(
+            ring.to_bytes() for _seconds, ring in self.tiers.values()
+        ) + b"".join(_Bucket.pack(bucket) for bucket in self._buckets.values())
+        await self._hass.async_add_executor_job(self._write, payload)
+
+    def _write(self, payload: bytes) -> None:
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        tmp = f"{self._path}.tmp"
+        with open(tmp, "wb") as file:
+            file.write(payload)
+        os.replace(tmp, self._path)
+
+    def _load(self) -> None:
+        try:
+            with open(self._path, "rb") as file:
+                buffer = memoryview(file.read())
+        except FileNotFoundError:
+            return
+        try:
+            magic, channels, tiers = _FILE_HEADER.unpack_from(buffer)
+            if (magic not in (_FILE_MAGIC, _FILE_MAGIC_V1)
+                    or channels != len(CHANNELS) or tiers != len(self.tiers)):
+                raise ValueError("unsupported layout")
+            offset = _FILE_HEADER.size
+            for _seconds, ring in self.tiers.values():
+                offset = ring.load_bytes(buffer, offset)
+            if magic == _FILE_MAGIC:
+                for name in self.tiers:
+                    self._buckets[name] = _Bucket.unpack_from(buffer, offset)
+                    offset += _BUCKET.size
+        except (struct.error, ValueError) as err:
+            _LOGGER.warning("Ignoring unreadable history file %s: %s", self._path, err)
+
+    # ── Aufzeichnung ──────────────────────────────────────────────────────────
+
+    @callback
+    def _handle_update(self) -> None:
+        data = self._coordinator.data
+        if not data or not self._coordinator.last_update_success:
+            return
+        values = tuple(data.get(channel) for channel in CHANNELS)
+        if None in values:
+            return   # fehlende Werte nicht als 0 in Min/Mittel einrechnen
+        now = dt_util.utcnow().timestamp()
+        self.raw.append((now, *values))
+
+        for name, (seconds, ring) in self.tiers.items():
+            start  = int(now // seconds * seconds)
+            bucket = self._buckets[name]
+            if bucket is not None and bucket.start == start:
+                bucket.add(values)
+                continue
+            if bucket is not None:
+                ring.append(bucket.row())
+            self._buckets[name] = _Bucket(start, values)
+
+    # ── Abfrage ───────────────────────────────────────────────────────────────
+
+    def _select(
+        self, resolution: str, start: datetime, end: datetime, channels: tuple[str, ...],
+    ) -> tuple[array, dict[str, tuple[RegisterDef, array]]]:
+        """Zeitstempel und (Register, Rohwerte) je Ausgabespalte im Fenster [start, end)."""
+        if resolution == RESOLUTION_RAW:
+            ring, names = self.raw, channels
+        else:
+            ring  = self.tiers[resolution][1]
+            names = tuple(f"{ch}_{agg}" for ch in channels for agg in ("min", "max", "avg"))
+        columns = ring.window(start.timestamp(), end.timestamp(), names)
+        times   = columns.pop("t")
+        # "power_raw" → "power", "power_raw_avg" → "power_avg"
+        return times, {
+            name.replace("_raw", ""): (
+                REGISTER_MAP[name if resolution == RESOLUTION_RAW else name.rsplit("_", 1)[0]],
+                values,
+            )
+            for name, values in columns.items()
+        }
+
+    def window(
+        self, resolution: str, start: datetime, end: datetime,
+        channels: tuple[str, ...] = CHANNELS,
+    ) -> dict[str, list[float | None]]:
+        """
+        Skalierte Werte im Zeitfenster [start, end). Roh: ein Wert je Kanal,
+        verdichtet: `<kanal>_min`, `_max`, `_avg`. Zeitstempel als ISO-UTC.
+        """
+        times, columns = self._select(resolution, start, end, channels)
+        result: dict[str, list[Any]] = {
+            "t": [dt_util.utc_from_timestamp(t).isoformat() for t in times],
+        }
+        for name, (reg, values) in columns.items():
+            result[name] = [reg.to_ha(value) for value in values]
+        return result
+
+    def rows(
+        self, resolution: str, start: datetime, end: datetime,
+        channels: tuple[str, ...] = CHANNELS,
+    ) -> tuple[list[str], Iterator[tuple[Any, ...]]]:
+        """
+        Kopfzeile und Generator über skalierte Zeilen für den Export. Die
+        Spalten werden hier (im Event Loop) als typisierte Arrays kopiert,
+        der Generator kann danach im Executor laufen.
+        """
+        times, columns = self._select(resolution, start, end, channels)
+        regs = [reg for reg, _values in columns.values()]
+
+        def generate() -> Iterator[tuple[Any, ...]]:
+            for t, *values in zip(times, *(values for _reg, values in columns.values())):
+                yield (
+                    dt_util.utc_from_timestamp(t).isoformat(),
+                    *(reg.to_ha(value) for reg, value in zip(regs, values)),
+                )
+
+        return ["time", *columns], generate()
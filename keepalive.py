@@ -0,0 +1,119 @@
+"""Time-validity keepalive for the charging current setpoint of a FoxESS EV Charger."""
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import REG_MAX_CHARGING_CURRENT, TIME_VALIDITY_MARGIN
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_WORK_MODE_CONTROLLED = 0   # WORK_MODE_MAP: 0 = Controlled
+_DEFAULT_VALIDITY     = 60  # s, falls time_validity (0x3005) noch unbekannt
+_RETRY_DELAY          = 1   # s, erster Wiederholversuch, danach verdoppelt
+
+
+class FoxESSKeepalive:
+    """
+    Hält im Controlled-Modus den zuletzt kommandierten Ladestrom gültig.
+
+    Ohne neuen Befehl innerhalb von `time_validity` (0x3005) fällt der
+    Charger auf `default_current` zurück. Jeder erfolgreich geschriebene
+    `max_charging_current` (Entity, Service, Überschussregelung) startet
+    den Timer neu; läuft er TIME_VALIDITY_MARGIN Sekunden vor Ablauf ab,
+    ohne dass inzwischen geschrieben wurde, wird der Wert erneut gesendet.
+
+    Unabhängig vom Lese-Poll und ohne Write-Boost – langsames Polling
+    bleibt langsam. Gesendet wird über die geteilte Verbindung des Clients.
+    Schlägt das Senden fehl, folgen Wiederholungen mit verdoppeltem
+    Abstand (höchstens dem regulären); gewarnt wird einmal je Ausfall.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FoxESSChargerCoordinator) -> None:
+        self._hass        = hass
+        self._coordinator = coordinator
+        self._setpoint: int | None = None   # Rohwert (0.1 A)
+        self._unsub: CALLBACK_TYPE | None = None
+        self._failures = 0        # fehlgeschlagene Keepalives in Folge
+        self._stopped  = False    # nach async_cancel nie wieder planen
+
+    def _validity(self) -> int:
+        return (self._coordinator.data or {}).get("time_validity") or _DEFAULT_VALIDITY
+
+    def renews_window(self, address: int) -> bool:
+        """
+        True, wenn ein Schreibzugriff auf `address` als Befehl zählt, der das
+        Gültigkeitsfenster erneuert – auch mit unverändertem Wert (z.B. eine
+        Automation, die nach einem HA-Neustart den Strom erneut setzt).
+        """
+        return (
+            address == REG_MAX_CHARGING_CURRENT
+            and (self._coordinator.data or {}).get("work_mode") == _WORK_MODE_CONTROLLED
+        )
+
+    @callback
+    def async_note_setpoint(self, value: int) -> None:
+        """Ein Stromsollwert wurde geschrieben – Fenster beginnt neu."""
+        self._setpoint = value
+        self._failures = 0
+        self._schedule(max(1, self._validity() - TIME_VALIDITY_MARGIN))
+
+    @callback
+    def _schedule(self, delay: float) -> None:
+        if self._stopped:
+            return
+        self._cancel_timer()
+        self._unsub = async_call_later(self._hass, delay, self._async_refresh)
+
+    @callback
+    def _cancel_timer(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_cancel(self) -> None:
+        """Endgültig beenden (Entladen) – auch ein laufender Keepalive plant nicht neu."""
+        self._stopped = True
+        self._cancel_timer()
+
+    async def _async_refresh(self, _now: datetime) -> None:
+        self._unsub = None
+        if self._setpoint is None or self._stopped or self._hass.is_stopping:
+            return
+        delay = max(1, self._validity() - TIME_VALIDITY_MARGIN)
+
+        data = self._coordinator.data or {}
+        if data.get("work_mode") == _WORK_MODE_CONTROLLED:
+            success = await self._coordinator.client.write_registers(
+                REG_MAX_CHARGING_CURRENT, [self._setpoint]
+            )
+            if self._stopped:
+                return   # während des Schreibens entladen
+            if not success:
+                self._failures += 1
+                if self._failures == 1:
+                    _LOGGER.warning(
+                        "Keepalive: could not re-send charging current %.1f A, retrying",
+                        self._setpoint * 0.1,
+                    )
+                delay = min(delay, _RETRY_DELAY * 2 ** (self._failures - 1))
+            elif self._failures:
+                _LOGGER.info(
+                    "Keepalive: re-sent charging current %.1f A after %d failed attempts",
+                    self._setpoint * 0.1, self._failures,
+                )
+                self._failures = 0
+            else:
+                _LOGGER.debug("Keepalive: re-sent charging current %.1f A", self._setpoint * 0.1)
+
+        # Zwischenzeitlicher Schreibzugriff hat bereits neu geplant
+        if self._unsub is None:
+            self._schedule(delay)
@@ -0,0 +1,198 @@
+"""Request and poll metrics for FoxESS EV Charger."""
+from __future__ import annotations
+
+import asyncio
+import math
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any
+
+SAMPLE_SIZE    = 256   # letzte N Messwerte je Reihe (Perzentile, Fehlerrate)
+_MBAP_OVERHEAD = 7     # TID, Protocol ID, Length, Unit ID vor der PDU
+
+
+def percentile(samples: deque[float] | list[float], pct: float) -> float | None:
+    """Nearest-rank Perzentil, None ohne Messwerte."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def _summary(samples: deque[float]) -> dict[str, Any]:
+    """Kennzahlen einer Zeitreihe in ms (für Diagnostics)."""
+    def ms(value: float | None) -> float | None:
+        return None if value is None else round(value * 1000, 2)
+    return {
+        "samples": len(samples),
+        "p50_ms":  ms(percentile(samples, 50)),
+        "p95_ms":  ms(percentile(samples, 95)),
+        "max_ms":  ms(max(samples, default=None)),
+    }
+
+
+@dataclass
+class _RequestStats:
+    """Zähler je Funktionscode und Registerbereich."""
+
+    requests:       int = 0
+    errors:         int = 0   # Exception-Antwort oder keine Antwort
+    bytes_sent:     int = 0
+    bytes_received: int = 0
+    exceptions: Counter[int] = field(default_factory=Counter)
+    rtt: deque[float] = field(default_factory=lambda: deque(maxlen=SAMPLE_SIZE))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests":       self.requests,
+            "errors":         self.errors,
+            "bytes_sent":     self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "exceptions":     {f"0x{code:02X}": n for code, n in sorted(self.exceptions.items())},
+            "rtt":            _summary(self.rtt),
+        }
+
+
+class ModbusMetrics:
+    """
+    Messwerte einer Modbus-TCP-Verbindung (bei RS485-Gateways für alle
+    Slave IDs dahinter gemeinsam).
+
+    Gezählt wird direkt im Request-Pfad, ohne Sperre: die asyncio-
+    Verbindung läuft im Event Loop, der blockierende Client unter seinem
+    eigenen Lock. Zeitreihen behalten die letzten SAMPLE_SIZE Werte.
+    """
+
+    def __init__(self) -> None:
+        self.connects         = 0
+        self.connect_failures = 0
+        self.retries          = 0   # Wiederholung eines Lese-Requests auf neuem Socket
+        self.timeouts         = 0
+        self.connection_errors = 0
+        self.backoff_skips    = 0   # Requests, die der offene Circuit gar nicht gesendet hat
+        self.circuit_state    = "closed"
+        self.circuit_opens    = 0
+        self.unit_circuits: dict[int, str] = {}   # Slave ID → Zustand des eigenen Breakers
+        self.connect_time: deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self.rtt:          deque[float] = deque(maxlen=SAMPLE_SIZE)
+        self._outcomes:    deque[bool]  = deque(maxlen=SAMPLE_SIZE)   # True = Fehler
+        self._requests: dict[tuple[int, int, int], _RequestStats] = {}
+
+    # ── Erfassung ─────────────────────────────────────────────────────────────
+
+    def record_connect(self, duration: float, success: bool) -> None:
+        if success:
+            self.connects += 1
+            self.connect_time.append(duration)
+        else:
+            self.connect_failures += 1
+
+    def record_circuit(self, state: str, unit: int | None = None) -> None:
+        """Zustandswechsel des Circuit Breakers der Verbindung bzw. eines Slaves."""
+        if state == "open":
+            self.circuit_opens += 1
+        if unit is None:
+            self.circuit_state = state
+        else:
+            self.unit_circuits[unit] = state
+
+    def record_failure(self, error: BaseException) -> None:
+        """Ein Versuch ist am Socket gescheitert (Timeout, Reset, Framing)."""
+        if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+            self.timeouts += 1
+        else:
+            self.connection_errors += 1
+
+    def record_request(self, pdu: bytes, response: bytes | None, rtt: float | None) -> None:
+        """Ein Request mit Antwort-ADU (None = keine Antwort) und Round-Trip-Zeit."""
+        stats = self._stats(pdu)
+        stats.requests += 1
+        failed = True
+        if response is not None:
+            stats.bytes_sent     += _MBAP_OVERHEAD + len(pdu)
+            stats.bytes_received += len(response)
+            if len(response) >= 9 and response[7] & 0x80:
+                stats.exceptions[response[8]] += 1
+            else:
+                failed = False
+        if rtt is not None:
+            stats.rtt.append(rtt)
+            self.rtt.append(rtt)
+        if failed:
+            stats.errors += 1
+        self._outcomes.append(failed)
+
+    def _stats(self, pdu: bytes) -> _RequestStats:
+        # Schlüssel: (FC, Startadresse, Anzahl) – FC 0x06 schreibt immer 1 Register
+        fc      = pdu[0]
+        address = int.from_bytes(pdu[1:3], "big")
+        count   = int.from_bytes(pdu[3:5], "big") if fc != 0x06 else 1
+        key     = (fc, address, count)
+        stats   = self._requests.get(key)
+        if stats is None:
+            stats = self._requests[key] = _RequestStats()
+        return stats
+
+    # ── Auswertung ────────────────────────────────────────────────────────────
+
+    @property
+    def rtt_p95(self) -> float | None:
+        return percentile(self.rtt, 95)
+
+    @property
+    def error_rate(self) -> float | None:
+        """Anteil fehlgeschlagener Requests unter den letzten SAMPLE_SIZE."""
+        if not self._outcomes:
+            return None
+        return sum(self._outcomes) / len(self._outcomes)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "connects":          self.connects,
+            "connect_failures":  self.connect_failures,
+            "connect_time":      _summary(self.connect_time),
+            "retries":           self.retries,
+            "timeouts":          self.timeouts,
+            "connection_errors": self.connection_errors,
+            "backoff_skips":     self.backoff_skips,
+            "circuit_state":     self.circuit_state,
+            "circuit_opens":     self.circuit_opens,
+            "unit_circuits": {
+                str(unit): state for unit, state in sorted(self.unit_circuits.items())
+            },
+            "error_rate":        self.error_rate,
+            "rtt":               _summary(self.rtt),
+            "requests": {
+                f"FC{fc:02X} 0x{address:04X}+{count}": stats.as_dict()
+                for (fc, address, count), stats in sorted(self._requests.items())
+            },
+        }
+
+
+class PollMetrics:
+    """Dauer und Ergebnis der Coordinator-Polls eines Chargers."""
+
+    def __init__(self) -> None:
+        self.polls          = 0
+        self.failures       = 0
+        self.skipped_blocks = 0   # Blöcke ohne gültige Antwort (Werte aus dem Vorpoll fehlen)
+        self.last_duration: float | None = None
+        self.duration: deque[float] = deque(maxlen=SAMPLE_SIZE)
+
+    def record(self, duration: float, success: bool) -> None:
+        self.polls += 1
+        if not success:
+            self.failures += 1
+        self.last_duration = duration
+        self.duration.append(duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "polls":          self.polls,
+            "failures":       self.failures,
+            "skipped_blocks": self.skipped_blocks,
+            "last_duration_ms": (
+                None if self.last_duration is None else round(self.last_duration * 1000, 2)
+            ),
+            "duration":       _summary(self.duration),
+        }
@@ -1,8 +1,17 @@
 """Modbus TCP client for FoxESS EV Charger."""
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
 import socket
+import struct
+import threading
+import time
+
+from .const import REG_DEVICE_ADDRESS
+from .metrics import ModbusMetrics
+from .registers import WRITE_ONLY_REGISTERS, contiguous_runs   # FC 0x06 (0x4000–0x4003)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -11,12 +20,183 @@ FC_READ_HOLDING     = 0x03   # Lesen R/W und R-Only Register
 FC_WRITE_SINGLE     = 0x06   # Schreiben W-Only Register  (0x4000–0x4003)
 FC_WRITE_MULTIPLE   = 0x10   # Schreiben R/W Register     (0x3000–0x300B)
 
-# ── W-Only Register Adressen (FC 0x06) ───────────────────────────────────────
-WRITE_ONLY_REGISTERS = {0x4000, 0x4001, 0x4002, 0x4003}
+# ── Reservierte Register im R/W Block (werden nie geschrieben) ───────────────
+RESERVED_REGISTERS = {0x3007, 0x3008, 0x3009}
+
+# ── Persistente Verbindung ────────────────────────────────────────────────────
+CONNECT_TIMEOUT       = 2.0    # s, TCP-Verbindungsaufbau (im LAN wenige ms)
+READ_TIMEOUT          = 3.0    # s, Antwort auf einen Request
+READ_RETRIES          = 1      # weitere Versuche, nur für Lese-Requests (idempotent)
+CIRCUIT_FAILURE_THRESHOLD = 3  # aufeinanderfolgende Fehlschläge bis der Breaker öffnet
+SILENT_TIMEOUTS_CLOSE = 3      # Timeouts in Folge ohne jede Antwort auf dem Socket → neu verbinden
+RECONNECT_BACKOFF_MIN = 1.0    # s, erste Wartezeit im offenen Zustand
+RECONNECT_BACKOFF_MAX = 60.0   # s, Obergrenze des exponentiellen Backoffs
+BACKOFF_JITTER        = 0.5    # Wartezeit zufällig zwischen 50 und 100 %
+PIPELINE_FALLBACK_AFTER   = 3    # Pipelining scheitert, seriell klappt: so oft in Folge
+PIPELINE_REPROBE_INTERVAL = 600  # s seriell, danach wird das Fenster erneut probiert
+IDLE_RECONNECT_AFTER  = 50.0   # s, embedded Stack schließt Leerlauf-Sockets ~60 s
+IDLE_HEARTBEAT_AFTER  = 40.0   # s Leerlauf (async): 1-Register-Read hält den Socket offen
+KEEPALIVE_IDLE        = 20     # s, TCP Keepalive: erste Probe nach Leerlauf
+KEEPALIVE_INTERVAL    = 5      # s, TCP Keepalive: Abstand der Proben
+KEEPALIVE_COUNT       = 3      # Proben bis Verbindung als tot gilt
+
+# ── MBAP Framing ──────────────────────────────────────────────────────────────
+MBAP_HEADER       = struct.Struct(">HHHB")   # TID, Protocol ID, Length, Unit ID
+MBAP_HEADER_LEN   = MBAP_HEADER.size         # 7 Bytes
+MBAP_MAX_LENGTH   = 254                      # Unit ID + max. PDU (253 Bytes)
+STALE_TID_WINDOW  = 64                       # ältere TIDs = verspätete Antworten
+
+
+class ModbusFrameError(ConnectionError):
+    """Antwort passt nicht zum Request – der Stream ist nicht mehr synchron."""
+
+
+def _configure_socket(sock: socket.socket) -> None:
+    """Setzt TCP_NODELAY und TCP Keepalive auf einem verbundenen Socket."""
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    # Linux/macOS-spezifische Optionen, falls vorhanden
+    for opt, val in (
+        ("TCP_KEEPIDLE",  KEEPALIVE_IDLE),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL),
+        ("TCP_KEEPCNT",   KEEPALIVE_COUNT),
+    ):
+        if hasattr(socket, opt):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), val)
+
+
+def _backoff_delay(opens: int) -> float:
+    # Jitter: Breaker mehrerer Hosts (z.B. nach Stromausfall) proben nicht im Gleichtakt
+    delay = min(RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_MIN * 2 ** (opens - 1))
+    return delay * random.uniform(1 - BACKOFF_JITTER, 1.0)
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker für eine Verbindung (host:port) oder einen Slave dahinter.
+
+    - closed: Requests laufen normal, Fehlschläge werden gezählt
+    - open: nach CIRCUIT_FAILURE_THRESHOLD Fehlschlägen in Folge scheitern
+      Requests sofort, ohne Socket und ohne Timeout
+    - half_open: nach Ablauf des Backoffs (exponentiell mit Jitter) darf
+      genau ein Request als Probe durch; Erfolg schließt den Breaker,
+      ein Fehlschlag öffnet ihn mit doppelter Wartezeit erneut
+
+    Nicht thread-safe: Aufrufer halten die Sperre ihrer Verbindung, die
+    Probe ist damit automatisch der einzige Request im Zustand half_open.
+    """
+
+    CLOSED    = "closed"
+    OPEN      = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, metrics: ModbusMetrics,
+                 threshold: int = CIRCUIT_FAILURE_THRESHOLD, unit: int | None = None) -> None:
+        self.state     = self.CLOSED
+        self.failures  = 0      # aufeinanderfolgende Fehlschläge
+        self.retry_at  = 0.0    # monotonic, Ende des Backoffs
+        self.unit      = unit   # None = ganze Verbindung
+        self._opens    = 0      # Öffnungen seit dem letzten Erfolg (Backoff-Exponent)
+        self._threshold = threshold
+        self._metrics  = metrics
+        metrics.record_circuit(self.state, unit)
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            self._metrics.record_circuit(state, self.unit)
+
+    def allow(self, now: float) -> bool:
+        """False = Request gar nicht erst senden."""
+        if self.state == self.OPEN:
+            if now < self.retry_at:
+                return False
+            self._set_state(self.HALF_OPEN)
+        return True
+
+    def record_success(self) -> bool:
+        """True, wenn der Breaker damit wieder schließt."""
+        recovered = self.state != self.CLOSED
+        self.failures = 0
+        self._opens   = 0
+        self._set_state(self.CLOSED)
+        return recovered
+
+    def record_failure(self, now: float) -> float | None:
+        """Wartezeit in s, falls der Breaker (erneut) öffnet, sonst None."""
+        self.failures += 1
+        if self.state != self.HALF_OPEN and self.failures < self._threshold:
+            return None
+        self._opens  += 1
+        delay         = _backoff_delay(self._opens)
+        self.retry_at = now + delay
+        self._set_state(self.OPEN)
+        return delay
+
+    def reset(self) -> None:
+        self.record_success()
+        self.retry_at = 0.0
+
+
+def _log_failure(host: str, port: int, breaker: CircuitBreaker,
+                 error: BaseException | None, delay: float | None) -> None:
+    reason = (str(error) or type(error).__name__) if error is not None else "?"
+    target = f"{host}:{port}" if breaker.unit is None else f"{host}:{port} unit {breaker.unit}"
+    kind   = "Verbindungsfehler" if breaker.unit is None else "keine Antwort"
+    if delay is None:
+        _LOGGER.warning(
+            "Modbus TCP %s – %s: %s (%d/%d)",
+            target, kind, reason, breaker.failures, CIRCUIT_FAILURE_THRESHOLD,
+        )
+    else:
+        _LOGGER.error(
+            "Modbus TCP %s – %s: %s (Circuit offen, nächster Versuch in %.0f s)",
+            target, kind, reason, delay,
+        )
+
+
+def _is_idempotent(pdu: bytes) -> bool:
+    # Nur Lesen darf wiederholt werden – ein Schreibbefehl könnte doppelt ankommen
+    return pdu[0] == FC_READ_HOLDING
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    """Liest genau `size` Bytes (TCP liefert beliebig gestückelt)."""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("connection closed by peer")
+        buf += chunk
+    return bytes(buf)
+
+
+def _build_adu(tid: int, unit: int, pdu: bytes) -> bytes:
+    """Baut den vollständigen Modbus TCP ADU (MBAP + PDU)."""
+    return MBAP_HEADER.pack(tid, 0, 1 + len(pdu), unit) + pdu
+
+
+def _parse_header(header: bytes) -> tuple[int, int, int]:
+    """Prüft den MBAP-Header, gibt (TID, Unit ID, Länge des Rests) zurück."""
+    tid, protocol, length, unit = MBAP_HEADER.unpack(header)
+    if protocol != 0:
+        raise ModbusFrameError(f"unexpected protocol id {protocol}")
+    if not 2 <= length <= MBAP_MAX_LENGTH:
+        raise ModbusFrameError(f"invalid MBAP length {length}")
+    return tid, unit, length - 1
+
+
+# Heartbeat: Geräteadresse (0x1000) lesen – ein Register, jede Firmware
+_HEARTBEAT_PDU = struct.pack(">BHH", FC_READ_HOLDING, REG_DEVICE_ADDRESS, 1)
+
 
+def _is_stale(tid: int, expected: int) -> bool:
+    """Antwort auf einen früheren (abgelaufenen) Request?"""
+    return 0 < (expected - tid) % 0xFFFF <= STALE_TID_WINDOW
 
-class FoxESSModbusClient:
-    """Minimal Modbus TCP client (raw sockets, kein pymodbus)."""
+
+class _FoxESSModbusProtocol:
+    """Gemeinsamer PDU-Aufbau und Antwort-Auswertung für Sync- und Async-Client."""
 
     def __init__(self, host: str, port: int, slave_id: int) -> None:
         self._host      = host
@@ -24,43 +204,60 @@ class FoxESSModbusClient:
         self._slave_id  = slave_id
         self._tid       = 0
 
-    # ── Interne Hilfsmethoden ─────────────────────────────────────────────────
-
     def _next_tid(self) -> int:
         self._tid = (self._tid + 1) % 0xFFFF
         return self._tid
 
-    def _send_recv(self, request: bytes, timeout: float = 5.0) -> bytes | None:
-        try:
-            with socket.create_connection((self._host, self._port), timeout=timeout) as sock:
-                sock.sendall(request)
-                return sock.recv(1024)
-        except Exception as ex:
-            _LOGGER.error("Modbus TCP %s:%s – Verbindungsfehler: %s", self._host, self._port, ex)
-            return None
-
     def _build_mbap(self, pdu: bytes) -> bytes:
         """Baut den vollständigen Modbus TCP ADU (MBAP + PDU)."""
-        tid     = self._next_tid()
-        length  = 1 + len(pdu)   # Unit ID (1) + PDU
-        return (
-            tid.to_bytes(2, "big")              +  # Transaction ID
-            (0).to_bytes(2, "big")              +  # Protocol ID
-            length.to_bytes(2, "big")           +  # Length
-            self._slave_id.to_bytes(1, "big")   +  # Unit ID
-            pdu
-        )
+        return _build_adu(self._next_tid(), self._slave_id, pdu)
 
-    # ── Öffentliche Methoden ──────────────────────────────────────────────────
+    # ── MBAP Framing ──────────────────────────────────────────────────────────
 
-    def read_registers(self, address: int, count: int) -> list[int] | None:
-        """Liest `count` Holding-Register ab `address` (FC 0x03)."""
-        pdu = (
+    def _parse_header(self, header: bytes) -> tuple[int, int]:
+        """Prüft den MBAP-Header, gibt (TID, Länge des Rests) zurück."""
+        tid, unit, size = _parse_header(header)
+        if unit != self._slave_id:
+            raise ModbusFrameError(f"unit id {unit} != {self._slave_id}")
+        return tid, size
+
+    def _accept_frame(self, tid: int, expected: int) -> bool:
+        """True = Antwort gehört zum Request, False = veraltet, verwerfen."""
+        if tid == expected:
+            return True
+        if _is_stale(tid, expected):
+            _LOGGER.debug(
+                "Modbus TCP %s:%s – verspätete Antwort TID %d verworfen (erwartet %d)",
+                self._host, self._port, tid, expected,
+            )
+            return False
+        raise ModbusFrameError(f"transaction id {tid} != {expected}")
+
+    # ── FC 0x03 ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _read_pdu(address: int, count: int) -> bytes:
+        return (
             FC_READ_HOLDING.to_bytes(1, "big") +
             address.to_bytes(2, "big")         +
             count.to_bytes(2, "big")
         )
-        response = self._send_recv(self._build_mbap(pdu))
+
+    def _read_request(self, address: int, count: int) -> bytes:
+        return self._build_mbap(self._read_pdu(address, count))
+
+    @classmethod
+    def _parse_read(cls, response: bytes | None, address: int, count: int) -> list[int] | None:
+        payload = cls._read_payload(response, address, count)
+        if payload is None:
+            return None
+        registers = list(struct.unpack_from(f">{count}H", payload))
+        _LOGGER.debug("FC03 Read 0x%04X count=%d → %s", address, count, registers)
+        return registers
+
+    @staticmethod
+    def _read_payload(response: bytes | None, address: int, count: int) -> memoryview | None:
+        """Prüft eine FC03-Antwort und liefert die Registerbytes ohne Kopie."""
         if response is None:
             return None
 
@@ -69,95 +266,641 @@ class FoxESSModbusClient:
             _LOGGER.error("Modbus FC03 Exception 0x%02X @ 0x%04X", response[8], address)
             return None
 
-        if len(response) < 9:
-            _LOGGER.warning("FC03: zu kurze Antwort (%d Bytes)", len(response))
+        if len(response) < 9 or response[7] != FC_READ_HOLDING:
+            _LOGGER.warning("FC03: ungültige Antwort (%d Bytes): %s", len(response), response.hex())
             return None
 
         byte_count = response[8]
-        payload    = response[9: 9 + byte_count]
-        registers  = [int.from_bytes(payload[i:i+2], "big") for i in range(0, byte_count, 2)]
-        _LOGGER.debug("FC03 Read 0x%04X count=%d → %s", address, count, registers)
-        return registers
+        payload    = memoryview(response)[9: 9 + byte_count]
+        if byte_count != 2 * count or len(payload) != byte_count:
+            _LOGGER.warning(
+                "FC03 @ 0x%04X: %d Bytes erwartet, %d/%d erhalten",
+                address, 2 * count, byte_count, len(payload),
+            )
+            return None
+        return payload
 
-    def read_uint32(self, address: int) -> int | None:
-        """Liest einen UINT32-Wert aus zwei aufeinanderfolgenden Registern."""
-        regs = self.read_registers(address, 2)
+    @staticmethod
+    def _to_uint32(regs: list[int] | None) -> int | None:
         if regs and len(regs) >= 2:
             return (regs[0] << 16) | regs[1]
         return None
 
-    def write_holding_register(self, address: int, value: int) -> bool:
+    # ── FC 0x06 / FC 0x10 ─────────────────────────────────────────────────────
+
+    @staticmethod
+    def _write_pdu(address: int, value: int) -> tuple[int, bytes]:
         """
-        Schreibt ein einzelnes Register.
+        Baut die Schreib-PDU für ein einzelnes Register.
 
         R/W Register (0x3000–0x300B) → FC 0x10 (Write Multiple Registers)
         W-Only Register (0x4000–0x4003) → FC 0x06 (Write Single Register)
         """
         if address in WRITE_ONLY_REGISTERS:
-            return self._write_single(address, value)
-        else:
-            return self._write_multiple(address, value)
+            pdu = (
+                FC_WRITE_SINGLE.to_bytes(1, "big") +
+                address.to_bytes(2, "big")         +
+                value.to_bytes(2, "big")
+            )
+            return FC_WRITE_SINGLE, pdu
 
-    # ── Private Write-Methoden ────────────────────────────────────────────────
+        return FC_WRITE_MULTIPLE, _FoxESSModbusProtocol._write_multiple_pdu(address, [value])
 
-    def _write_single(self, address: int, value: int) -> bool:
-        """FC 0x06 – Write Single Register (W-Only Register 0x4000–0x4003)."""
-        pdu = (
-            FC_WRITE_SINGLE.to_bytes(1, "big") +
-            address.to_bytes(2, "big")         +
-            value.to_bytes(2, "big")
+    @staticmethod
+    def _write_multiple_pdu(address: int, values: list[int]) -> bytes:
+        """FC 0x10 PDU für `len(values)` aufeinanderfolgende Register ab `address`."""
+        return (
+            FC_WRITE_MULTIPLE.to_bytes(1, "big") +
+            address.to_bytes(2, "big")           +
+            len(values).to_bytes(2, "big")       +  # Quantity
+            (2 * len(values)).to_bytes(1, "big") +  # ByteCount
+            b"".join(value.to_bytes(2, "big") for value in values)
+        )
+
+    @staticmethod
+    def _write_runs(address: int, values: list[int]) -> list[tuple[int, list[int]]]:
+        """
+        Teilt einen Schreibbereich an reservierten Registern (0x3007–0x3009):
+        jeder lückenlose Teil wird ein eigener FC 0x10 Request, die Werte
+        für reservierte Adressen werden nicht gesendet.
+        """
+        runs = contiguous_runs(
+            reg for reg in range(address, address + len(values)) if reg not in RESERVED_REGISTERS
         )
-        response = self._send_recv(self._build_mbap(pdu))
+        return [(run[0], [values[reg - address] for reg in run]) for run in runs]
+
+    def _write_request(self, address: int, value: int) -> tuple[int, bytes]:
+        fc, pdu = self._write_pdu(address, value)
+        return fc, self._build_mbap(pdu)
+
+    @staticmethod
+    def _parse_write(
+        fc: int, response: bytes | None, address: int,
+        value: int | list[int], quantity: int = 1,
+    ) -> bool:
+        name = "FC06" if fc == FC_WRITE_SINGLE else "FC10"
         if response is None:
             return False
 
-        if len(response) >= 9 and response[7] == (FC_WRITE_SINGLE | 0x80):
+        if len(response) >= 9 and response[7] == (fc | 0x80):
             _LOGGER.error(
-                "FC06 Exception 0x%02X @ 0x%04X value=%d",
-                response[8], address, value,
+                "%s Exception 0x%02X @ 0x%04X value=%s",
+                name, response[8], address, value,
             )
             return False
 
-        success = len(response) >= 12
+        # Echo muss Funktionscode und Startadresse (FC 0x10: auch Anzahl) enthalten
+        success = (
+            len(response) >= 12
+            and response[7] == fc
+            and response[8:10] == address.to_bytes(2, "big")
+            and (fc != FC_WRITE_MULTIPLE or response[10:12] == quantity.to_bytes(2, "big"))
+        )
         if success:
-            _LOGGER.debug("FC06 Write 0x%04X = %d ✓", address, value)
+            _LOGGER.debug("%s Write 0x%04X = %s ✓", name, address, value)
         else:
             _LOGGER.warning(
-                "FC06 Write 0x%04X = %d: unerwartete Antwort (%d Bytes): %s",
-                address, value, len(response), response.hex(),
+                "%s Write 0x%04X = %s: unerwartete Antwort (%d Bytes): %s",
+                name, address, value, len(response), response.hex(),
             )
         return success
 
-    def _write_multiple(self, address: int, value: int) -> bool:
-        """FC 0x10 – Write Multiple Registers (R/W Register 0x3000–0x300B)."""
-        pdu = (
-            FC_WRITE_MULTIPLE.to_bytes(1, "big") +
-            address.to_bytes(2, "big")           +
-            (1).to_bytes(2, "big")               +  # Quantity = 1 Register
-            (2).to_bytes(1, "big")               +  # ByteCount = 2
-            value.to_bytes(2, "big")
+
+class FoxESSModbusClient(_FoxESSModbusProtocol):
+    """Minimal Modbus TCP client (raw sockets, kein pymodbus), blockierend."""
+
+    def __init__(self, host: str, port: int, slave_id: int,
+                 persistent: bool = True,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT) -> None:
+        super().__init__(host, port, slave_id)
+        self._persistent = persistent
+        self._connect_timeout = connect_timeout
+        self._read_timeout    = read_timeout
+        self._sock: socket.socket | None = None
+        self._lock       = threading.Lock()   # Executor-Jobs laufen parallel
+        self._last_io    = 0.0
+        self.metrics     = ModbusMetrics()
+        self.breaker     = CircuitBreaker(self.metrics)
+
+    # ── Interne Hilfsmethoden ─────────────────────────────────────────────────
+
+    def _send_recv(self, request: bytes) -> bytes | None:
+        pdu = request[MBAP_HEADER_LEN:]
+        if not self._persistent:
+            response = None
+            try:
+                with self._connect() as sock:
+                    started = time.perf_counter()
+                    sock.sendall(request)
+                    response = self._recv_frame(sock, request)
+            except Exception as ex:
+                self.metrics.record_failure(ex)
+                _LOGGER.error("Modbus TCP %s:%s – Verbindungsfehler: %s", self._host, self._port, ex)
+                self.metrics.record_request(pdu, None, None)
+                return None
+            self.metrics.record_request(pdu, response, time.perf_counter() - started)
+            return response
+
+        with self._lock:
+            now = time.monotonic()
+            if not self.breaker.allow(now):
+                _LOGGER.debug(
+                    "Modbus TCP %s:%s – Circuit offen, nächster Versuch in %.1f s",
+                    self._host, self._port, self.breaker.retry_at - now,
+                )
+                self.metrics.backoff_skips += 1
+                return None
+            if self._sock is not None and now - self._last_io > IDLE_RECONNECT_AFTER:
+                # Gegenstelle hat den Leerlauf-Socket vermutlich schon verworfen
+                self._close()
+
+            # Lese-Requests dürfen READ_RETRIES-mal wiederholt werden, außer
+            # der Verbindungsaufbau selbst scheitert (Host nicht erreichbar).
+            last_error: Exception | None = None
+            for attempt in range(1 + (READ_RETRIES if _is_idempotent(pdu) else 0)):
+                if attempt:
+                    self.metrics.retries += 1
+                connected = self._sock is not None
+                try:
+                    if not connected:
+                        self._sock = self._connect()
+                        connected  = True
+                    started = time.perf_counter()
+                    self._sock.sendall(request)
+                    response = self._recv_frame(self._sock, request)
+                except Exception as ex:
+                    self._close()
+                    self.metrics.record_failure(ex)
+                    last_error = ex
+                    if not connected:
+                        break
+                    continue
+                self._last_io = time.monotonic()
+                if self.breaker.record_success():
+                    _LOGGER.info("Modbus TCP %s:%s – wieder erreichbar", self._host, self._port)
+                self.metrics.record_request(pdu, response, time.perf_counter() - started)
+                return response
+
+            self.metrics.record_request(pdu, None, None)
+            delay = self.breaker.record_failure(time.monotonic())
+            _log_failure(self._host, self._port, self.breaker, last_error, delay)
+            return None
+
+    def _recv_frame(self, sock: socket.socket, request: bytes) -> bytes:
+        """Liest genau eine ADU (Header + deklarierte Länge) zur TID des Requests."""
+        expected = int.from_bytes(request[:2], "big")
+        while True:
+            header = _recv_exact(sock, MBAP_HEADER_LEN)
+            tid, size = self._parse_header(header)
+            body = _recv_exact(sock, size)
+            if self._accept_frame(tid, expected):
+                return header + body
+
+    def _connect(self) -> socket.socket:
+        """Öffnet einen Socket inkl. TCP Keepalive, danach gilt das Lese-Timeout."""
+        started = time.perf_counter()
+        try:
+            sock = socket.create_connection(
+                (self._host, self._port), timeout=self._connect_timeout,
+            )
+        except OSError:
+            self.metrics.record_connect(time.perf_counter() - started, False)
+            raise
+        self.metrics.record_connect(time.perf_counter() - started, True)
+        sock.settimeout(self._read_timeout)
+        _configure_socket(sock)
+        _LOGGER.debug("Modbus TCP %s:%s – verbunden", self._host, self._port)
+        return sock
+
+    def _close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    # ── Öffentliche Methoden ──────────────────────────────────────────────────
+
+    def read_registers(self, address: int, count: int) -> list[int] | None:
+        """Liest `count` Holding-Register ab `address` (FC 0x03)."""
+        response = self._send_recv(self._read_request(address, count))
+        return self._parse_read(response, address, count)
+
+    def read_blocks(self, blocks: list[tuple[int, int]]) -> list[memoryview | None]:
+        """
+        Liest mehrere (address, count)-Blöcke nacheinander und liefert je
+        Block die Registerbytes (big-endian, ohne Kopie) für `ReadBlock.decode`.
+        """
+        return [
+            self._read_payload(self._send_recv(self._read_request(address, count)), address, count)
+            for address, count in blocks
+        ]
+
+    def read_uint32(self, address: int) -> int | None:
+        """Liest einen UINT32-Wert aus zwei aufeinanderfolgenden Registern."""
+        return self._to_uint32(self.read_registers(address, 2))
+
+    def write_holding_register(self, address: int, value: int) -> bool:
+        """
+        Schreibt ein einzelnes Register.
+
+        R/W Register (0x3000–0x300B) → FC 0x10 (Write Multiple Registers)
+        W-Only Register (0x4000–0x4003) → FC 0x06 (Write Single Register)
+        """
+        fc, request = self._write_request(address, value)
+        return self._parse_write(fc, self._send_recv(request), address, value)
+
+    def write_registers(self, address: int, values: list[int]) -> bool:
+        """
+        Schreibt aufeinanderfolgende R/W Register (FC 0x10, Quantity > 1).
+
+        Spannt der Bereich über 0x3007–0x3009, wird er dort geteilt.
+        Bricht beim ersten fehlgeschlagenen Request ab.
+        """
+        for start, chunk in self._write_runs(address, values):
+            request  = self._build_mbap(self._write_multiple_pdu(start, chunk))
+            response = self._send_recv(request)
+            if not self._parse_write(FC_WRITE_MULTIPLE, response, start, chunk, len(chunk)):
+                return False
+        return True
+
+    def disconnect(self) -> None:
+        """Schließt den persistenten Socket (falls offen) und setzt den Breaker zurück."""
+        with self._lock:
+            self._close()
+            self.breaker.reset()
+
+
+class ModbusTcpConnection:
+    """
+    Persistente asyncio-Verbindung zu einem host:port.
+
+    Kann von mehreren `AsyncFoxESSModbusClient`s (verschiedene Slave IDs
+    hinter einem RS485-Gateway) geteilt werden: Transaction IDs werden pro
+    Verbindung vergeben und alle Requests laufen über eine FIFO-Sperre
+    nacheinander auf den Socket.
+
+    Fehler werden getrennt gezählt: Verbindungsfehler (Connect, Reset,
+    Framing) am Breaker der Verbindung, ausbleibende Antworten am Breaker
+    der Slave ID. Ein Timeout schließt den geteilten Socket nicht – späte
+    Antworten verwirft die TID-Prüfung; erst SILENT_TIMEOUTS_CLOSE Timeouts
+    in Folge ohne jede Antwort auf dem Socket erzwingen einen Neuaufbau.
+    Ein stummer Charger bremst so nur seine eigenen Polls.
+
+    Nach IDLE_HEARTBEAT_AFTER Sekunden ohne Verkehr liest die Verbindung
+    ein einzelnes Register der zuletzt angesprochenen Slave ID. Das kommt
+    dem Leerlauf-Timeout des Geräts (~60 s) zuvor, sodass auch das
+    Idle-Intervall (Standard 60 s) denselben Socket weiter nutzt, statt
+    bei jedem Poll neu zu verbinden.
+
+    `pipeline_window` ist das konfigurierte Fenster, `effective_window` das
+    genutzte: scheitert ein gepipelinter Batch PIPELINE_FALLBACK_AFTER-mal
+    in Folge, während die serielle Wiederholung klappt, unterstützt die
+    Firmware Pipelining vermutlich nicht – dann wird für
+    PIPELINE_REPROBE_INTERVAL Sekunden seriell gearbeitet und danach erneut
+    probiert. Einzelne verlorene Pakete ändern das Fenster nicht.
+    """
+
+    def __init__(self, host: str, port: int,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 pipeline_window: int = 1) -> None:
+        self._host     = host
+        self._port     = port
+        self._connect_timeout = connect_timeout
+        self._read_timeout    = read_timeout
+        self.pipeline_window  = max(1, pipeline_window)
+        self._pipeline_failures = 0     # Pipelining gescheitert, seriell ok – in Folge
+        self._serial_until      = 0.0   # monotonic, bis dahin effektives Fenster 1
+        self._tid      = 0
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock     = asyncio.Lock()   # FIFO: ein Request-Batch zur Zeit
+        self._last_io  = 0.0
+        self._silent_timeouts = 0       # Timeouts seit der letzten Antwort auf dem Socket
+        self._heartbeat:      asyncio.TimerHandle | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self.metrics   = ModbusMetrics()
+        self.breaker   = CircuitBreaker(self.metrics)
+        self._unit_breakers: dict[int, CircuitBreaker] = {}
+
+    def _next_tid(self) -> int:
+        self._tid = (self._tid + 1) % 0xFFFF
+        return self._tid
+
+    def unit_breaker(self, unit: int) -> CircuitBreaker:
+        """Breaker einer Slave ID (angelegt beim ersten Request)."""
+        breaker = self._unit_breakers.get(unit)
+        if breaker is None:
+            breaker = self._unit_breakers[unit] = CircuitBreaker(self.metrics, unit=unit)
+        return breaker
+
+    @property
+    def effective_window(self) -> int:
+        if time.monotonic() < self._serial_until:
+            return 1
+        return self.pipeline_window
+
+    def _note_pipeline_result(self, serial_fallback: bool) -> None:
+        """Nach einem erfolgreichen Lese-Batch: gepipelint ok oder nur seriell ok."""
+        if not serial_fallback:
+            self._pipeline_failures = 0
+            return
+        self._pipeline_failures += 1
+        if self._pipeline_failures < PIPELINE_FALLBACK_AFTER:
+            return
+        self._serial_until = time.monotonic() + PIPELINE_REPROBE_INTERVAL
+        # Nach dem Re-Probe genügt ein erneuter Fehlschlag für den Fallback
+        self._pipeline_failures = PIPELINE_FALLBACK_AFTER - 1
+        _LOGGER.warning(
+            "Modbus TCP %s:%s – Pipelining %d-mal fehlgeschlagen, seriell erfolgreich: "
+            "serielle Requests für %d s",
+            self._host, self._port, PIPELINE_FALLBACK_AFTER, PIPELINE_REPROBE_INTERVAL,
         )
-        response = self._send_recv(self._build_mbap(pdu))
-        if response is None:
-            return False
 
-        if len(response) >= 9 and response[7] == (FC_WRITE_MULTIPLE | 0x80):
-            _LOGGER.error(
-                "FC10 Exception 0x%02X @ 0x%04X value=%d",
-                response[8], address, value,
+    async def transact(
+        self, unit: int, pdus: list[bytes], pipelined: bool = False,
+    ) -> list[bytes | None]:
+        """
+        Sendet PDUs an `unit` und liefert die Antwort-ADUs in gleicher
+        Reihenfolge (None = fehlgeschlagen). Mit `pipelined` sind bis zu
+        `effective_window` Requests gleichzeitig unterwegs, die Antworten
+        werden über die Transaction ID zugeordnet.
+
+        Bei offenem Circuit Breaker (Verbindung oder Slave ID) scheitern alle
+        Requests sofort. Scheitert ein Batch nach Teilerfolg, bleiben die
+        bereits erhaltenen Antworten.
+        """
+        requests = [(unit, pdu) for pdu in pdus]
+        async with self._lock:
+            window = self.effective_window if pipelined else 1
+            probing = window > 1
+            now = time.monotonic()
+            unit_breaker = self.unit_breaker(unit)
+            for breaker in (self.breaker, unit_breaker):
+                if not breaker.allow(now):
+                    _LOGGER.debug(
+                        "Modbus TCP %s:%s – Circuit offen (%s), nächster Versuch in %.1f s",
+                        self._host, self._port,
+                        "Verbindung" if breaker.unit is None else f"unit {unit}",
+                        breaker.retry_at - now,
+                    )
+                    self.metrics.backoff_skips += len(requests)
+                    return [None] * len(requests)
+            if self._writer is not None and now - self._last_io > IDLE_RECONNECT_AFTER:
+                await self._close()
+
+            # Weitere Versuche nur für reine Lese-Batches: nach gescheitertem
+            # Pipelining seriell, nach Verbindungsfehlern auf neuem Socket.
+            # Bleibt seriell eine Antwort aus, hilft eine Wiederholung nicht.
+            idempotent = all(_is_idempotent(pdu) for pdu in pdus)
+            attempts   = 1 + (READ_RETRIES if idempotent else 0)
+            last_error: Exception | None = None
+            silent          = False   # letzter Fehlschlag: Timeout bei intaktem Socket
+            serial_fallback = False
+            # Über alle Versuche: erhaltene Antworten bleiben, wiederholt wird
+            # nur, was noch fehlt; Metriken einmal je Request am Ende
+            responses: list[bytes | None] = [None] * len(requests)
+            rtts:      list[float | None] = [None] * len(requests)
+            succeeded  = False
+            while attempts > 0:
+                if last_error is not None:
+                    self.metrics.retries += 1
+                attempts -= 1
+                connected = self._writer is not None
+                try:
+                    if not connected:
+                        async with asyncio.timeout(self._connect_timeout):
+                            await self._connect()
+                        connected = True
+                    await self._exchange(requests, window, responses, rtts)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as ex:
+                    self.metrics.record_failure(ex)
+                    last_error = ex
+                    silent = connected and isinstance(ex, asyncio.TimeoutError)
+                    if silent:
+                        self._silent_timeouts += 1
+                    if not silent or self._silent_timeouts >= SILENT_TIMEOUTS_CLOSE:
+                        await self._close()
+                    if not connected:
+                        break
+                    if window > 1:
+                        window, serial_fallback = 1, True
+                        _LOGGER.debug(
+                            "Modbus TCP %s:%s – Pipelining fehlgeschlagen (%s), "
+                            "Wiederholung seriell",
+                            self._host, self._port, str(ex) or type(ex).__name__,
+                        )
+                        continue
+                    if silent:
+                        break
+                    continue
+                if probing:
+                    self._note_pipeline_result(serial_fallback)
+                if self.breaker.record_success():
+                    _LOGGER.info("Modbus TCP %s:%s – wieder erreichbar", self._host, self._port)
+                if unit_breaker.record_success():
+                    _LOGGER.info(
+                        "Modbus TCP %s:%s unit %d – antwortet wieder", self._host, self._port, unit,
+                    )
+                succeeded = True
+                break
+            if not succeeded:
+                # Stummer Slave zählt nur für sich, sonst für die ganze Verbindung
+                breaker = unit_breaker if silent else self.breaker
+                delay = breaker.record_failure(time.monotonic())
+                _log_failure(self._host, self._port, breaker, last_error, delay)
+
+            for (_unit, pdu), response, rtt in zip(requests, responses, rtts):
+                self.metrics.record_request(pdu, response, rtt)
+            self._schedule_heartbeat(unit)
+            return responses
+
+    def _schedule_heartbeat(self, unit: int) -> None:
+        """Heartbeat nach IDLE_HEARTBEAT_AFTER s Leerlauf, solange der Socket offen ist."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._writer is not None:
+            self._heartbeat = asyncio.get_running_loop().call_later(
+                IDLE_HEARTBEAT_AFTER, self._send_heartbeat, unit,
             )
-            return False
 
-        success = len(response) >= 12
-        if success:
-            _LOGGER.debug("FC10 Write 0x%04X = %d ✓", address, value)
-        else:
-            _LOGGER.warning(
-                "FC10 Write 0x%04X = %d: unerwartete Antwort (%d Bytes): %s",
-                address, value, len(response), response.hex(),
+    def _send_heartbeat(self, unit: int) -> None:
+        self._heartbeat = None
+        if self._writer is not None:
+            self._heartbeat_task = asyncio.get_running_loop().create_task(
+                self.transact(unit, [_HEARTBEAT_PDU])
             )
-        return success
 
-    def disconnect(self) -> None:
-        """Kein persistenter Socket – nichts zu schließen."""
-        pass
+    async def _exchange(
+        self, requests: list[tuple[int, bytes]], window: int,
+        responses: list[bytes | None], rtts: list[float | None],
+    ) -> None:
+        """
+        Sliding Window über die noch unbeantworteten `requests`; liest jede
+        ADU exakt nach MBAP-Länge. Antworten und RTTs landen direkt in
+        `responses`/`rtts` und bleiben bei einem Abbruch erhalten.
+        """
+        assert self._reader is not None and self._writer is not None
+        reader, writer = self._reader, self._writer
+        pending = [index for index, response in enumerate(responses) if response is None]
+        in_flight: dict[int, tuple[int, float]] = {}   # TID → (Index, Sendezeit)
+        sent = 0
+
+        while sent < len(pending) or in_flight:
+            while sent < len(pending) and len(in_flight) < window:
+                index = pending[sent]
+                tid = self._next_tid()
+                unit, pdu = requests[index]
+                writer.write(_build_adu(tid, unit, pdu))
+                in_flight[tid] = (index, time.perf_counter())
+                sent += 1
+            # READ_TIMEOUT gilt je Antwort, nicht für den ganzen Batch
+            async with asyncio.timeout(self._read_timeout):
+                await writer.drain()
+                header = await reader.readexactly(MBAP_HEADER_LEN)
+                tid, unit, size = _parse_header(header)
+                body = await reader.readexactly(size)
+            self._silent_timeouts = 0
+            self._last_io = time.monotonic()
+            if tid in in_flight:
+                index, started = in_flight.pop(tid)
+                if unit != requests[index][0]:
+                    raise ModbusFrameError(f"unit id {unit} != {requests[index][0]}")
+                responses[index] = header + body
+                rtts[index]      = time.perf_counter() - started
+            elif _is_stale(tid, next(iter(in_flight))):
+                _LOGGER.debug(
+                    "Modbus TCP %s:%s – verspätete Antwort TID %d verworfen",
+                    self._host, self._port, tid,
+                )
+            else:
+                raise ModbusFrameError(f"unexpected transaction id {tid}")
+
+    async def _connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        except (OSError, asyncio.CancelledError):
+            self.metrics.record_connect(time.perf_counter() - started, False)
+            raise
+        self.metrics.record_connect(time.perf_counter() - started, True)
+        self._last_io = time.monotonic()
+        sock = self._writer.get_extra_info("socket")
+        if sock is not None:
+            _configure_socket(sock)
+        _LOGGER.debug("Modbus TCP %s:%s – verbunden (async)", self._host, self._port)
+
+    async def _close(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        self._silent_timeouts = 0
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+    async def close(self) -> None:
+        """Schließt den Socket (falls offen) und setzt die Circuit Breaker zurück."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+        async with self._lock:
+            await self._close()
+            self.breaker.reset()
+            for breaker in self._unit_breakers.values():
+                breaker.reset()
+
+
+class AsyncFoxESSModbusClient(_FoxESSModbusProtocol):
+    """
+    Modbus TCP client auf asyncio-Streams.
+
+    Gleiche API wie `FoxESSModbusClient`, aber alle I/O-Methoden sind
+    Coroutinen und laufen direkt im Event Loop – kein Executor-Thread
+    wird blockiert, solange der Charger nicht antwortet. Ohne `connection`
+    wird eine eigene `ModbusTcpConnection` geöffnet.
+    """
+
+    def __init__(self, host: str, port: int, slave_id: int,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT, pipeline_window: int = 1,
+                 connection: ModbusTcpConnection | None = None) -> None:
+        super().__init__(host, port, slave_id)
+        self._owns_connection = connection is None
+        self._connection = connection or ModbusTcpConnection(
+            host, port, connect_timeout=connect_timeout, read_timeout=read_timeout,
+            pipeline_window=pipeline_window,
+        )
+
+    @property
+    def metrics(self) -> ModbusMetrics:
+        """Messwerte der (ggf. geteilten) Verbindung."""
+        return self._connection.metrics
+
+    async def _send_recv(self, pdu: bytes) -> bytes | None:
+        return (await self._connection.transact(self._slave_id, [pdu]))[0]
+
+    # ── Öffentliche Methoden ──────────────────────────────────────────────────
+
+    async def read_registers(self, address: int, count: int) -> list[int] | None:
+        """Liest `count` Holding-Register ab `address` (FC 0x03)."""
+        response = await self._send_recv(self._read_pdu(address, count))
+        return self._parse_read(response, address, count)
+
+    async def read_blocks(self, blocks: list[tuple[int, int]]) -> list[memoryview | None]:
+        """
+        Liest mehrere (address, count)-Blöcke. Mit pipeline_window > 1 werden
+        die Requests ohne Warten auf Antworten hintereinander gesendet.
+        Liefert je Block die Registerbytes (big-endian, ohne Kopie) für
+        `ReadBlock.decode`.
+        """
+        responses = await self._connection.transact(
+            self._slave_id,
+            [self._read_pdu(address, count) for address, count in blocks],
+            pipelined=True,
+        )
+        return [
+            self._read_payload(response, address, count)
+            for response, (address, count) in zip(responses, blocks)
+        ]
+
+    async def read_uint32(self, address: int) -> int | None:
+        """Liest einen UINT32-Wert aus zwei aufeinanderfolgenden Registern."""
+        return self._to_uint32(await self.read_registers(address, 2))
+
+    async def write_holding_register(self, address: int, value: int) -> bool:
+        """
+        Schreibt ein einzelnes Register.
+
+        R/W Register (0x3000–0x300B) → FC 0x10 (Write Multiple Registers)
+        W-Only Register (0x4000–0x4003) → FC 0x06 (Write Single Register)
+        """
+        fc, pdu = self._write_pdu(address, value)
+        return self._parse_write(fc, await self._send_recv(pdu), address, value)
+
+    async def write_registers(self, address: int, values: list[int]) -> bool:
+        """
+        Schreibt aufeinanderfolgende R/W Register (FC 0x10, Quantity > 1).
+
+        Spannt der Bereich über 0x3007–0x3009, wird er dort geteilt.
+        Bricht beim ersten fehlgeschlagenen Request ab.
+        """
+        for start, chunk in self._write_runs(address, values):
+            response = await self._send_recv(self._write_multiple_pdu(start, chunk))
+            if not self._parse_write(FC_WRITE_MULTIPLE, response, start, chunk, len(chunk)):
+                return False
+        return True
+
+    async def disconnect(self) -> None:
+        """Schließt die eigene Verbindung; geteilte schließt der Fleet-Layer."""
+        if self._owns_connection:
+            await self._connection.close()
@@ -0,0 +1,231 @@
+"""
+Register map and read planner for FoxESS EV Charger.
+
+`REGISTERS` is the single description of every register: address, width,
+scale/offset/sentinel, access mode and poll tier. The read planner, the
+block decoders, the sensor/number descriptions, the services and the
+write path all derive from it.
+"""
+from __future__ import annotations
+
+import struct
+from collections.abc import Iterable
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+from .const import (
+    REG_DEVICE_ADDRESS, REG_SOFTWARE_VER, REG_STOP_REASON, REG_STATUS,
+    REG_CP_STATUS, REG_CC_STATUS, REG_PORT_TEMP, REG_AMBIENT_TEMP,
+    REG_L1_VOLTAGE, REG_L2_VOLTAGE, REG_L3_VOLTAGE,
+    REG_L1_CURRENT, REG_L2_CURRENT, REG_L3_CURRENT,
+    REG_ACTIVE_POWER, REG_LOCK_STATUS, REG_PHASE_SEQUENCE,
+    REG_MAX_POWER, REG_MIN_POWER, REG_MAX_CURRENT, REG_MIN_CURRENT,
+    REG_ALARM_CODE, REG_CURRENT_ENERGY, REG_TOTAL_ENERGY,
+    REG_FAULT_CODE, REG_RFID_CARD,
+    REG_WORK_MODE, REG_MAX_CHARGING_CURRENT, REG_MAX_CHARGING_POWER,
+    REG_ALLOWED_CHARGE_TIME, REG_ALLOWED_CHARGE_ENERGY, REG_TIME_VALIDITY,
+    REG_DEFAULT_CURRENT, REG_AUTO_PHASE_SWITCH, REG_MIN_SWITCH_INTERVAL,
+    REG_LOCK_CONTROL, REG_CHARGING_CONTROL, REG_PHASE_SWITCHING, REG_RESTART,
+)
+
+# ── Planner-Grenzen ───────────────────────────────────────────────────────────
+MAX_READ_COUNT = 125   # FC 0x03: max. 125 Register pro Request (Modbus-Spezifikation)
+MAX_READ_GAP   = 4     # Lücken bis zu N ungenutzten Registern werden mitgelesen
+
+# ── Refresh-Tiers ─────────────────────────────────────────────────────────────
+TIER_LIVE   = "live"     # Messwerte/Status: jeder Poll
+TIER_CONFIG = "config"   # R/W Konfiguration: alle N Polls oder nach Schreibzugriff
+TIER_STATIC = "static"   # Geräte-/Firmwaredaten: nur beim Start
+ALL_TIERS   = frozenset({TIER_LIVE, TIER_CONFIG, TIER_STATIC})
+
+# ── Zugriff ───────────────────────────────────────────────────────────────────
+ACCESS_READ       = "r"    # FC 0x03
+ACCESS_READ_WRITE = "rw"   # FC 0x03 / FC 0x10
+ACCESS_WRITE      = "w"    # nur FC 0x06, wird nie gepollt
+
+# Registerbreite → struct-Format (big-endian, UINT32 mit High-Word zuerst)
+_WIDTH_FORMATS = {1: "H", 2: "I"}
+
+
+@dataclass(frozen=True)
+class RegisterDef:
+    """
+    Ein Register: Schlüssel in `coordinator.data` (Rohwert), Adresse, Breite
+    und Umrechnung in die HA-Einheit (`raw * scale + offset`).
+    """
+
+    key:       str
+    address:   int
+    width:     int = 1              # 1 = UINT16, 2 = UINT32 (High-Word zuerst)
+    scale:     float = 1            # HA-Einheit pro Rohwert-Schritt
+    offset:    float = 0            # nach der Skalierung addiert (z.B. −50 °C)
+    precision: int | None = None    # Nachkommastellen, None = nicht runden
+    sentinel:  int | None = None    # Rohwert für "kein Messwert"
+    access:    str = ACCESS_READ
+    tier:      str | None = TIER_LIVE   # None = nicht gepollt (W-Only)
+
+    @property
+    def end(self) -> int:
+        return self.address + self.width
+
+    def to_ha(self, raw: int | None) -> float | int | None:
+        """Rohwert → HA-Wert; None für fehlende Werte und den Sentinel."""
+        if raw is None or raw == self.sentinel:
+            return None
+        if self.scale == 1 and not self.offset:
+            return raw
+        value = raw * self.scale + self.offset
+        return value if self.precision is None else round(value, self.precision)
+
+    def to_raw(self, value: float) -> int:
+        """HA-Wert → Rohwert für einen Schreibzugriff."""
+        return int(round((value - self.offset) / self.scale))
+
+
+# ── Registertabelle ───────────────────────────────────────────────────────────
+_TENTH = {"scale": 0.1, "precision": 1}   # 0.1 V / 0.1 A / 0.1 kW
+_KWH   = {"scale": 0.1, "precision": 2}   # 0.1 kWh
+_TEMP  = {"scale": 0.1, "offset": -50, "precision": 1, "sentinel": 0xFFFF}   # 0.1 °C − 50
+_RW    = {"access": ACCESS_READ_WRITE, "tier": TIER_CONFIG}
+_W     = {"access": ACCESS_WRITE, "tier": None}
+
+REGISTERS: tuple[RegisterDef, ...] = (
+    # 0x1000–0x101D: Read-Only
+    RegisterDef("device_address",            REG_DEVICE_ADDRESS,         tier=TIER_STATIC),
+    RegisterDef("software_version",          REG_SOFTWARE_VER,           tier=TIER_STATIC),
+    RegisterDef("stop_reason",               REG_STOP_REASON),
+    RegisterDef("status",                    REG_STATUS),
+    RegisterDef("cp_status",                 REG_CP_STATUS),
+    RegisterDef("cc_status",                 REG_CC_STATUS),
+    RegisterDef("port_temp_raw",             REG_PORT_TEMP,              **_TEMP),
+    RegisterDef("ambient_temp_raw",          REG_AMBIENT_TEMP,           **_TEMP),
+    RegisterDef("l1_voltage_raw",            REG_L1_VOLTAGE,             **_TENTH),
+    RegisterDef("l2_voltage_raw",            REG_L2_VOLTAGE,             **_TENTH),
+    RegisterDef("l3_voltage_raw",            REG_L3_VOLTAGE,             **_TENTH),
+    RegisterDef("l1_current_raw",            REG_L1_CURRENT,             **_TENTH),
+    RegisterDef("l2_current_raw",            REG_L2_CURRENT,             **_TENTH),
+    RegisterDef("l3_current_raw",            REG_L3_CURRENT,             **_TENTH),
+    RegisterDef("power_raw",                 REG_ACTIVE_POWER,           **_TENTH),
+    RegisterDef("lock_status",               REG_LOCK_STATUS),
+    RegisterDef("phase_sequence",            REG_PHASE_SEQUENCE),
+    RegisterDef("max_power_raw",             REG_MAX_POWER,              **_TENTH, tier=TIER_STATIC),
+    RegisterDef("min_power_raw",             REG_MIN_POWER,              **_TENTH, tier=TIER_STATIC),
+    RegisterDef("max_current_raw",           REG_MAX_CURRENT,            **_TENTH, tier=TIER_STATIC),
+    RegisterDef("min_current_raw",           REG_MIN_CURRENT,            **_TENTH, tier=TIER_STATIC),
+    RegisterDef("alarm_code",                REG_ALARM_CODE),
+    RegisterDef("current_energy_raw",        REG_CURRENT_ENERGY,         width=2, **_KWH),
+    RegisterDef("total_energy_raw",          REG_TOTAL_ENERGY,           width=2, **_KWH),
+    RegisterDef("fault_code",                REG_FAULT_CODE,             width=2),
+    RegisterDef("rfid_card",                 REG_RFID_CARD,              width=2),
+    # 0x3000–0x300B: Read/Write (0x3007–0x3009 reserviert)
+    RegisterDef("work_mode",                 REG_WORK_MODE,              **_RW),
+    RegisterDef("max_charging_current_raw",  REG_MAX_CHARGING_CURRENT,   **_RW, **_TENTH),
+    RegisterDef("max_charging_power_raw",    REG_MAX_CHARGING_POWER,     **_RW, **_TENTH),
+    RegisterDef("allowed_charge_time",       REG_ALLOWED_CHARGE_TIME,    **_RW),
+    RegisterDef("allowed_charge_energy",     REG_ALLOWED_CHARGE_ENERGY,  **_RW),
+    RegisterDef("time_validity",             REG_TIME_VALIDITY,          **_RW),
+    RegisterDef("default_current_raw",       REG_DEFAULT_CURRENT,        **_RW, **_TENTH),
+    RegisterDef("auto_phase_switch",         REG_AUTO_PHASE_SWITCH,      **_RW),
+    RegisterDef("min_switch_interval",       REG_MIN_SWITCH_INTERVAL,    **_RW),
+    # 0x4000–0x4003: Write-Only Kommandos
+    RegisterDef("lock_control",              REG_LOCK_CONTROL,           **_W),
+    RegisterDef("charging_control",          REG_CHARGING_CONTROL,       **_W),
+    RegisterDef("phase_switching",           REG_PHASE_SWITCHING,        **_W),
+    RegisterDef("restart",                   REG_RESTART,                **_W),
+)
+
+REGISTER_MAP: dict[str, RegisterDef] = {reg.key: reg for reg in REGISTERS}
+
+WRITE_ONLY_REGISTERS = frozenset(reg.address for reg in REGISTERS if reg.access == ACCESS_WRITE)
+
+
+@dataclass(frozen=True)
+class ReadBlock:
+    """Ein FC 0x03 Request, der mehrere `RegisterDef`s abdeckt."""
+
+    address:   int
+    count:     int
+    registers: tuple[RegisterDef, ...]
+
+    @property
+    def end(self) -> int:
+        return self.address + self.count
+
+    @cached_property
+    def keys(self) -> tuple[str, ...]:
+        return tuple(reg.key for reg in self.registers)
+
+    @cached_property
+    def decoder(self) -> struct.Struct:
+        """
+        Vorkompiliertes Format für den ganzen Block, z.B. ">HH4xHI":
+        Lücken werden als Füllbytes übersprungen, UINT32 in einem Schritt.
+        """
+        fmt, pos = [">"], self.address
+        for reg in self.registers:
+            if reg.address > pos:
+                fmt.append(f"{2 * (reg.address - pos)}x")
+            fmt.append(_WIDTH_FORMATS[reg.width])
+            pos = reg.end
+        return struct.Struct("".join(fmt))
+
+    def decode(self, payload: bytes | memoryview) -> dict[str, int]:
+        """Verteilt die Registerbytes einer FC03-Antwort auf die Schlüssel des Blocks."""
+        return dict(zip(self.keys, self.decoder.unpack_from(payload)))
+
+
+def plan_reads(
+    registers: tuple[RegisterDef, ...] | list[RegisterDef],
+    max_gap: int = MAX_READ_GAP,
+    max_count: int = MAX_READ_COUNT,
+) -> tuple[ReadBlock, ...]:
+    """
+    Fasst benachbarte Register zu möglichst wenigen FC 0x03 Requests zusammen.
+
+    Zwei Register landen im selben Block, wenn die Lücke dazwischen höchstens
+    `max_gap` Register beträgt und der Block `max_count` nicht überschreitet.
+    """
+    blocks: list[ReadBlock] = []
+    current: list[RegisterDef] = []
+    start = end = 0
+
+    for reg in sorted(registers, key=lambda r: r.address):
+        if current and reg.address - end <= max_gap and reg.end - start <= max_count:
+            current.append(reg)
+            end = max(end, reg.end)
+            continue
+        if current:
+            blocks.append(ReadBlock(start, end - start, tuple(current)))
+        current, start, end = [reg], reg.address, reg.end
+
+    if current:
+        blocks.append(ReadBlock(start, end - start, tuple(current)))
+    return tuple(blocks)
+
+
+def contiguous_runs(addresses: Iterable[int]) -> list[list[int]]:
+    """Teilt Adressen (sortiert) in lückenlose Folgen – je Folge ein FC 0x10 Request."""
+    runs: list[list[int]] = []
+    for address in sorted(addresses):
+        if runs and address == runs[-1][-1] + 1:
+            runs[-1].append(address)
+        else:
+            runs.append([address])
+    return runs
+
+
+# Schlüssel je Tier, z.B. um zu prüfen ob der Cache vollständig ist
+TIER_KEYS: dict[str, frozenset[str]] = {
+    tier: frozenset(reg.key for reg in REGISTERS if reg.tier == tier)
+    for tier in ALL_TIERS
+}
+
+
+@lru_cache(maxsize=None)
+def read_plan(tiers: frozenset[str] = ALL_TIERS) -> tuple[ReadBlock, ...]:
+    """Read-Plan für die Register der angegebenen Tiers (gecacht)."""
+    return plan_reads([reg for reg in REGISTERS if reg.tier in tiers])
+
+
+# Alle Tiers: 0x1000–0x101D und 0x3000–0x300B → zwei Requests
+READ_PLAN = read_plan(ALL_TIERS)
@@ -1,7 +1,9 @@
 """Sensors for FoxESS EV Charger."""
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
+from datetime import datetime
 from typing import Callable
 
 from homeassistant.components.sensor import (
@@ -9,68 +11,94 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
-    UnitOfElectricCurrent, UnitOfElectricPotential,
+    PERCENTAGE, EntityCategory, UnitOfElectricCurrent, UnitOfElectricPotential,
     UnitOfEnergy, UnitOfPower, UnitOfTemperature, UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, STATUS_MAP, CP_STATUS_MAP, WORK_MODE_MAP, PHASE_SEQ_MAP, STOP_REASON_MAP
+from .const import (
+    DOMAIN, STATUS_MAP, CP_STATUS_MAP, WORK_MODE_MAP, PHASE_SEQ_MAP, STOP_REASON_MAP,
+    CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE,
+    DEADBAND_VOLTAGE, DEADBAND_CURRENT, DEADBAND_POWER, DEADBAND_POWER_REL,
+    METRICS_CONTEXT,
+)
 from .__init__ import FoxESSChargerCoordinator
+from .registers import REGISTER_MAP
 
 
 @dataclass(frozen=True, kw_only=True)
 class FoxESSChargerSensorDescription(SensorEntityDescription):
     value_fn: Callable[[dict], StateType] = lambda _: None
+    data_keys: tuple[str, ...] = ()   # Rohdaten-Schlüssel; leer = bei jedem Update
+    register: str | None = None       # Schlüssel in REGISTER_MAP: value_fn/data_keys daraus
+    deadband_abs: float = 0.0         # Mindeständerung in der Sensor-Einheit
+    deadband_rel: float = 0.0         # Mindeständerung relativ zum letzten Wert (0.02 = 2 %)
+
+    def __post_init__(self) -> None:
+        # Skalierung, Offset und Sentinel kommen aus der Registertabelle
+        if self.register is not None:
+            reg = REGISTER_MAP[self.register]
+            object.__setattr__(self, "value_fn", lambda d: reg.to_ha(d.get(reg.key)))
+            object.__setattr__(self, "data_keys", (reg.key,))
 
 
 SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
     # ── System ──────────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
         key="software_version", name="Software Version", icon="mdi:information-outline",
+        data_keys=("software_version",),
         value_fn=lambda d: f"{d.get('software_version',0)>>8}.{d.get('software_version',0)&0xFF}",
     ),
     FoxESSChargerSensorDescription(
         key="device_address", name="Device Address", icon="mdi:identifier",
-        value_fn=lambda d: d.get("device_address"),
+        register="device_address",
     ),
     # ── Status ───────────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
         key="status", name="Status", icon="mdi:ev-station",
         device_class=SensorDeviceClass.ENUM,
         options=list(STATUS_MAP.values()),
+        data_keys=("status",),
         value_fn=lambda d: STATUS_MAP.get(d.get("status", 0), "unknown"),
     ),
     FoxESSChargerSensorDescription(
         key="cp_status", name="CP Status", icon="mdi:connection",
         device_class=SensorDeviceClass.ENUM, options=list(CP_STATUS_MAP.values()),
+        data_keys=("cp_status",),
         value_fn=lambda d: CP_STATUS_MAP.get(d.get("cp_status", 0), "unknown"),
     ),
     FoxESSChargerSensorDescription(
         key="cc_status", name="CC Status", icon="mdi:cable-data",
         device_class=SensorDeviceClass.ENUM, options=["disconnected", "connected"],
+        data_keys=("cc_status",),
         value_fn=lambda d: "connected" if d.get("cc_status") == 1 else "disconnected",
     ),
     FoxESSChargerSensorDescription(
         key="lock_status", name="Lock Status", icon="mdi:lock",
         device_class=SensorDeviceClass.ENUM, options=["unlocked", "locked"],
+        data_keys=("lock_status",),
         value_fn=lambda d: "locked" if d.get("lock_status") == 1 else "unlocked",
     ),
     FoxESSChargerSensorDescription(
         key="work_mode_sensor", name="Work Mode", icon="mdi:cog",
         device_class=SensorDeviceClass.ENUM, options=list(WORK_MODE_MAP.values()),
+        data_keys=("work_mode",),
         value_fn=lambda d: WORK_MODE_MAP.get(d.get("work_mode", 0), "unknown"),
     ),
     FoxESSChargerSensorDescription(
         key="phase_sequence", name="Phase Sequence", icon="mdi:electric-switch",
         device_class=SensorDeviceClass.ENUM, options=list(PHASE_SEQ_MAP.values()),
+        data_keys=("phase_sequence",),
         value_fn=lambda d: PHASE_SEQ_MAP.get(d.get("phase_sequence", 0), "unknown"),
     ),
     FoxESSChargerSensorDescription(
         key="stop_reason", name="Stop Reason", icon="mdi:information",
+        data_keys=("stop_reason",),
         value_fn=lambda d: STOP_REASON_MAP.get(d.get("stop_reason", 0), "unknown"),
     ),
     # ── Temperaturen ─────────────────────────────────────────────────────────
@@ -80,8 +108,7 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         icon="mdi:thermometer",
-        value_fn=lambda d: round(d["port_temp_raw"] * 0.1 - 50, 1)
-            if d.get("port_temp_raw") not in (None, 65535) else None,
+        register="port_temp_raw",
     ),
     FoxESSChargerSensorDescription(
         key="ambient_temperature", name="Ambient Temperature",
@@ -89,7 +116,7 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfTemperature.CELSIUS,
         icon="mdi:thermometer",
-        value_fn=lambda d: round(d.get("ambient_temp_raw", 0) * 0.1 - 50, 1),
+        register="ambient_temp_raw",
     ),
     # ── Spannungen ───────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
@@ -98,7 +125,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         icon="mdi:flash",
-        value_fn=lambda d: round(d.get("l1_voltage_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_VOLTAGE,
+        register="l1_voltage_raw",
     ),
     FoxESSChargerSensorDescription(
         key="l2_voltage", name="L2 Voltage",
@@ -106,7 +134,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         icon="mdi:flash",
-        value_fn=lambda d: round(d.get("l2_voltage_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_VOLTAGE,
+        register="l2_voltage_raw",
     ),
     FoxESSChargerSensorDescription(
         key="l3_voltage", name="L3 Voltage",
@@ -114,7 +143,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricPotential.VOLT,
         icon="mdi:flash",
-        value_fn=lambda d: round(d.get("l3_voltage_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_VOLTAGE,
+        register="l3_voltage_raw",
     ),
     # ── Ströme ───────────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
@@ -123,7 +153,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         icon="mdi:current-ac",
-        value_fn=lambda d: round(d.get("l1_current_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_CURRENT,
+        register="l1_current_raw",
     ),
     FoxESSChargerSensorDescription(
         key="l2_current", name="L2 Current",
@@ -131,7 +162,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         icon="mdi:current-ac",
-        value_fn=lambda d: round(d.get("l2_current_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_CURRENT,
+        register="l2_current_raw",
     ),
     FoxESSChargerSensorDescription(
         key="l3_current", name="L3 Current",
@@ -139,7 +171,8 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         icon="mdi:current-ac",
-        value_fn=lambda d: round(d.get("l3_current_raw", 0) * 0.1, 1),
+        deadband_abs=DEADBAND_CURRENT,
+        register="l3_current_raw",
     ),
     # ── Leistung ─────────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
@@ -148,21 +181,22 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.MEASUREMENT,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         icon="mdi:lightning-bolt",
-        value_fn=lambda d: round(d.get("power_raw", 0) * 0.1, 2),
+        deadband_abs=DEADBAND_POWER, deadband_rel=DEADBAND_POWER_REL,
+        register="power_raw",
     ),
     FoxESSChargerSensorDescription(
         key="max_supported_power", name="Max Supported Power",
         device_class=SensorDeviceClass.POWER,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         icon="mdi:lightning-bolt-outline",
-        value_fn=lambda d: round(d.get("max_power_raw", 0) * 0.1, 1),
+        register="max_power_raw",
     ),
     FoxESSChargerSensorDescription(
         key="min_supported_power", name="Min Supported Power",
         device_class=SensorDeviceClass.POWER,
         native_unit_of_measurement=UnitOfPower.KILO_WATT,
         icon="mdi:lightning-bolt-outline",
-        value_fn=lambda d: round(d.get("min_power_raw", 0) * 0.1, 1),
+        register="min_power_raw",
     ),
     # ── Strom-Limits ─────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
@@ -170,14 +204,14 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         icon="mdi:current-ac",
-        value_fn=lambda d: round(d.get("max_current_raw", 0) * 0.1, 1),
+        register="max_current_raw",
     ),
     FoxESSChargerSensorDescription(
         key="min_supported_current", name="Min Supported Current",
         device_class=SensorDeviceClass.CURRENT,
         native_unit_of_measurement=UnitOfElectricCurrent.AMPERE,
         icon="mdi:current-ac",
-        value_fn=lambda d: round(d.get("min_current_raw", 0) * 0.1, 1),
+        register="min_current_raw",
     ),
     # ── Energie ──────────────────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
@@ -186,7 +220,7 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.TOTAL_INCREASING,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         icon="mdi:counter",
-        value_fn=lambda d: round(d.get("current_energy_raw", 0) * 0.1, 2),
+        register="current_energy_raw",
     ),
     FoxESSChargerSensorDescription(
         key="total_energy", name="Total Energy",
@@ -194,19 +228,20 @@ SENSORS: tuple[FoxESSChargerSensorDescription, ...] = (
         state_class=SensorStateClass.TOTAL_INCREASING,
         native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
         icon="mdi:counter",
-        value_fn=lambda d: round(d.get("total_energy_raw", 0) * 0.1, 2),
+        register="total_energy_raw",
     ),
     # ── Konfigurationssensoren ────────────────────────────────────────────────
     FoxESSChargerSensorDescription(
         key="alarm_code", name="Alarm Code", icon="mdi:alert",
-        value_fn=lambda d: d.get("alarm_code"),
+        register="alarm_code",
     ),
     FoxESSChargerSensorDescription(
         key="fault_code", name="Fault Code", icon="mdi:alert-circle",
-        value_fn=lambda d: d.get("fault_code"),
+        register="fault_code",
     ),
     FoxESSChargerSensorDescription(
         key="rfid_card", name="RFID Card", icon="mdi:card-account-details",
+        data_keys=("rfid_card",),
         value_fn=lambda d: f"{d.get('rfid_card',0):08X}" if d.get("rfid_card", 0) > 0 else "None",
     ),
 )
@@ -216,32 +251,181 @@ DEVICE_INFO_TEMPLATE = DeviceInfo(
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class FoxESSDiagnosticSensorDescription(SensorEntityDescription):
+    metrics_fn: Callable[[FoxESSChargerCoordinator], StateType]
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# Request-/Poll-Metriken – standardmäßig deaktiviert
+DIAGNOSTIC_SENSORS: tuple[FoxESSDiagnosticSensorDescription, ...] = (
+    FoxESSDiagnosticSensorDescription(
+        key="modbus_rtt_p95", name="Modbus RTT p95", icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION, state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC, entity_registry_enabled_default=False,
+        metrics_fn=lambda c: _ms(c.client.metrics.rtt_p95),
+    ),
+    FoxESSDiagnosticSensorDescription(
+        key="poll_duration", name="Poll Duration", icon="mdi:timer-sync-outline",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION, state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC, entity_registry_enabled_default=False,
+        metrics_fn=lambda c: _ms(c.metrics.last_duration),
+    ),
+    FoxESSDiagnosticSensorDescription(
+        key="modbus_error_rate", name="Modbus Error Rate", icon="mdi:alert-circle-outline",
+        native_unit_of_measurement=PERCENTAGE, state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC, entity_registry_enabled_default=False,
+        metrics_fn=lambda c: (
+            None if (rate := c.client.metrics.error_rate) is None else round(rate * 100, 1)
+        ),
+    ),
+)
+
+
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry,
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     coordinator: FoxESSChargerCoordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
     async_add_entities([
-        FoxESSChargerSensor(coordinator, desc, entry) for desc in SENSORS
+        *(FoxESSChargerSensor(coordinator, desc, entry) for desc in SENSORS),
+        *(FoxESSDiagnosticSensor(coordinator, desc, entry) for desc in DIAGNOSTIC_SENSORS),
     ])
 
 
 class FoxESSChargerSensor(CoordinatorEntity, SensorEntity):
+    """
+    Sensor auf Basis der Coordinator-Daten.
+
+    Mit Deadband (`deadband_abs`/`deadband_rel`) wird ein neuer Wert nur
+    publiziert, wenn er sich signifikant vom zuletzt publizierten
+    unterscheidet, von/auf 0 wechselt, die Verfügbarkeit wechselt oder
+    seit `max_silence` Sekunden nichts publiziert wurde (Heartbeat).
+
+    Der Heartbeat läuft über einen Timer: ändert sich der Rohwert innerhalb
+    des Deadbands und bleibt dann stehen, kommt kein weiteres Update.
+    """
+
     _attr_has_entity_name = True
     entity_description: FoxESSChargerSensorDescription
 
     def __init__(self, coordinator: FoxESSChargerCoordinator,
                  description: FoxESSChargerSensorDescription, entry: ConfigEntry) -> None:
-        super().__init__(coordinator)
+        # Nur bei Änderung eines der `data_keys` benachrichtigt werden
+        super().__init__(coordinator, context=frozenset(description.data_keys) or None)
         self.entity_description = description
         self._attr_unique_id = f"{entry.entry_id}_{description.key}"
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
             name="FoxESS Charger", manufacturer="FoxESS", model="A011",
         )
+        self._max_silence  = entry.options.get(CONF_MAX_SILENCE, DEFAULT_MAX_SILENCE)
+        self._deadband     = bool(
+            self._max_silence and (description.deadband_abs or description.deadband_rel)
+        )
+        self._published: StateType = None
+        self._published_at = 0.0          # monotonic; 0 = noch nichts publiziert
+        self._published_ok = False        # Verfügbarkeit beim letzten Publizieren
+        self._heartbeat: CALLBACK_TYPE | None = None
 
-    @property
-    def native_value(self) -> StateType:
+    def _current_value(self) -> StateType:
         if self.coordinator.data and self.entity_description.value_fn:
             return self.entity_description.value_fn(self.coordinator.data)
         return None
+
+    @property
+    def native_value(self) -> StateType:
+        if self._deadband and self._published_at:
+            return self._published
+        return self._current_value()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if not self._deadband:
+            super()._handle_coordinator_update()
+            return
+        value = self._current_value()
+        if self._is_insignificant(value):
+            # Unterdrückt: spätestens nach `max_silence` doch publizieren
+            if self._heartbeat is None:
+                remaining = self._published_at + self._max_silence - time.monotonic()
+                self._heartbeat = async_call_later(
+                    self.hass, max(0.0, remaining), self._async_heartbeat,
+                )
+            return
+        self._cancel_heartbeat()
+        self._published    = value
+        self._published_at = time.monotonic()
+        self._published_ok = self.coordinator.last_update_success
+        self.async_write_ha_state()
+
+    @callback
+    def _async_heartbeat(self, _now: datetime) -> None:
+        self._heartbeat = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _cancel_heartbeat(self) -> None:
+        if self._heartbeat is not None:
+            self._heartbeat()
+            self._heartbeat = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if self._deadband:
+            self._published    = self._current_value()
+            self._published_at = time.monotonic()
+            self._published_ok = self.coordinator.last_update_success
+            self.async_on_remove(self._cancel_heartbeat)
+
+    def _is_insignificant(self, value: StateType) -> bool:
+        """True, wenn `value` innerhalb des Deadbands liegt und kein Heartbeat fällig ist."""
+        last = self._published
+        if (
+            not self._published_at
+            or self._published_ok != self.coordinator.last_update_success
+            or time.monotonic() - self._published_at >= self._max_silence
+            or not isinstance(value, (int, float))
+            or not isinstance(last, (int, float))
+            or (value == 0) != (last == 0)
+        ):
+            return False
+        desc      = self.entity_description
+        threshold = max(desc.deadband_abs, desc.deadband_rel * abs(last))
+        return abs(value - last) < threshold
+
+
+class FoxESSDiagnosticSensor(CoordinatorEntity, SensorEntity):
+    """
+    Messwert aus `coordinator.metrics` / `client.metrics`.
+
+    Die Modbus-Werte gelten für die ganze Verbindung, bei einem RS485-
+    Gateway also für alle Charger dahinter. Bleibt auch bei Kommunika-
+    tionsfehlern verfügbar – genau dann ist die Fehlerrate interessant.
+    """
+
+    _attr_has_entity_name = True
+    entity_description: FoxESSDiagnosticSensorDescription
+
+    def __init__(self, coordinator: FoxESSChargerCoordinator,
+                 description: FoxESSDiagnosticSensorDescription, entry: ConfigEntry) -> None:
+        super().__init__(coordinator, context=frozenset({METRICS_CONTEXT}))
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name="FoxESS Charger", manufacturer="FoxESS", model="A011",
+        )
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        return self.entity_description.metrics_fn(self.coordinator)
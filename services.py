@@ -0,0 +1,309 @@
+"""Services for FoxESS EV Charger."""
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_DEVICE_ID
+from homeassistant.core import (
+    HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+import homeassistant.util.dt as dt_util
+
+from .const import DOMAIN, WORK_MODE_MAP, EXPORT_DIRECTORY
+from .export import SESSION_HEADER, sample_rows, session_rows, write_csv
+from .history import CHANNELS, RESOLUTIONS, RESOLUTION_MINUTE, RESOLUTION_QUARTER
+from .registers import REGISTERS, REGISTER_MAP, TIER_CONFIG, contiguous_runs
+from .sessions import SessionTotals
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_APPLY_PROFILE  = "apply_profile"
+SERVICE_SESSION_TOTALS = "session_totals"
+SERVICE_HISTORY        = "history"
+SERVICE_EXPORT         = "export"
+
+_WORK_MODES = {v: k for k, v in WORK_MODE_MAP.items()}
+
+# Service-Feld → Schlüssel in REGISTER_MAP
+_PROFILE_REGISTERS = {
+    "work_mode":             "work_mode",
+    "max_charging_current":  "max_charging_current_raw",
+    "max_charging_power":    "max_charging_power_raw",
+    "allowed_charge_time":   "allowed_charge_time",
+    "allowed_charge_energy": "allowed_charge_energy",
+    "time_validity":         "time_validity",
+    "default_current":       "default_current_raw",
+    "auto_phase_switch":     "auto_phase_switch",     # bool → 0/1
+    "min_switch_interval":   "min_switch_interval",
+}
+
+# Service-Feld → (Register, Umrechnung HA-Wert → Rohwert)
+PROFILE_FIELDS: dict[str, tuple[int, Callable[[Any], int]]] = {
+    name: (REGISTER_MAP[key].address, REGISTER_MAP[key].to_raw)
+    for name, key in _PROFILE_REGISTERS.items()
+}
+PROFILE_FIELDS["work_mode"] = (REGISTER_MAP["work_mode"].address, lambda v: _WORK_MODES[v])
+
+# Register → Schlüssel in `coordinator.data`
+_CONFIG_KEYS = {reg.address: reg.key for reg in REGISTERS if reg.tier == TIER_CONFIG}
+
+APPLY_PROFILE_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional("work_mode"): vol.In(list(WORK_MODE_MAP.values())),
+        vol.Optional("max_charging_current"): vol.All(
+            vol.Coerce(float), vol.Range(min=6, max=32)
+        ),
+        vol.Optional("max_charging_power"): vol.All(
+            vol.Coerce(float), vol.Range(min=0, max=22)
+        ),
+        vol.Optional("allowed_charge_time"): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=1440)
+        ),
+        vol.Optional("allowed_charge_energy"): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=999)
+        ),
+        vol.Optional("time_validity"): vol.All(
+            vol.Coerce(int), vol.Range(min=10, max=60)
+        ),
+        vol.Optional("default_current"): vol.All(
+            vol.Coerce(float), vol.Range(min=6, max=32)
+        ),
+        vol.Optional("auto_phase_switch"): cv.boolean,
+        vol.Optional("min_switch_interval"): vol.All(
+            vol.Coerce(int), vol.Range(min=5, max=30)
+        ),
+    }),
+    cv.has_at_least_one_key(*PROFILE_FIELDS),
+)
+
+SESSION_TOTALS_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("rfid"): vol.All(cv.string, lambda v: int(v, 16)),
+    vol.Optional("start"): cv.date,
+    vol.Optional("end"): cv.date,
+})
+
+# Kanal im Service ("power") → Spalte im Verlauf ("power_raw")
+_HISTORY_CHANNELS = {channel.removesuffix("_raw"): channel for channel in CHANNELS}
+
+HISTORY_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("resolution", default=RESOLUTION_MINUTE): vol.In(RESOLUTIONS),
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("channels"): vol.All(cv.ensure_list, [vol.In(list(_HISTORY_CHANNELS))]),
+})
+
+EXPORT_KINDS = ("sessions", "samples")
+
+EXPORT_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("data", default=list(EXPORT_KINDS)): vol.All(
+        cv.ensure_list, [vol.In(EXPORT_KINDS)]
+    ),
+    vol.Optional("resolution", default=RESOLUTION_QUARTER): vol.In(RESOLUTIONS),
+    vol.Optional("start"): cv.datetime,
+    vol.Optional("end"): cv.datetime,
+    vol.Optional("directory"): cv.string,
+})
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Registriert die Services (einmal für alle Config Entries)."""
+    if hass.services.has_service(DOMAIN, SERVICE_APPLY_PROFILE):
+        return
+
+    async def _async_apply_profile(call: ServiceCall) -> None:
+        await async_apply_profile(hass, call)
+
+    @callback
+    def _async_session_totals(call: ServiceCall) -> ServiceResponse:
+        return async_session_totals(hass, call)
+
+    @callback
+    def _async_history(call: ServiceCall) -> ServiceResponse:
+        return async_history(hass, call)
+
+    async def _async_export(call: ServiceCall) -> ServiceResponse:
+        return await async_export(hass, call)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_PROFILE, _async_apply_profile, schema=APPLY_PROFILE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_SESSION_TOTALS, _async_session_totals,
+        schema=SESSION_TOTALS_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_HISTORY, _async_history,
+        schema=HISTORY_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_EXPORT, _async_export,
+        schema=EXPORT_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def async_unload_services(hass: HomeAssistant) -> None:
+    hass.services.async_remove(DOMAIN, SERVICE_APPLY_PROFILE)
+    hass.services.async_remove(DOMAIN, SERVICE_SESSION_TOTALS)
+    hass.services.async_remove(DOMAIN, SERVICE_HISTORY)
+    hass.services.async_remove(DOMAIN, SERVICE_EXPORT)
+
+
+def _entries(
+    hass: HomeAssistant, device_ids: list[str] | None,
+) -> list[tuple[str, dict[str, Any]]]:
+    """(Titel, `hass.data`-Eintrag) der gewählten Charger – ohne `device_id` alle."""
+    entries: dict[str, dict] = hass.data.get(DOMAIN, {})
+    if device_ids:
+        registry  = dr.async_get(hass)
+        entry_ids: set[str] = set()
+        for device_id in device_ids:
+            if (device := registry.async_get(device_id)) is None:
+                raise HomeAssistantError(f"Unknown device {device_id}")
+            entry_ids.update(device.config_entries & entries.keys())
+    else:
+        entry_ids = set(entries)
+
+    result = []
+    for entry_id in entry_ids:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        result.append((entry.title if entry else entry_id, entries[entry_id]))
+    return result
+
+
+async def async_apply_profile(hass: HomeAssistant, call: ServiceCall) -> None:
+    """
+    Schreibt ein Ladeprofil in 0x3000–0x300B.
+
+    Nur die gesetzten Felder werden gesendet: je lückenlose Folge ein FC 0x10
+    Request. Nicht gesetzte Register dazwischen (und 0x3007–0x3009) teilen
+    den Bereich – gecachte Werte könnten mehrere Polls alt sein und würden
+    sonst zurückgeschrieben.
+    """
+    raw = {
+        register: to_raw(call.data[name])
+        for name, (register, to_raw) in PROFILE_FIELDS.items()
+        if name in call.data
+    }
+    runs = contiguous_runs(raw)
+
+    failed: list[str] = []
+    for title, data in _entries(hass, call.data.get(ATTR_DEVICE_ID)):
+        coordinator: FoxESSChargerCoordinator = data["coordinator"]
+        # Vorgemerkte Einzelwerte zuerst senden, das Profil gewinnt
+        await coordinator.write_queue.async_flush()
+
+        for run in runs:
+            values = [raw[address] for address in run]
+            _LOGGER.debug("%s: apply profile 0x%04X = %s", title, run[0], values)
+            if not await coordinator.async_write_registers(
+                run[0], values, [_CONFIG_KEYS[address] for address in run],
+            ):
+                failed.append(title)
+                break
+
+    if failed:
+        raise HomeAssistantError(f"Could not apply profile to {', '.join(failed)}")
+
+
+@callback
+def async_session_totals(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Sitzungssummen je Charger und RFID-Karte aus dem Index des Session-Trackers."""
+    chargers = []
+    for title, data in _entries(hass, call.data.get(ATTR_DEVICE_ID)):
+        per_card = data["sessions"].totals(
+            call.data.get("start"), call.data.get("end"), call.data.get("rfid"),
+        )
+        total = SessionTotals()
+        for totals in per_card.values():
+            total.add(totals)
+        chargers.append({
+            "charger": title,
+            "active":  data["sessions"].active is not None,
+            **total.as_dict(),
+            "rfid": {f"{card:08X}": totals.as_dict() for card, totals in sorted(per_card.items())},
+        })
+    return {"chargers": chargers}
+
+
+@callback
+def async_history(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """
+    Messwerte je Charger aus dem Verlauf für Diagramme, spaltenweise.
+    Ohne `start`/`end` die letzte Stunde; Zeitangaben ohne Zone gelten lokal.
+    """
+    end   = dt_util.as_utc(call.data.get("end") or dt_util.utcnow())
+    start = dt_util.as_utc(call.data.get("start") or end - timedelta(hours=1))
+    channels = tuple(
+        _HISTORY_CHANNELS[name] for name in call.data.get("channels", _HISTORY_CHANNELS)
+    )
+    return {
+        "chargers": [
+            {
+                "charger":    title,
+                "resolution": call.data["resolution"],
+                **data["history"].window(call.data["resolution"], start, end, channels),
+            }
+            for title, data in _entries(hass, call.data.get(ATTR_DEVICE_ID))
+        ],
+    }
+
+
+async def async_export(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """
+    Exportiert Sitzungslog und Messwertverlauf der gewählten Charger als CSV,
+    eine Datei je Datenart mit Spalte `charger`. Die Daten werden im Event
+    Loop als Snapshot genommen (Sitzungsliste, typisierte Arrays) und im
+    Executor über Generatoren Zeile für Zeile geschrieben.
+    """
+    directory = call.data.get("directory") or hass.config.path(EXPORT_DIRECTORY)
+    if not os.path.isabs(directory):
+        directory = hass.config.path(directory)
+    if "directory" in call.data and not hass.config.is_allowed_path(directory):
+        raise HomeAssistantError(f"Directory {directory} is not in allowlist_external_dirs")
+
+    end   = dt_util.as_utc(call.data.get("end") or dt_util.utcnow())
+    start = dt_util.as_utc(call.data["start"]) if "start" in call.data else None
+    stamp = dt_util.now().strftime("%Y%m%d_%H%M%S")
+    entries = _entries(hass, call.data.get(ATTR_DEVICE_ID))
+
+    exports: dict[str, tuple[list[str], Any]] = {}
+    if "sessions" in call.data["data"]:
+        exports["sessions"] = (SESSION_HEADER, itertools.chain.from_iterable([
+            session_rows(title, data["sessions"].sessions_between(start, end))
+            for title, data in entries
+        ]))
+    if "samples" in call.data["data"]:
+        generators = []
+        header: list[str] = []
+        for title, data in entries:
+            header, rows = data["history"].rows(
+                call.data["resolution"], start or dt_util.utc_from_timestamp(0), end,
+            )
+            generators.append(sample_rows(title, rows))
+        exports["samples"] = (["charger", *header], itertools.chain.from_iterable(generators))
+
+    files = {}
+    for kind, (header, rows) in exports.items():
+        path, count = await hass.async_add_executor_job(
+            write_csv, os.path.join(directory, f"{kind}_{stamp}.csv"), header, rows,
+        )
+        _LOGGER.debug("Exported %d %s rows to %s", count, kind, path)
+        files[kind] = {"path": path, "rows": count}
+    return {"files": files}
@@ -0,0 +1,284 @@
+"""Charging session tracker and persistent session log for FoxESS EV Charger."""
+from __future__ import annotations
+
+import bisect
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+import homeassistant.util.dt as dt_util
+
+from .const import (
+    DOMAIN, ACTIVE_STATUSES, METRICS_CONTEXT,
+    SESSION_STORAGE_VERSION, SESSION_SAVE_DELAY, SESSION_LOG_MAX, SESSION_PHASE_CURRENT,
+)
+from .registers import REGISTER_MAP
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_POWER    = REGISTER_MAP["power_raw"]
+_TOTAL    = REGISTER_MAP["total_energy_raw"]
+_CURRENTS = tuple(REGISTER_MAP[f"l{n}_current_raw"] for n in (1, 2, 3))
+_STATUS_CHARGING = 3
+
+
+@dataclass(slots=True)
+class ChargingSession:
+    """
+    Eine Ladesitzung. Gespeichert als Liste (Reihenfolge wie `ROW_FIELDS`),
+    Energie in Wh und Leistung in W als Ganzzahlen – kompakt im Store.
+    """
+
+    ROW_FIELDS = (
+        "start", "end", "energy_wh", "charging_s", "peak_w", "phases", "rfid", "stop_reason",
+    )
+
+    start:       int                # UTC Timestamp (s)
+    end:         int | None = None
+    energy_wh:   int = 0
+    charging_s:  int = 0            # Zeit im Status "charging"
+    peak_w:      int = 0
+    phases:      int = 0            # max. gleichzeitig genutzte Phasen
+    rfid:        int = 0
+    stop_reason: int | None = None
+
+    def as_row(self) -> list[Any]:
+        return [getattr(self, name) for name in self.ROW_FIELDS]
+
+    @classmethod
+    def from_row(cls, row: list[Any]) -> ChargingSession:
+        return cls(*row)
+
+    @property
+    def day(self) -> str:
+        return dt_util.as_local(dt_util.utc_from_timestamp(self.start)).date().isoformat()
+
+
+@dataclass(slots=True)
+class SessionTotals:
+    """Summen über mehrere Sitzungen."""
+
+    sessions:   int = 0
+    energy_wh:  int = 0
+    charging_s: int = 0
+
+    def add(self, other: ChargingSession | SessionTotals) -> None:
+        self.sessions   += other.sessions if isinstance(other, SessionTotals) else 1
+        self.energy_wh  += other.energy_wh
+        self.charging_s += other.charging_s
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "sessions":       self.sessions,
+            "energy_kwh":     round(self.energy_wh / 1000, 3),
+            "charging_hours": round(self.charging_s / 3600, 2),
+        }
+
+
+@dataclass
+class _ActiveState:
+    """Laufzeitdaten der aktiven Sitzung; Zählerstart und -herkunft werden mitgespeichert."""
+
+    last_at:       float = field(default_factory=time.monotonic)
+    last_power:    float = 0.0    # kW
+    charging:      bool = False
+    charging_time: float = 0.0    # s
+    integrated:    float = 0.0    # Wh aus Leistung × Zeit
+    total_start:   int | None = None
+    metered:       bool = False   # Energie stammt bereits aus dem Zähler
+
+
+class FoxESSSessionTracker:
+    """
+    Erkennt Ladesitzungen aus den Übergängen von `status`/`cc_status` und
+    summiert Energie, Ladezeit, Spitzenleistung, Phasen und RFID-Karte
+    inkrementell mit jedem Poll – ohne Recorder-Abfragen.
+
+    Beginn: Status wechselt in connected…paused. Ende: Status idle/finished
+    oder Fahrzeug abgesteckt. Energie ist die Differenz des Gesamtzählers
+    (0x1018); bei 0.1-kWh-Auflösung ohne Änderung die Integration der
+    Leistung über die Zeit. Ausgewertet werden nur gepollte Daten – ein
+    optimistisch gesetzter Status (Lade-Switch) ist noch nicht bestätigt.
+
+    Die aktive Sitzung wird verzögert mitgespeichert; HA schreibt offene
+    Store-Daten beim Beenden (EVENT_HOMEASSISTANT_FINAL_WRITE), auch ohne
+    dass der Config Entry entladen wird.
+
+    Abgeschlossene Sitzungen landen in einem Store-Log (höchstens
+    SESSION_LOG_MAX). Summen pro RFID und Tag liegen in einem Index im
+    Speicher, Abfragen über Zeiträume summieren nur die betroffenen Tage.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FoxESSChargerCoordinator,
+                 entry_id: str) -> None:
+        self._hass        = hass
+        self._coordinator = coordinator
+        self._store: Store[dict[str, Any]] = Store(
+            hass, SESSION_STORAGE_VERSION, f"{DOMAIN}.sessions.{entry_id}",
+        )
+        self.sessions: list[ChargingSession] = []
+        self.active:   ChargingSession | None = None
+        self._state    = _ActiveState()
+        self._days:     dict[str, dict[int, SessionTotals]] = {}   # Tag → RFID → Summen
+        self._day_keys: list[str] = []                              # sortiert, für bisect
+        self._unsub: CALLBACK_TYPE | None = None
+
+    # ── Lebenszyklus ──────────────────────────────────────────────────────────
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load() or {}
+        self.sessions = [ChargingSession.from_row(row) for row in stored.get("sessions", [])]
+        for session in self.sessions:
+            self._index(session)
+        if row := stored.get("active"):
+            # Nach einem Neustart weiterführen; endet beim ersten Poll ggf. sofort
+            self.active = ChargingSession.from_row(row)
+            self._state = _ActiveState(
+                charging_time=self.active.charging_s,
+                integrated=self.active.energy_wh,
+                total_start=stored.get("total_start"),
+                metered=stored.get("metered", False),
+            )
+
+    @callback
+    def async_start(self) -> None:
+        # METRICS_CONTEXT: nach jedem Poll, nie nach optimistischen Updates
+        self._unsub = self._coordinator.async_add_listener(
+            self._handle_update, frozenset({METRICS_CONTEXT}),
+        )
+        self._handle_update()
+
+    async def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        return {
+            "sessions":    [session.as_row() for session in self.sessions],
+            "active":      self.active.as_row() if self.active else None,
+            "total_start": self._state.total_start,
+            "metered":     self._state.metered,
+        }
+
+    # ── Erkennung ─────────────────────────────────────────────────────────────
+
+    @callback
+    def _handle_update(self) -> None:
+        data = self._coordinator.data
+        if not self._coordinator.last_update_success:
+            return
+        # Unvollständiger Snapshot (z.B. nur Cache-Werte) ist kein Sitzungsende
+        if not data or data.get("status") is None or data.get(_TOTAL.key) is None:
+            return
+        status = data.get("status")
+        active = status in ACTIVE_STATUSES and data.get("cc_status") != 0
+
+        if self.active is not None:
+            self._accumulate(data)
+            if not active:
+                self._finish(data)
+        elif active:
+            self._begin(data)
+        if self.active is not None:
+            self._store.async_delay_save(self._data_to_save, SESSION_SAVE_DELAY)
+
+    def _begin(self, data: dict) -> None:
+        self.active = ChargingSession(start=int(dt_util.utcnow().timestamp()))
+        self._state = _ActiveState(total_start=data.get(_TOTAL.key))
+        self._accumulate(data)
+        _LOGGER.debug("Session started (rfid %08X)", self.active.rfid)
+
+    def _accumulate(self, data: dict) -> None:
+        session, state = self.active, self._state
+        now = time.monotonic()
+        # Wert gilt bis zur nächsten Änderung: Rechteck mit der letzten Leistung
+        state.integrated += state.last_power * 1000 * (now - state.last_at) / 3600
+        if state.charging:
+            state.charging_time += now - state.last_at
+        session.charging_s = round(state.charging_time)
+        state.last_at    = now
+        state.last_power = _POWER.to_ha(data.get(_POWER.key)) or 0.0
+        state.charging   = data.get("status") == _STATUS_CHARGING
+        if state.total_start is None:
+            state.total_start = data.get(_TOTAL.key)
+
+        session.peak_w = max(session.peak_w, round(state.last_power * 1000))
+        session.phases = max(session.phases, sum(
+            (reg.to_ha(data.get(reg.key)) or 0) >= SESSION_PHASE_CURRENT for reg in _CURRENTS
+        ))
+        if data.get("rfid_card"):
+            session.rfid = data["rfid_card"]
+
+        # Zählerdifferenz bevorzugt; ein fehlender Zählerstand überschreibt
+        # einen bereits gemessenen Wert nie mit der (kleineren) Integration
+        total = data.get(_TOTAL.key)
+        if total is not None and state.total_start is not None:
+            metered = round((_TOTAL.to_ha(total) - _TOTAL.to_ha(state.total_start)) * 1000)
+            if metered > 0:
+                state.metered     = True
+                session.energy_wh = metered
+                return
+        if not state.metered:
+            session.energy_wh = round(state.integrated)
+
+    def _finish(self, data: dict) -> None:
+        session = self.active
+        session.end         = int(dt_util.utcnow().timestamp())
+        session.stop_reason = data.get("stop_reason")
+        self.active = None
+        self.sessions.append(session)
+        self._index(session)
+        if len(self.sessions) > SESSION_LOG_MAX:
+            self._unindex(self.sessions.pop(0))
+        self._store.async_delay_save(self._data_to_save, SESSION_SAVE_DELAY)
+        _LOGGER.debug(
+            "Session finished: %.2f kWh, %d s charging, rfid %08X",
+            session.energy_wh / 1000, session.charging_s, session.rfid,
+        )
+
+    # ── Index ─────────────────────────────────────────────────────────────────
+
+    def _index(self, session: ChargingSession) -> None:
+        day = session.day
+        if day not in self._days:
+            self._days[day] = {}
+            bisect.insort(self._day_keys, day)
+        self._days[day].setdefault(session.rfid, SessionTotals()).add(session)
+
+    def _unindex(self, session: ChargingSession) -> None:
+        totals = self._days[session.day][session.rfid]
+        totals.sessions   -= 1
+        totals.energy_wh  -= session.energy_wh
+        totals.charging_s -= session.charging_s
+
+    def totals(
+        self, start: date | None = None, end: date | None = None, rfid: int | None = None,
+    ) -> dict[int, SessionTotals]:
+        """Summen je RFID-Karte über die Tage `start`…`end` (jeweils inklusive)."""
+        lo = bisect.bisect_left(self._day_keys, start.isoformat()) if start else 0
+        hi = bisect.bisect_right(self._day_keys, end.isoformat()) if end else len(self._day_keys)
+        result: dict[int, SessionTotals] = {}
+        for day in self._day_keys[lo:hi]:
+            for card, totals in self._days[day].items():
+                if rfid is None or card == rfid:
+                    result.setdefault(card, SessionTotals()).add(totals)
+        return result
+
+    def sessions_between(
+        self, start: datetime | None = None, end: datetime | None = None,
+    ) -> list[ChargingSession]:
+        """Abgeschlossene Sitzungen mit Beginn in [start, end) – das Log ist nach Beginn sortiert."""
+        starts = [session.start for session in self.sessions]
+        lo = bisect.bisect_left(starts, start.timestamp()) if start else 0
+        hi = bisect.bisect_left(starts, end.timestamp()) if end else len(starts)
+        return self.sessions[lo:hi]
@@ -0,0 +1,503 @@
+"""
+Local Modbus TCP simulator for FoxESS A011 EV Chargers.
+
+Emulates the register map in `const.py` for up to 247 slave IDs behind
+one TCP gateway, including range validation of the R/W registers, the side
+effects of the write-only command registers, a simple charging model and
+scripted sessions. Latency, response loss, split frames and exception
+responses can be injected to exercise the client under bad conditions.
+
+Run standalone (with Home Assistant installed, as `const.py` needs it)::
+
+    python -m custom_components.foxess_charger.simulator --slaves 1-200 --latency 0.02
+
+or embed it in a benchmark::
+
+    sim = ChargerSimulator(slave_ids=range(1, 101), faults=FaultProfile(latency=0.01))
+    await sim.start()
+    ...
+    await sim.stop()
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .const import (
+    DEFAULT_PORT, WORK_MODE_MAP,
+    REG_DEVICE_ADDRESS, REG_SOFTWARE_VER, REG_STOP_REASON, REG_STATUS,
+    REG_CP_STATUS, REG_CC_STATUS, REG_PORT_TEMP, REG_AMBIENT_TEMP,
+    REG_L1_VOLTAGE, REG_L2_VOLTAGE, REG_L3_VOLTAGE,
+    REG_L1_CURRENT, REG_L2_CURRENT, REG_L3_CURRENT,
+    REG_ACTIVE_POWER, REG_LOCK_STATUS, REG_PHASE_SEQUENCE,
+    REG_MAX_POWER, REG_MIN_POWER, REG_MAX_CURRENT, REG_MIN_CURRENT,
+    REG_CURRENT_ENERGY, REG_TOTAL_ENERGY,
+    REG_FAULT_CODE, REG_RFID_CARD,
+    REG_WORK_MODE, REG_MAX_CHARGING_CURRENT, REG_MAX_CHARGING_POWER,
+    REG_ALLOWED_CHARGE_TIME, REG_ALLOWED_CHARGE_ENERGY, REG_TIME_VALIDITY,
+    REG_DEFAULT_CURRENT, REG_AUTO_PHASE_SWITCH, REG_MIN_SWITCH_INTERVAL,
+    REG_LOCK_CONTROL, REG_CHARGING_CONTROL, REG_PHASE_SWITCHING, REG_RESTART,
+)
+from .modbus_client import (
+    FC_READ_HOLDING, FC_WRITE_SINGLE, FC_WRITE_MULTIPLE,
+    MBAP_HEADER, MBAP_HEADER_LEN, MBAP_MAX_LENGTH, WRITE_ONLY_REGISTERS,
+)
+from .registers import MAX_READ_COUNT
+
+_LOGGER = logging.getLogger(__name__)
+
+# ── Modbus Exception Codes ────────────────────────────────────────────────────
+EXC_ILLEGAL_FUNCTION = 0x01
+EXC_ILLEGAL_ADDRESS  = 0x02
+EXC_ILLEGAL_VALUE    = 0x03
+EXC_SERVER_FAILURE   = 0x04
+EXC_GATEWAY_TARGET   = 0x0B   # Slave hinter dem Gateway antwortet nicht
+
+# ── Status-Werte (STATUS_MAP) ─────────────────────────────────────────────────
+ST_IDLE, ST_CONNECTED, ST_CHARGING, ST_FINISHED, ST_FAULT = 0, 1, 3, 5, 6
+
+MAX_SLAVE_ID = 247   # Unit ID ist ein Byte; mehr Charger → mehrere Simulatoren
+
+INPUT_RANGE = range(REG_DEVICE_ADDRESS, REG_RFID_CARD + 2)   # 0x1000–0x101D
+
+# R/W Register → gültiger Wertebereich (Rohwerte)
+HOLDING_LIMITS: dict[int, range] = {
+    REG_WORK_MODE:             range(0, len(WORK_MODE_MAP)),
+    REG_MAX_CHARGING_CURRENT:  range(60, 321),     # 6–32 A
+    REG_MAX_CHARGING_POWER:    range(0, 221),      # 0–22 kW
+    REG_ALLOWED_CHARGE_TIME:   range(0, 1441),     # min, 0 = unbegrenzt
+    REG_ALLOWED_CHARGE_ENERGY: range(0, 1000),     # kWh, 0 = unbegrenzt
+    REG_TIME_VALIDITY:         range(10, 61),      # s
+    REG_DEFAULT_CURRENT:       range(60, 321),     # 6–32 A
+    REG_AUTO_PHASE_SWITCH:     range(0, 2),
+    REG_MIN_SWITCH_INTERVAL:   range(5, 31),       # min
+}
+
+# W-Only Register → gültige Kommandos
+COMMAND_LIMITS: dict[int, set[int]] = {
+    REG_LOCK_CONTROL:     {0, 1, 2},
+    REG_CHARGING_CONTROL: {0, 1, 2},
+    REG_PHASE_SWITCHING:  {0, 1, 2},
+    REG_RESTART:          {0, 0xA5A5},
+}
+
+
+@dataclass
+class FaultProfile:
+    """Injizierte Störungen; Wahrscheinlichkeiten pro Request (0…1)."""
+
+    latency:   float = 0.0    # s, Netzwerk-RTT-Anteil (parallel für Pipelining)
+    jitter:    float = 0.0    # s, zusätzlich gleichverteilt 0…jitter
+    bus_time:  float = 0.0    # s pro Request, seriell (RS485-Bus hinter dem Gateway)
+    loss:      float = 0.0    # Antwort wird verworfen
+    split:     float = 0.0    # Antwort in zwei TCP-Segmenten
+    exception: float = 0.0    # Antwort ist Exception 0x04
+    seed:      int | None = None
+
+
+@dataclass
+class SimulatedCharger:
+    """Registerzustand und Lademodell eines einzelnen A011."""
+
+    slave_id: int
+    regs:     dict[int, int] = field(default_factory=dict)
+    offline:  bool = False    # keine Antwort (stromlos am RS485-Bus, Gateway ohne 0x0B)
+    last_command: float = field(default_factory=time.monotonic)   # letzter Stromsollwert
+    _energy: float = field(default=0.0, init=False, repr=False)   # kWh der laufenden Sitzung
+    _total:  float = field(default=0.0, init=False, repr=False)   # kWh gesamt
+    _session_start: float = field(default=0.0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.regs:
+            self.reset()
+
+    # ── Registerzugriff ───────────────────────────────────────────────────────
+
+    def reset(self) -> None:
+        """Werkszustand wie nach einem Neustart (0x4003 = 0xA5A5)."""
+        total = self._total
+        self.regs = {address: 0 for address in INPUT_RANGE}
+        self.regs.update({
+            REG_DEVICE_ADDRESS: self.slave_id,
+            REG_SOFTWARE_VER:   0x0102,
+            REG_CP_STATUS:      1,               # 12 V, nicht verbunden
+            REG_PORT_TEMP:      750,             # 25 °C (×0.1 − 50)
+            REG_AMBIENT_TEMP:   700,
+            REG_L1_VOLTAGE:     2300, REG_L2_VOLTAGE: 2300, REG_L3_VOLTAGE: 2300,
+            REG_MAX_POWER:      110,  REG_MIN_POWER:  14,
+            REG_MAX_CURRENT:    160,  REG_MIN_CURRENT: 60,
+            REG_WORK_MODE:            1,     # Plug&Charge
+            REG_MAX_CHARGING_CURRENT: 160,
+            REG_MAX_CHARGING_POWER:   110,
+            REG_ALLOWED_CHARGE_TIME:  0,
+            REG_ALLOWED_CHARGE_ENERGY: 0,
+            REG_TIME_VALIDITY:        30,
+            REG_DEFAULT_CURRENT:      60,
+            REG_AUTO_PHASE_SWITCH:    0,
+            REG_MIN_SWITCH_INTERVAL:  5,
+        })
+        self._energy = 0.0
+        self._total  = total
+        self._set_uint32(REG_TOTAL_ENERGY, int(total * 10))
+
+    def _set_uint32(self, address: int, value: int) -> None:
+        self.regs[address]     = (value >> 16) & 0xFFFF
+        self.regs[address + 1] = value & 0xFFFF
+
+    def read(self, address: int, count: int) -> list[int] | int:
+        """Registerwerte oder Exception Code."""
+        if not 1 <= count <= MAX_READ_COUNT:
+            return EXC_ILLEGAL_VALUE
+        addresses = range(address, address + count)
+        # Reservierte Register innerhalb eines Blocks liefern 0 (wie das Gerät)
+        if addresses[0] not in self.regs or addresses[-1] not in self.regs:
+            return EXC_ILLEGAL_ADDRESS
+        return [self.regs.get(a, 0) for a in addresses]
+
+    def write(self, fc: int, address: int, values: list[int]) -> int | None:
+        """Schreibt Register; None oder Exception Code."""
+        if fc == FC_WRITE_SINGLE:
+            if address not in WRITE_ONLY_REGISTERS or len(values) != 1:
+                return EXC_ILLEGAL_FUNCTION
+            if values[0] not in COMMAND_LIMITS[address]:
+                return EXC_ILLEGAL_VALUE
+            self._command(address, values[0])
+            return None
+
+        if any(address + i in WRITE_ONLY_REGISTERS for i in range(len(values))):
+            return EXC_ILLEGAL_FUNCTION
+        for offset, value in enumerate(values):
+            limits = HOLDING_LIMITS.get(address + offset)
+            if limits is None:
+                return EXC_ILLEGAL_ADDRESS
+            if value not in limits:
+                return EXC_ILLEGAL_VALUE
+        for offset, value in enumerate(values):
+            self.regs[address + offset] = value
+            if address + offset == REG_MAX_CHARGING_CURRENT:
+                self.last_command = time.monotonic()
+        return None
+
+    # ── Kommandos (0x4000–0x4003) ─────────────────────────────────────────────
+
+    def _command(self, address: int, value: int) -> None:
+        if address == REG_LOCK_CONTROL and value:
+            self.regs[REG_LOCK_STATUS] = 1 if value == 2 else 0
+        elif address == REG_CHARGING_CONTROL and value == 1:
+            self.start()
+        elif address == REG_CHARGING_CONTROL and value == 2:
+            self.stop(reason=1)   # command
+        elif address == REG_PHASE_SWITCHING:
+            self.regs[REG_PHASE_SEQUENCE] = value
+        elif address == REG_RESTART and value == 0xA5A5:
+            self.reset()
+
+    # ── Sitzung ───────────────────────────────────────────────────────────────
+
+    def plug_in(self, rfid: int = 0) -> None:
+        self.regs[REG_CC_STATUS] = 1
+        self.regs[REG_CP_STATUS] = 2    # 9 V
+        self.regs[REG_STATUS]    = ST_CONNECTED
+        self.regs[REG_STOP_REASON] = 0
+        self._set_uint32(REG_RFID_CARD, rfid)
+        if self.regs[REG_WORK_MODE] == 1:   # Plug&Charge
+            self.start()
+
+    def unplug(self) -> None:
+        if self.regs[REG_STATUS] == ST_CHARGING:
+            self.stop(reason=7)   # connector_pulled
+        self.regs[REG_CC_STATUS] = 0
+        self.regs[REG_CP_STATUS] = 1
+        self.regs[REG_STATUS]    = ST_IDLE
+        self._set_uint32(REG_RFID_CARD, 0)
+
+    def start(self) -> None:
+        if not self.regs[REG_CC_STATUS] or self.regs[REG_LOCK_STATUS] or self.regs[REG_WORK_MODE] == 2:
+            return
+        self.regs[REG_STATUS]    = ST_CHARGING
+        self.regs[REG_CP_STATUS] = 3    # 6 V
+        self._energy = 0.0
+        self._session_start = time.monotonic()
+        self.last_command   = time.monotonic()
+
+    def stop(self, reason: int) -> None:
+        if self.regs[REG_STATUS] != ST_CHARGING:
+            return
+        self.regs[REG_STATUS]      = ST_FINISHED
+        self.regs[REG_CP_STATUS]   = 2
+        self.regs[REG_STOP_REASON] = reason
+        for address in (REG_L1_CURRENT, REG_L2_CURRENT, REG_L3_CURRENT, REG_ACTIVE_POWER):
+            self.regs[address] = 0
+
+    def fault(self, code: int) -> None:
+        if self.regs[REG_STATUS] == ST_CHARGING:
+            self.stop(reason=8)   # ac_contactor
+        self.regs[REG_STATUS] = ST_FAULT
+        self._set_uint32(REG_FAULT_CODE, code)
+
+    def tick(self, dt: float, rng: random.Random) -> None:
+        """Messwerte und Energiezähler um `dt` Sekunden fortschreiben."""
+        regs = self.regs
+        for address in (REG_L1_VOLTAGE, REG_L2_VOLTAGE, REG_L3_VOLTAGE):
+            regs[address] = 2300 + rng.randint(-30, 30)
+        if regs[REG_STATUS] != ST_CHARGING:
+            return
+
+        now    = time.monotonic()
+        phases = 3 if regs[REG_PHASE_SEQUENCE] == 0 else 1
+        volts  = regs[REG_L1_VOLTAGE] * 0.1
+        current = regs[REG_MAX_CHARGING_CURRENT]
+        if regs[REG_WORK_MODE] == 0 and now - self.last_command > regs[REG_TIME_VALIDITY]:
+            current = regs[REG_DEFAULT_CURRENT]   # Befehl abgelaufen
+        amps = min(current, regs[REG_MAX_CURRENT]) * 0.1
+        if regs[REG_MAX_CHARGING_POWER]:
+            amps = min(amps, regs[REG_MAX_CHARGING_POWER] * 100 / (volts * phases))
+        kw = volts * amps * phases / 1000
+
+        for i, address in enumerate((REG_L1_CURRENT, REG_L2_CURRENT, REG_L3_CURRENT)):
+            live = i == 0 or phases == 3
+            regs[address] = max(0, int(amps * 10) + rng.randint(-1, 1)) if live else 0
+        regs[REG_ACTIVE_POWER] = int(round(kw * 10))
+        self._energy += kw * dt / 3600
+        self._total  += kw * dt / 3600
+        self._set_uint32(REG_CURRENT_ENERGY, int(self._energy * 10))
+        self._set_uint32(REG_TOTAL_ENERGY, int(self._total * 10))
+        regs[REG_PORT_TEMP] = min(1200, 750 + int(amps * 5))
+
+        if regs[REG_ALLOWED_CHARGE_ENERGY] and self._energy >= regs[REG_ALLOWED_CHARGE_ENERGY]:
+            self.stop(reason=27)  # energy_limit
+        elif (
+            regs[REG_ALLOWED_CHARGE_TIME]
+            and now - self._session_start >= regs[REG_ALLOWED_CHARGE_TIME] * 60
+        ):
+            self.stop(reason=2)   # time_completed
+
+
+# Skript-Schritt: (Wartezeit s, Aktion, Argumente) – Aktionen sind Methoden
+# von SimulatedCharger (plug_in, unplug, start, stop, fault) oder "set".
+ScriptStep = tuple[float, str, tuple]
+
+DEFAULT_SESSION: tuple[ScriptStep, ...] = (
+    (2.0,  "plug_in", (0x12345678,)),
+    (60.0, "stop",    (1,)),
+    (5.0,  "unplug",  ()),
+)
+
+
+class ChargerSimulator:
+    """asyncio Modbus TCP Gateway mit beliebig vielen simulierten Chargern."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 slave_ids: Iterable[int] = (1,),
+                 faults: FaultProfile | None = None,
+                 tick: float = 1.0) -> None:
+        self.host     = host
+        self.port     = port
+        self.faults   = faults or FaultProfile()
+        self.chargers = {sid: SimulatedCharger(sid) for sid in slave_ids}
+        if not all(1 <= sid <= MAX_SLAVE_ID for sid in self.chargers):
+            raise ValueError(f"slave ids must be 1–{MAX_SLAVE_ID}")
+        self.requests = 0           # bearbeitete Requests (für Benchmarks)
+        self._tick    = tick
+        self._rng     = random.Random(self.faults.seed)
+        self._bus     = asyncio.Lock()   # RS485: ein Request zur Zeit
+        self._server: asyncio.Server | None = None
+        self._tasks:  set[asyncio.Task] = set()
+        self._handlers: set[asyncio.Task] = set()   # je offene Client-Verbindung
+        self._writers:  set[asyncio.StreamWriter] = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._spawn(self._model_loop())
+        _LOGGER.info(
+            "Simulator on %s:%d with %d charger(s)", self.host, self.port, len(self.chargers),
+        )
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        # Verbindungen schließen statt Handler abzubrechen: die lesen EOF und enden
+        for writer in list(self._writers):
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ── Lademodell und Skripte ────────────────────────────────────────────────
+
+    async def _model_loop(self) -> None:
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self._tick)
+            now = time.monotonic()
+            for charger in self.chargers.values():
+                charger.tick(now - last, self._rng)
+            last = now
+
+    def run_script(self, slave_id: int, steps: Iterable[ScriptStep]) -> asyncio.Task:
+        """Spielt `steps` für einen Charger im Hintergrund ab."""
+        return self._spawn(self._run_script(self.chargers[slave_id], tuple(steps)))
+
+    @staticmethod
+    async def _run_script(charger: SimulatedCharger, steps: tuple[ScriptStep, ...]) -> None:
+        for delay, action, args in steps:
+            await asyncio.sleep(delay)
+            if action == "set":
+                address, value = args
+                charger.regs[address] = value
+            else:
+                getattr(charger, action)(*args)
+
+    # ── Modbus TCP ────────────────────────────────────────────────────────────
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        handler    = asyncio.current_task()
+        self._handlers.add(handler)
+        self._writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(MBAP_HEADER_LEN)
+                tid, protocol, length, unit = MBAP_HEADER.unpack(header)
+                if protocol != 0 or not 2 <= length <= MBAP_MAX_LENGTH:
+                    break   # Stream nicht mehr synchron → Verbindung schließen
+                pdu = await reader.readexactly(length - 1)
+                # Requests parallel bearbeiten: Pipelining sieht die Latenz nur einmal
+                self._spawn(self._respond(writer, write_lock, tid, unit, pdu))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, write_lock: asyncio.Lock,
+                       tid: int, unit: int, pdu: bytes) -> None:
+        charger = self.chargers.get(unit)
+        if charger is not None and charger.offline:
+            return
+        faults = self.faults
+        delay  = faults.latency + self._rng.uniform(0, faults.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+        async with self._bus:
+            if faults.bus_time:
+                await asyncio.sleep(faults.bus_time)
+            self.requests += 1
+            body = self._process(unit, pdu)
+
+        if self._rng.random() < faults.loss:
+            return
+        adu = MBAP_HEADER.pack(tid, 0, len(body) + 1, unit) + body
+        async with write_lock:
+            if writer.is_closing():
+                return
+            if len(adu) > 1 and self._rng.random() < faults.split:
+                cut = self._rng.randint(1, len(adu) - 1)
+                writer.write(adu[:cut])
+                await writer.drain()
+                await asyncio.sleep(0.005)
+                adu = adu[cut:]
+            writer.write(adu)
+            await writer.drain()
+
+    def _process(self, unit: int, pdu: bytes) -> bytes:
+        """Bearbeitet eine PDU und liefert die Antwort-PDU."""
+        fc = pdu[0]
+        charger = self.chargers.get(unit)
+        if charger is None:
+            return bytes([fc | 0x80, EXC_GATEWAY_TARGET])
+        if self._rng.random() < self.faults.exception:
+            return bytes([fc | 0x80, EXC_SERVER_FAILURE])
+
+        try:
+            if fc == FC_READ_HOLDING:
+                address, count = struct.unpack(">HH", pdu[1:5])
+                result = charger.read(address, count)
+                if isinstance(result, int):
+                    return bytes([fc | 0x80, result])
+                return bytes([fc, 2 * count]) + struct.pack(f">{count}H", *result)
+
+            if fc == FC_WRITE_SINGLE:
+                address, value = struct.unpack(">HH", pdu[1:5])
+                error = charger.write(fc, address, [value])
+                return bytes([fc | 0x80, error]) if error else pdu[:5]
+
+            if fc == FC_WRITE_MULTIPLE:
+                address, count, byte_count = struct.unpack(">HHB", pdu[1:6])
+                if byte_count != 2 * count or len(pdu) != 6 + byte_count:
+                    return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+                values = list(struct.unpack(f">{count}H", pdu[6:6 + byte_count]))
+                error = charger.write(fc, address, values)
+                return bytes([fc | 0x80, error]) if error else pdu[:5]
+        except struct.error:
+            return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+
+        return bytes([fc | 0x80, EXC_ILLEGAL_FUNCTION])
+
+
+def _parse_slaves(spec: str) -> list[int]:
+    """Slave IDs aus einer Angabe wie "1-5,9"."""
+    ids: list[int] = []
+    for part in spec.split(","):
+        first, _, last = part.partition("-")
+        ids.extend(range(int(first), int(last or first) + 1))
+    return ids
+
+
+async def _main(args: argparse.Namespace) -> None:
+    sim = ChargerSimulator(
+        args.host, args.port, _parse_slaves(args.slaves),
+        FaultProfile(
+            latency=args.latency, jitter=args.jitter, bus_time=args.bus_time,
+            loss=args.loss, split=args.split, exception=args.exception, seed=args.seed,
+        ),
+    )
+    await sim.start()
+    if args.session:
+        for slave_id in sim.chargers:
+            sim.run_script(slave_id, DEFAULT_SESSION)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--slaves", default="1", help="Slave IDs, z.B. 1-200 oder 1,3,5")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--bus-time", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0)
+    parser.add_argument("--split", type=float, default=0.0)
+    parser.add_argument("--exception", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--session", action="store_true", help="Beispielsitzung abspielen")
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""PV surplus controller for FoxESS EV Charger."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN, UnitOfPower
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event, async_track_time_interval,
+)
+
+from .const import (
+    REG_PHASE_SWITCHING, ACTIVE_STATUSES,
+    SURPLUS_NOMINAL_VOLTAGE, SURPLUS_MIN_CURRENT, SURPLUS_HYSTERESIS,
+    SURPLUS_RAMP_UP, SURPLUS_PHASE_MARGIN, SURPLUS_SINGLE_PHASE, SURPLUS_PHASE_SETTLE,
+)
+from .registers import REGISTER_MAP
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+_THREE_PHASE = 0   # REG_PHASE_SWITCHING / phase_sequence: 0 = dreiphasig
+
+_VOLTAGE     = REGISTER_MAP["l1_voltage_raw"]
+_POWER       = REGISTER_MAP["power_raw"]
+_MAX_CURRENT = REGISTER_MAP["max_current_raw"]
+_SETPOINT    = REGISTER_MAP["max_charging_current_raw"]
+
+
+class FoxESSSurplusController:
+    """
+    Regelt `max_charging_current` nach dem PV-Überschuss.
+
+    Eingang ist ein Netzleistungs-Sensor (+ Bezug / − Einspeisung, W oder
+    kW). Verfügbar für das Fahrzeug ist die aktuelle Ladeleistung minus
+    Netzbezug; daraus folgt der Sollstrom für die aktive Phasenzahl.
+
+    - Reaktion direkt auf Zustandsänderungen des Sensors, aber höchstens
+      ein Stellwert pro Regelperiode (das Fahrzeug braucht Zeit zum Folgen)
+    - Hysterese: Änderungen unter SURPLUS_HYSTERESIS werden nicht geschrieben
+    - Rampe: aufwärts höchstens SURPLUS_RAMP_UP pro Periode, abwärts sofort
+    - 1 ↔ 3 Phasen über REG_PHASE_SWITCHING, frühestens nach
+      `min_switch_interval` Minuten und nur ohne Auto-Phasenumschaltung
+    - Erneuern vor Ablauf von `time_validity` übernimmt `FoxESSKeepalive`
+
+    Unter SURPLUS_MIN_CURRENT wird mit dem Minimum weitergeladen; Laden
+    starten/stoppen bleibt Sache des Benutzers.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FoxESSChargerCoordinator,
+                 grid_entity_id: str, period: int) -> None:
+        self._hass        = hass
+        self._coordinator = coordinator
+        self._grid_entity = grid_entity_id
+        self._period      = period
+        self._lock        = asyncio.Lock()   # nie zwei Stellwerte gleichzeitig
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self._last_write  = 0.0   # monotonic, letzter Stromsollwert
+        self._last_switch = 0.0   # monotonic, letzte Phasenumschaltung
+        self._switched_to = 0     # kommandierte Phasenzahl der letzten Umschaltung
+
+    @callback
+    def async_start(self) -> None:
+        self._unsubs = [
+            async_track_state_change_event(
+                self._hass, [self._grid_entity], self._async_grid_changed
+            ),
+            async_track_time_interval(
+                self._hass, self._async_tick, timedelta(seconds=self._period)
+            ),
+        ]
+
+    async def async_stop(self) -> None:
+        while self._unsubs:
+            self._unsubs.pop()()
+        # Laufenden Regelschritt abwarten – sein Stellwert geht noch über die Verbindung
+        async with self._lock:
+            pass
+
+    async def _async_grid_changed(self, _event: Event) -> None:
+        if time.monotonic() - self._last_write >= self._period:
+            await self.async_evaluate()
+
+    async def _async_tick(self, _now: datetime) -> None:
+        await self.async_evaluate()
+
+    # ── Eingänge ──────────────────────────────────────────────────────────────
+
+    def _grid_power(self) -> float | None:
+        """Netzleistung in W (+ Bezug / − Einspeisung), None wenn unbekannt."""
+        state = self._hass.states.get(self._grid_entity)
+        if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+            return None
+        try:
+            value = float(state.state)
+        except ValueError:
+            return None
+        if state.attributes.get("unit_of_measurement") == UnitOfPower.KILO_WATT:
+            value *= 1000
+        return value
+
+    @staticmethod
+    def _voltage(data: dict) -> float:
+        volts = _VOLTAGE.to_ha(data.get(_VOLTAGE.key)) or 0
+        return volts if volts > 100 else SURPLUS_NOMINAL_VOLTAGE
+
+    # ── Regelung ──────────────────────────────────────────────────────────────
+
+    async def async_evaluate(self) -> None:
+        """Einen Regelschritt ausführen (Zeitgeber oder Sensoränderung)."""
+        if self._lock.locked():
+            return
+        async with self._lock:
+            await self._async_evaluate()
+
+    async def _async_evaluate(self) -> None:
+        data = self._coordinator.data
+        grid = self._grid_power()
+        if (
+            not data or grid is None
+            or not self._coordinator.last_update_success
+            or data.get("status") not in ACTIVE_STATUSES
+        ):
+            return
+
+        now       = time.monotonic()
+        volts     = self._voltage(data)
+        phases    = 3 if data.get("phase_sequence") == _THREE_PHASE else 1
+        if self._switched_to and now - self._last_switch < SURPLUS_PHASE_SETTLE:
+            phases = self._switched_to   # Umschaltung noch nicht im Poll sichtbar
+        available = (_POWER.to_ha(data.get(_POWER.key)) or 0) * 1000 - grid   # kW → W
+        max_current = _MAX_CURRENT.to_ha(data.get(_MAX_CURRENT.key)) or 32.0
+
+        phases = await self._async_switch_phases(data, phases, available, volts, now)
+        target = available / (phases * volts)
+
+        # Aktueller Sollwert bei jeder Auswertung: auch Entity, Service oder
+        # eine neue Sitzung können ihn geändert haben
+        commanded = _SETPOINT.to_ha(self._coordinator.value(_SETPOINT.key)) or 0
+        if target > commanded:
+            target = min(target, commanded + SURPLUS_RAMP_UP)
+        target = round(min(max(target, SURPLUS_MIN_CURRENT), max_current), 1)
+        if abs(target - commanded) < SURPLUS_HYSTERESIS:
+            return
+
+        _LOGGER.debug(
+            "Surplus: grid %.0f W, available %.0f W → %.1f A on %d phase(s)",
+            grid, available, target, phases,
+        )
+        if await self._coordinator.async_write_register(
+            _SETPOINT.address, _SETPOINT.to_raw(target), _SETPOINT.key,
+        ):
+            self._last_write = now
+
+    async def _async_switch_phases(
+        self, data: dict, phases: int, available: float, volts: float, now: float,
+    ) -> int:
+        """Wechselt bei Bedarf 1 ↔ 3 Phasen und liefert die (neue) Phasenzahl."""
+        if data.get("auto_phase_switch") == 1:
+            return phases   # Charger entscheidet selbst
+        interval = (data.get("min_switch_interval") or 0) * 60
+        if self._last_switch and now - self._last_switch < interval:
+            return phases
+
+        if phases == 3 and available / (3 * volts) < SURPLUS_MIN_CURRENT <= available / volts:
+            wanted, value = 1, SURPLUS_SINGLE_PHASE
+        elif (
+            phases == 1
+            and available / (3 * volts) >= SURPLUS_MIN_CURRENT + SURPLUS_PHASE_MARGIN
+        ):
+            wanted, value = 3, _THREE_PHASE
+        else:
+            return phases
+
+        _LOGGER.info("Surplus: switching to %d phase(s) (available %.0f W)", wanted, available)
+        if not await self._coordinator.async_write_register(REG_PHASE_SWITCHING, value):
+            return phases
+        self._last_switch = now
+        self._switched_to = wanted
+        return wanted
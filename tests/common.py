@@ -0,0 +1,63 @@
+"""Test helpers: a minimal running Home Assistant and charger config entries."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from homeassistant import loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.core import CoreState, HomeAssistant
+from homeassistant.helpers import (
+    area_registry, device_registry, entity, entity_registry, floor_registry,
+    issue_registry, label_registry, restore_state, template, translation,
+)
+
+from custom_components.foxess_charger import FoxESSChargerCoordinator
+from custom_components.foxess_charger.const import (
+    DOMAIN, CONF_HOST, CONF_PORT, CONF_SLAVE_ID,
+)
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+
+@asynccontextmanager
+async def async_test_home_assistant(config_dir: str) -> AsyncIterator[HomeAssistant]:
+    """Laufende HA-Instanz mit Registries und Config Entries, ohne Recorder/HTTP."""
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    entity.async_setup(hass)
+    template.async_setup(hass)
+    for registry in (
+        area_registry, device_registry, entity_registry, floor_registry,
+        label_registry, issue_registry,
+    ):
+        await registry.async_load(hass)
+    await restore_state.async_load(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.set_state(CoreState.running)
+    try:
+        yield hass
+    finally:
+        if hass.state is not CoreState.not_running:
+            await hass.async_stop(force=True)
+
+
+async def async_setup_charger(
+    hass: HomeAssistant, simulator: ChargerSimulator, slave_id: int = 1, **options: Any,
+) -> ConfigEntry:
+    """Legt einen Config Entry für `slave_id` am Simulator an und lädt ihn."""
+    entry = ConfigEntry(
+        version=1, minor_version=1, domain=DOMAIN, title=f"Charger {slave_id}",
+        data={CONF_HOST: simulator.host, CONF_PORT: simulator.port, CONF_SLAVE_ID: slave_id},
+        source="user", options={"scan_interval": 5, **options},
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    return entry
+
+
+def coordinator_of(hass: HomeAssistant, entry: ConfigEntry) -> FoxESSChargerCoordinator:
+    return hass.data[DOMAIN][entry.entry_id]["coordinator"]
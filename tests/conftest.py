@@ -0,0 +1,53 @@
+"""Shared fixtures: the integration runs as `custom_components.foxess_charger` against `ChargerSimulator`."""
+from __future__ import annotations
+
+import asyncio
+import inspect
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Das Repo-Verzeichnis ist selbst das Integrationspaket: über einen Symlink
+# als custom_components/foxess_charger einbinden, wie in einer HA-Installation
+_ROOT = Path(__file__).resolve().parent.parent
+_CUSTOM = Path(tempfile.mkdtemp(prefix="foxess_charger_tests_"))
+(_CUSTOM / "custom_components").mkdir()
+(_CUSTOM / "custom_components" / "foxess_charger").symlink_to(_ROOT, target_is_directory=True)
+sys.path.insert(0, str(_CUSTOM))
+
+from custom_components.foxess_charger.simulator import ChargerSimulator, FaultProfile  # noqa: E402
+
+from common import async_test_home_assistant  # noqa: E402
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    """Coroutine-Tests in einem eigenen Event Loop ausführen (kein pytest-asyncio nötig)."""
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    kwargs = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**kwargs))
+    return True
+
+
+@pytest.fixture
+def faults() -> FaultProfile:
+    """Störungsprofil des Simulators; Tests setzen einzelne Störungen vor dem Start."""
+    return FaultProfile(seed=1)
+
+
+@pytest.fixture
+def simulator(faults: FaultProfile) -> ChargerSimulator:
+    """
+    Nicht gestarteter Simulator mit Slave ID 1 – Start/Stop im Test-Loop.
+    Das Lademodell tickt praktisch nie, Registerwerte bleiben vergleichbar.
+    """
+    return ChargerSimulator("127.0.0.1", 0, slave_ids=[1], faults=faults, tick=3600)
+
+
+@pytest.fixture
+def ha(tmp_path: Path):
+    """`async with ha() as hass:` – Home Assistant im Test-Loop, Konfiguration in `tmp_path`."""
+    return lambda: async_test_home_assistant(str(tmp_path))
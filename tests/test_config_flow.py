@@ -0,0 +1,45 @@
+"""Options flow tests: interval bounds and ordering."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.foxess_charger.const import (
+    CONF_FAST_SCAN_INTERVAL, CONF_IDLE_SCAN_INTERVAL,
+)
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger
+
+
+@pytest.mark.parametrize(
+    ("scan", "fast", "idle", "error"),
+    [
+        (4,  2, 60, "scan_interval_too_low"),
+        (10, 1, 60, "fast_scan_interval_too_low"),
+        (10, 2, 5,  "scan_interval_order"),
+        (5,  5, 5,  None),
+    ],
+)
+async def test_options_interval_bounds(
+    ha, simulator: ChargerSimulator, scan: int, fast: int, idle: int, error: str | None,
+) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry  = await async_setup_charger(hass, simulator)
+            result = await hass.config_entries.options.async_init(entry.entry_id)
+            result = await hass.config_entries.options.async_configure(result["flow_id"], {
+                "scan_interval":         scan,
+                CONF_FAST_SCAN_INTERVAL: fast,
+                CONF_IDLE_SCAN_INTERVAL: idle,
+            })
+            if error is None:
+                assert result["type"] == FlowResultType.CREATE_ENTRY
+                assert entry.options[CONF_FAST_SCAN_INTERVAL] == fast
+            else:
+                assert result["type"] == FlowResultType.FORM
+                assert result["errors"] == {"base": error}
+    finally:
+        await simulator.stop()
@@ -0,0 +1,157 @@
+"""Coordinator tests: tiered polling and change-only listener notifications."""
+from __future__ import annotations
+
+import pytest
+
+from homeassistant.core import callback
+
+from custom_components.foxess_charger.const import (
+    CONFIG_REFRESH_CYCLES, METRICS_CONTEXT,
+    REG_L1_VOLTAGE, REG_TIME_VALIDITY, REG_WORK_MODE,
+)
+from custom_components.foxess_charger.registers import TIER_KEYS, TIER_STATIC
+from custom_components.foxess_charger.simulator import EXC_ILLEGAL_ADDRESS, ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+def _counter(coordinator, context: frozenset[str]) -> list[int]:
+    calls = [0]
+
+    @callback
+    def listener() -> None:
+        calls[0] += 1
+
+    coordinator.async_add_listener(listener, context)
+    return calls
+
+
+# ── Refresh-Tiers ─────────────────────────────────────────────────────────────
+
+async def test_tiers_read_config_every_n_polls(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            # Erster Poll: Live + Static in einem Block, dazu Config
+            assert simulator.requests == 2
+            assert TIER_KEYS[TIER_STATIC] <= coordinator.data.keys()
+
+            requests = []
+            for _ in range(CONFIG_REFRESH_CYCLES):
+                before = simulator.requests
+                await coordinator.async_refresh()
+                requests.append(simulator.requests - before)
+            assert requests == [1] * (CONFIG_REFRESH_CYCLES - 1) + [2]
+            # Gecachte Werte bleiben in `data`
+            assert coordinator.data["software_version"] == 0x0102
+            assert coordinator.data["time_validity"] == 30
+    finally:
+        await simulator.stop()
+
+
+async def test_config_change_picked_up_on_config_tier(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            simulator.chargers[1].regs[REG_TIME_VALIDITY] = 50
+            for _ in range(CONFIG_REFRESH_CYCLES - 1):
+                await coordinator.async_refresh()
+                assert coordinator.data["time_validity"] == 30
+            await coordinator.async_refresh()
+            assert coordinator.data["time_validity"] == 50
+    finally:
+        await simulator.stop()
+
+
+async def test_live_block_failure_fails_poll(
+    ha, simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await simulator.start()
+    charger = simulator.chargers[1]
+    read = charger.read
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+
+            def live_block_lost(address: int, count: int) -> list[int] | int:
+                return EXC_ILLEGAL_ADDRESS if address < REG_WORK_MODE else read(address, count)
+
+            monkeypatch.setattr(charger, "read", live_block_lost)
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            assert coordinator.metrics.skipped_blocks == 1
+            assert coordinator.metrics.failures == 1
+
+            monkeypatch.setattr(charger, "read", read)
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+            assert coordinator.data["time_validity"] == 30
+    finally:
+        await simulator.stop()
+
+
+# ── Change-only Benachrichtigung ──────────────────────────────────────────────
+
+async def test_listeners_only_for_changed_keys(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            voltage = _counter(coordinator, frozenset({"l1_voltage_raw"}))
+            status  = _counter(coordinator, frozenset({"status"}))
+            metrics = _counter(coordinator, frozenset({METRICS_CONTEXT}))
+
+            await coordinator.async_refresh()
+            assert (voltage[0], status[0], metrics[0]) == (0, 0, 1)
+
+            simulator.chargers[1].regs[REG_L1_VOLTAGE] = 2351
+            await coordinator.async_refresh()
+            assert (voltage[0], status[0], metrics[0]) == (1, 0, 2)
+            assert coordinator.data["l1_voltage_raw"] == 2351
+    finally:
+        await simulator.stop()
+
+
+async def test_metrics_listeners_skip_writes(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            metrics  = _counter(coordinator, frozenset({METRICS_CONTEXT}))
+            validity = _counter(coordinator, frozenset({"time_validity"}))
+
+            # Optimistisches Update und Read-back sind keine Polls
+            coordinator.async_set_key("status", 3)
+            assert await coordinator.async_write_registers(
+                REG_TIME_VALIDITY, [45], ["time_validity"],
+            )
+            assert metrics[0] == 0
+            assert validity[0] == 1
+            assert coordinator.data["time_validity"] == 45
+
+            await coordinator.async_refresh()
+            assert metrics[0] == 1
+    finally:
+        await simulator.stop()
+
+
+async def test_unavailable_reaches_all_listeners(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            voltage = _counter(coordinator, frozenset({"l1_voltage_raw"}))
+
+            simulator.faults.exception = 1.0   # jede Antwort Exception 0x04
+            await coordinator.async_refresh()
+            assert not coordinator.last_update_success
+            assert voltage[0] == 1
+
+            simulator.faults.exception = 0.0
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+            assert voltage[0] == 2
+    finally:
+        await simulator.stop()
@@ -0,0 +1,66 @@
+"""Export tests: CSV content from the service and unique file names."""
+from __future__ import annotations
+
+import csv
+from pathlib import Path
+
+from custom_components.foxess_charger.const import DOMAIN, REG_TOTAL_ENERGY
+from custom_components.foxess_charger.export import SESSION_HEADER, write_csv
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+def _read(path: str) -> list[list[str]]:
+    with open(path, newline="", encoding="utf-8") as file:
+        return list(csv.reader(file))
+
+
+async def test_export_sessions_and_samples(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    charger = simulator.chargers[1]
+    charger._set_uint32(REG_TOTAL_ENERGY, 120)
+    try:
+        async with ha() as hass:
+            entry       = await async_setup_charger(hass, simulator)
+            coordinator = coordinator_of(hass, entry)
+            charger.plug_in(rfid=0xCAFE)
+            await coordinator.async_refresh()
+            charger._set_uint32(REG_TOTAL_ENERGY, 142)
+            charger.stop(reason=1)
+            await coordinator.async_refresh()
+
+            response = await hass.services.async_call(
+                DOMAIN, "export", {"resolution": "raw"}, blocking=True, return_response=True,
+            )
+            files = response["files"]
+
+            sessions = _read(files["sessions"]["path"])
+            assert sessions[0] == SESSION_HEADER
+            assert files["sessions"]["rows"] == len(sessions) - 1 == 1
+            assert sessions[1][0] == entry.title
+            assert float(sessions[1][3]) == 2.2
+            assert sessions[1][7] == "0000CAFE"
+
+            samples = _read(files["samples"]["path"])
+            assert samples[0][:3] == ["charger", "time", "power"]
+            assert files["samples"]["rows"] == len(samples) - 1 == 2
+    finally:
+        await simulator.stop()
+
+
+def test_write_csv_never_overwrites(tmp_path: Path) -> None:
+    path = str(tmp_path / "exports" / "sessions_20260101_120000.csv")
+    first,  count = write_csv(path, ["a"], [(1,), (2,)])
+    second, _     = write_csv(path, ["a"], [(3,)])
+    third,  _     = write_csv(path, ["a"], [])
+    assert (first, count) == (path, 2)
+    assert second.endswith("sessions_20260101_120000_2.csv")
+    assert third.endswith("sessions_20260101_120000_3.csv")
+    assert _read(first) == [["a"], ["1"], ["2"]]
+    assert _read(second) == [["a"], ["3"]]
+    assert sorted(p.name for p in (tmp_path / "exports").iterdir()) == [
+        "sessions_20260101_120000.csv",
+        "sessions_20260101_120000_2.csv",
+        "sessions_20260101_120000_3.csv",
+    ]
@@ -0,0 +1,70 @@
+"""Fleet tests: shared gateway connection, staggered polls and setup cleanup."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from homeassistant.config_entries import ConfigEntryState
+
+from custom_components.foxess_charger.const import CONF_IDLE_SCAN_INTERVAL, DOMAIN
+from custom_components.foxess_charger.fleet import async_get_fleet
+from custom_components.foxess_charger.history import FoxESSHistory
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+async def test_polls_staggered_on_shared_gateway(ha) -> None:
+    simulator = ChargerSimulator("127.0.0.1", 0, slave_ids=[1, 2], tick=3600)
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            # Idle-Charger: 0.4 s statt 60 s, damit im Test mehrere Runden laufen
+            options = {CONF_IDLE_SCAN_INTERVAL: 0.4}
+            entries = [
+                await async_setup_charger(hass, simulator, slave_id, **options)
+                for slave_id in (1, 2)
+            ]
+            coordinators = [coordinator_of(hass, entry) for entry in entries]
+            assert coordinators[0].client._connection is coordinators[1].client._connection
+
+            polls: dict[int, list[float]] = {1: [], 2: []}
+            for slave_id, coordinator in zip((1, 2), coordinators):
+                refresh = coordinator.async_refresh
+
+                async def recorded(slave_id=slave_id, refresh=refresh) -> None:
+                    polls[slave_id].append(hass.loop.time())
+                    await refresh()
+
+                coordinator.async_refresh = recorded
+
+            await asyncio.sleep(1.3)
+            assert len(polls[1]) >= 3 and len(polls[2]) >= 3
+            # Halbes Intervall Abstand zwischen den beiden Chargern
+            for first in polls[1]:
+                assert min(abs(first - second) for second in polls[2]) > 0.1
+    finally:
+        await simulator.stop()
+
+
+async def test_failed_setup_releases_connection(
+    ha, simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def broken_load(self) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(FoxESSHistory, "async_load", broken_load)
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry = await async_setup_charger(hass, simulator)
+            assert entry.state is ConfigEntryState.SETUP_ERROR
+
+            fleet = async_get_fleet(hass)
+            assert not fleet._gateways
+            assert not fleet._timers
+            assert DOMAIN not in hass.data
+            assert not hass.services.async_services().get(DOMAIN)
+    finally:
+        await simulator.stop()
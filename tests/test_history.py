@@ -0,0 +1,71 @@
+"""History tests: open intervals and tiers survive a Home Assistant restart."""
+from __future__ import annotations
+
+from custom_components.foxess_charger.const import DOMAIN, REG_ACTIVE_POWER
+from custom_components.foxess_charger.history import (
+    CHANNELS, RESOLUTION_MINUTE, RESOLUTION_QUARTER, _FILE_HEADER, _FILE_MAGIC_V1,
+    FoxESSHistory,
+)
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+def _history(hass, entry) -> FoxESSHistory:
+    return hass.data[DOMAIN][entry.entry_id]["history"]
+
+
+def _bucket_state(history: FoxESSHistory) -> dict[str, tuple]:
+    return {
+        name: (bucket.start, bucket.count, bucket.mins, bucket.maxs, bucket.sums)
+        for name, bucket in history._buckets.items()
+    }
+
+
+async def test_open_intervals_survive_restart(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    charger = simulator.chargers[1]
+    try:
+        # Beenden ohne Entladen: nur FINAL_WRITE sichert den Verlauf
+        async with ha() as hass:
+            entry       = await async_setup_charger(hass, simulator)
+            coordinator = coordinator_of(hass, entry)
+            for power in (0, 37, 74):
+                charger.regs[REG_ACTIVE_POWER] = power
+                await coordinator.async_refresh()
+            before = _bucket_state(_history(hass, entry))
+
+        async with ha() as hass:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            history = _history(hass, entry)
+            assert _bucket_state(history) == before
+
+            # Weiter füllen: gleiches Intervall zählt hoch, sonst abgeschlossen
+            await coordinator_of(hass, entry).async_refresh()
+            for name, (seconds, ring) in history.tiers.items():
+                bucket = history._buckets[name]
+                if bucket.start == before[name][0]:
+                    assert bucket.count == before[name][1] + 1
+                else:
+                    assert ring.size == 1
+                    assert ring.columns["t"][0] == before[name][0]
+    finally:
+        await simulator.stop()
+
+
+async def test_reads_files_without_open_intervals(ha) -> None:
+    async with ha() as hass:
+        written = FoxESSHistory(hass, None, "legacy")
+        _seconds, ring = written.tiers[RESOLUTION_MINUTE]
+        ring.append((600, *range(3 * len(CHANNELS))))
+        payload = _FILE_HEADER.pack(_FILE_MAGIC_V1, len(CHANNELS), len(written.tiers)) + b"".join(
+            ring.to_bytes() for _seconds, ring in written.tiers.values()
+        )
+        await hass.async_add_executor_job(written._write, payload)
+
+        history = FoxESSHistory(hass, None, "legacy")
+        await history.async_load()
+        assert history.tiers[RESOLUTION_MINUTE][1].size == 1
+        assert history.tiers[RESOLUTION_QUARTER][1].size == 0
+        assert history._buckets == dict.fromkeys(history.tiers)
@@ -0,0 +1,101 @@
+"""Keepalive tests: re-sending the setpoint, backoff on failures and cancellation."""
+from __future__ import annotations
+
+import logging
+
+import pytest
+
+from custom_components.foxess_charger import keepalive as keepalive_module
+from custom_components.foxess_charger.const import REG_MAX_CHARGING_CURRENT, REG_WORK_MODE
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+@pytest.fixture
+def delays(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Geplante Keepalive-Abstände statt echter Timer."""
+    planned: list[float] = []
+
+    def call_later(_hass, delay, _action):
+        planned.append(delay)
+        return lambda: None
+
+    monkeypatch.setattr(keepalive_module, "async_call_later", call_later)
+    return planned
+
+
+async def _controlled(hass, simulator: ChargerSimulator):
+    """Charger im Controlled-Modus mit geschriebenem Sollwert 10.0 A."""
+    simulator.chargers[1].regs[REG_WORK_MODE] = 0
+    coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+    assert await coordinator.async_write_registers(
+        REG_MAX_CHARGING_CURRENT, [100], ["max_charging_current_raw"],
+    )
+    return coordinator
+
+
+async def test_resends_setpoint_before_validity_ends(
+    ha, simulator: ChargerSimulator, delays: list[float],
+) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = await _controlled(hass, simulator)
+            assert delays == [27]   # time_validity 30 s − Marge
+            commanded = simulator.chargers[1].last_command
+
+            await coordinator.keepalive._async_refresh(None)
+            assert simulator.chargers[1].last_command > commanded
+            assert simulator.chargers[1].regs[REG_MAX_CHARGING_CURRENT] == 100
+            assert delays == [27, 27]
+    finally:
+        await simulator.stop()
+
+
+async def test_failures_back_off_and_warn_once(
+    ha, simulator: ChargerSimulator, delays: list[float],
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture,
+) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = await _controlled(hass, simulator)
+            results = [False] * 6 + [True]
+
+            async def write_registers(_address: int, _values: list[int]) -> bool:
+                return results.pop(0)
+
+            monkeypatch.setattr(coordinator.client, "write_registers", write_registers)
+            caplog.set_level(logging.INFO, logger=keepalive_module.__name__)
+            for _ in range(7):
+                await coordinator.keepalive._async_refresh(None)
+
+            assert delays[1:] == [1, 2, 4, 8, 16, 27, 27]
+            messages = [record.getMessage() for record in caplog.records]
+            assert sum("could not re-send" in message for message in messages) == 1
+            assert any("after 6 failed attempts" in message for message in messages)
+    finally:
+        await simulator.stop()
+
+
+async def test_cancel_during_write_stops_keepalive(
+    ha, simulator: ChargerSimulator, delays: list[float], monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = await _controlled(hass, simulator)
+            keepalive = coordinator.keepalive
+
+            async def write_registers(_address: int, _values: list[int]) -> bool:
+                keepalive.async_cancel()   # Entladen, während der Write läuft
+                return True
+
+            monkeypatch.setattr(coordinator.client, "write_registers", write_registers)
+            await keepalive._async_refresh(None)
+            keepalive.async_note_setpoint(120)
+            assert delays == [27]
+            assert keepalive._unsub is None
+    finally:
+        await simulator.stop()
@@ -0,0 +1,369 @@
+"""Modbus TCP client tests against the local charger simulator."""
+from __future__ import annotations
+
+import asyncio
+import struct
+
+import pytest
+
+from custom_components.foxess_charger import modbus_client
+from custom_components.foxess_charger.const import (
+    REG_DEVICE_ADDRESS, REG_L1_VOLTAGE, REG_WORK_MODE, REG_MAX_CHARGING_CURRENT,
+    REG_DEFAULT_CURRENT, REG_AUTO_PHASE_SWITCH, REG_MIN_SWITCH_INTERVAL,
+)
+from custom_components.foxess_charger.modbus_client import (
+    AsyncFoxESSModbusClient, CircuitBreaker, FoxESSModbusClient,
+    ModbusFrameError, ModbusTcpConnection, PIPELINE_FALLBACK_AFTER, RESERVED_REGISTERS,
+    _FoxESSModbusProtocol, _is_stale,
+)
+from custom_components.foxess_charger.metrics import ModbusMetrics
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+# Live-, Konfigurations- und Statik-Block wie beim Poll
+BLOCKS = [(REG_DEVICE_ADDRESS, 16), (REG_DEVICE_ADDRESS + 16, 14), (REG_WORK_MODE, 12)]
+
+
+def _regs(payload: memoryview | None) -> list[int]:
+    assert payload is not None
+    return list(struct.unpack(f">{len(payload) // 2}H", payload))
+
+
+def _expected(simulator: ChargerSimulator, address: int, count: int) -> list[int]:
+    return simulator.chargers[1].read(address, count)
+
+
+# ── Framing ───────────────────────────────────────────────────────────────────
+
+async def test_split_frames_async(simulator: ChargerSimulator) -> None:
+    simulator.faults.split = 1.0
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1, pipeline_window=3)
+    try:
+        for _ in range(3):
+            payloads = await client.read_blocks(BLOCKS)
+            for payload, (address, count) in zip(payloads, BLOCKS):
+                assert _regs(payload) == _expected(simulator, address, count)
+        assert client.metrics.retries == 0
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_split_frames_sync(simulator: ChargerSimulator) -> None:
+    simulator.faults.split = 1.0
+    await simulator.start()
+    client = FoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    try:
+        for _ in range(3):
+            regs = await asyncio.to_thread(client.read_registers, REG_L1_VOLTAGE, 3)
+            assert regs == _expected(simulator, REG_L1_VOLTAGE, 3)
+        assert client.metrics.retries == 0
+    finally:
+        await asyncio.to_thread(client.disconnect)
+        await simulator.stop()
+
+
+async def test_stale_frame_discarded_sync(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    client = FoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    try:
+        assert await asyncio.to_thread(client.read_registers, REG_WORK_MODE, 1) is not None
+        # Antwort auf einen abgelaufenen Request steht vor der erwarteten im Stream
+        client._sock.sendall(client._read_request(REG_DEVICE_ADDRESS, 2))
+        regs = await asyncio.to_thread(client.read_registers, REG_L1_VOLTAGE, 3)
+        assert regs == _expected(simulator, REG_L1_VOLTAGE, 3)
+        assert client.metrics.retries == 0
+    finally:
+        await asyncio.to_thread(client.disconnect)
+        await simulator.stop()
+
+
+async def test_stale_frame_discarded_async(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    connection = client._connection
+    try:
+        assert await client.read_registers(REG_WORK_MODE, 1) is not None
+        stale_tid = connection._next_tid()
+        connection._writer.write(modbus_client._build_adu(
+            stale_tid, 1, client._read_pdu(REG_DEVICE_ADDRESS, 2),
+        ))
+        for _ in range(2):
+            assert await client.read_registers(REG_L1_VOLTAGE, 3) == _expected(
+                simulator, REG_L1_VOLTAGE, 3,
+            )
+        assert client.metrics.retries == 0
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+def test_transaction_id_window() -> None:
+    assert _is_stale(9, 10)
+    assert _is_stale(0xFFFE, 2)            # Überlauf der TID
+    assert not _is_stale(10, 10)
+    assert not _is_stale(11, 10)
+    protocol = _FoxESSModbusProtocol("127.0.0.1", 502, 1)
+    assert not protocol._accept_frame(9, 10)
+    with pytest.raises(ModbusFrameError):
+        protocol._accept_frame(500, 10)
+
+
+# ── Pipelining ────────────────────────────────────────────────────────────────
+
+async def test_pipelined_read(simulator: ChargerSimulator) -> None:
+    simulator.faults.latency = 0.02
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1, pipeline_window=4)
+    try:
+        payloads = await client.read_blocks(BLOCKS * 2)
+        for payload, (address, count) in zip(payloads, BLOCKS * 2):
+            assert _regs(payload) == _expected(simulator, address, count)
+        assert client._connection.effective_window == 4
+        assert simulator.requests == len(BLOCKS) * 2
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_pipelining_fallback_and_reprobe(
+    simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1, pipeline_window=4)
+    connection = client._connection
+    exchange = connection._exchange
+    pipelining_broken = True
+
+    async def gateway(requests, window, responses, rtts) -> None:
+        # Gateway, das bei mehreren offenen Requests nicht antwortet
+        if pipelining_broken and window > 1:
+            raise asyncio.TimeoutError
+        await exchange(requests, window, responses, rtts)
+
+    monkeypatch.setattr(connection, "_exchange", gateway)
+    try:
+        # Einzelne Fehlschläge lassen das Fenster unverändert
+        for _ in range(PIPELINE_FALLBACK_AFTER - 1):
+            assert all(await client.read_blocks(BLOCKS))
+            assert connection.effective_window == 4
+        assert all(await client.read_blocks(BLOCKS))
+        assert connection.effective_window == 1
+        assert connection.pipeline_window == 4
+        assert connection.breaker.state == CircuitBreaker.CLOSED
+
+        # Seriell keine weiteren Fehlschläge; nach dem Intervall wird neu probiert
+        retries = client.metrics.retries
+        assert all(await client.read_blocks(BLOCKS))
+        assert client.metrics.retries == retries
+        connection._serial_until = 0.0
+        assert connection.effective_window == 4
+
+        pipelining_broken = False
+        assert all(await client.read_blocks(BLOCKS))
+        assert connection.effective_window == 4
+        assert connection._pipeline_failures == 0
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_partial_batch_counts_each_request_once(
+    simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1, pipeline_window=4)
+    connection = client._connection
+    exchange = connection._exchange
+    calls = 0
+
+    async def lossy(requests, window, responses, rtts) -> None:
+        # Erster Versuch: nur die erste Antwort kommt an
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            first, rtt = [None], [None]
+            await exchange(requests[:1], 1, first, rtt)
+            responses[0], rtts[0] = first[0], rtt[0]
+            raise asyncio.TimeoutError
+        await exchange(requests, window, responses, rtts)
+
+    monkeypatch.setattr(connection, "_exchange", lossy)
+    try:
+        assert all(await client.read_blocks(BLOCKS))
+        assert simulator.requests == len(BLOCKS)
+        stats = client.metrics.as_dict()["requests"]
+        assert [entry["requests"] for entry in stats.values()] == [1] * len(BLOCKS)
+        assert [entry["errors"] for entry in stats.values()] == [0] * len(BLOCKS)
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+# ── Circuit Breaker ───────────────────────────────────────────────────────────
+
+def test_breaker_transitions() -> None:
+    breaker = CircuitBreaker(ModbusMetrics(), threshold=2)
+    assert breaker.record_failure(0.0) is None
+    delay = breaker.record_failure(0.0)
+    assert delay is not None and breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow(delay / 2)
+    assert breaker.allow(delay)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Gescheiterte Probe öffnet sofort wieder, mit längerem Backoff-Exponenten
+    assert breaker.record_failure(delay) is not None
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow(breaker.retry_at)
+    assert breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+async def test_breaker_open_half_open_close(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    port = simulator.port
+    client = AsyncFoxESSModbusClient("127.0.0.1", port, 1, read_timeout=0.5)
+    breaker = client._connection.breaker
+    try:
+        assert await client.read_registers(REG_WORK_MODE, 1) is not None
+        await simulator.stop()
+
+        for _ in range(modbus_client.CIRCUIT_FAILURE_THRESHOLD):
+            assert await client.read_registers(REG_WORK_MODE, 1) is None
+        assert breaker.state == CircuitBreaker.OPEN
+        # Offen: kein Verbindungsversuch
+        connects = client.metrics.connect_failures
+        assert await client.read_registers(REG_WORK_MODE, 1) is None
+        assert client.metrics.backoff_skips == 1
+        assert client.metrics.connect_failures == connects
+
+        # Half-open Probe scheitert → wieder offen
+        breaker.retry_at = 0.0
+        assert await client.read_registers(REG_WORK_MODE, 1) is None
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # Half-open Probe gelingt → geschlossen
+        simulator = ChargerSimulator("127.0.0.1", port, slave_ids=[1], tick=3600)
+        await simulator.start()
+        breaker.retry_at = 0.0
+        assert await client.read_registers(REG_WORK_MODE, 1) == _expected(simulator, REG_WORK_MODE, 1)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert client.metrics.circuit_opens == 2
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_silent_slave_does_not_affect_gateway() -> None:
+    simulator = ChargerSimulator("127.0.0.1", 0, slave_ids=[1, 2], tick=3600)
+    await simulator.start()
+    connection = ModbusTcpConnection("127.0.0.1", simulator.port, read_timeout=0.2)
+    healthy = AsyncFoxESSModbusClient(
+        "127.0.0.1", simulator.port, 1, connection=connection,
+    )
+    silent  = AsyncFoxESSModbusClient(
+        "127.0.0.1", simulator.port, 2, connection=connection,
+    )
+    simulator.chargers[2].offline = True
+    try:
+        for _ in range(modbus_client.CIRCUIT_FAILURE_THRESHOLD):
+            assert await silent.read_registers(REG_WORK_MODE, 1) is None
+            # Gesunder Slave auf demselben Socket, ohne Neuaufbau
+            assert await healthy.read_registers(REG_WORK_MODE, 1) is not None
+        assert connection.metrics.connects == 1
+        assert connection.metrics.retries == 0
+        assert connection.unit_breaker(2).state == CircuitBreaker.OPEN
+        assert connection.unit_breaker(1).state == CircuitBreaker.CLOSED
+        assert connection.breaker.state == CircuitBreaker.CLOSED
+
+        # Offen: sofortiger Fehlschlag ohne Timeout, der Gateway bleibt nutzbar
+        skips = connection.metrics.backoff_skips
+        assert await silent.read_registers(REG_WORK_MODE, 1) is None
+        assert connection.metrics.backoff_skips == skips + 1
+        assert await healthy.read_blocks(BLOCKS)
+
+        simulator.chargers[2].offline = False
+        connection.unit_breaker(2).retry_at = 0.0
+        assert await silent.read_registers(REG_WORK_MODE, 1) is not None
+        assert connection.unit_breaker(2).state == CircuitBreaker.CLOSED
+        assert connection.metrics.as_dict()["unit_circuits"] == {"1": "closed", "2": "closed"}
+    finally:
+        await connection.close()
+        await simulator.stop()
+
+
+async def test_silent_socket_is_reopened() -> None:
+    simulator = ChargerSimulator("127.0.0.1", 0, slave_ids=[1], tick=3600)
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1, read_timeout=0.2)
+    simulator.chargers[1].offline = True
+    try:
+        # Keine einzige Antwort auf dem Socket: ab SILENT_TIMEOUTS_CLOSE neu verbinden
+        for _ in range(modbus_client.SILENT_TIMEOUTS_CLOSE):
+            assert await client.read_registers(REG_WORK_MODE, 1) is None
+        assert client._connection._writer is None
+        assert client.metrics.connects == 1
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_heartbeat_keeps_idle_socket_open(
+    simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Maßstab 1:100 – Idle-Poll (60 s) liegt hinter der Reconnect-Schwelle (50 s)
+    monkeypatch.setattr(modbus_client, "IDLE_HEARTBEAT_AFTER", 0.4)
+    monkeypatch.setattr(modbus_client, "IDLE_RECONNECT_AFTER", 0.5)
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    try:
+        for _ in range(3):
+            assert await client.read_registers(REG_WORK_MODE, 1) is not None
+            await asyncio.sleep(0.6)
+        assert client.metrics.connects == 1
+        assert simulator.requests >= 5   # 3 Polls + Heartbeats dazwischen
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+    assert client._connection._heartbeat is None
+
+
+# ── Schreiben ─────────────────────────────────────────────────────────────────
+
+def test_write_runs_skip_reserved() -> None:
+    values = list(range(100, 112))
+    runs = _FoxESSModbusProtocol._write_runs(REG_WORK_MODE, values)
+    assert runs == [(REG_WORK_MODE, values[:7]), (REG_AUTO_PHASE_SWITCH, values[10:])]
+    assert _FoxESSModbusProtocol._write_runs(0x3008, [1]) == []
+
+
+async def test_write_registers_split_at_reserved(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    charger = simulator.chargers[1]
+    # 0x3000–0x300B; die Werte für 0x3007–0x3009 dürfen nicht ankommen
+    values = [0, 200, 110, 30, 10, 45, 80, 0xDEAD, 0xDEAD, 0xDEAD, 1, 15]
+    try:
+        assert await client.write_registers(REG_WORK_MODE, values)
+        assert simulator.requests == 2
+        assert charger.regs[REG_MAX_CHARGING_CURRENT] == 200
+        assert charger.regs[REG_DEFAULT_CURRENT] == 80
+        assert charger.regs[REG_AUTO_PHASE_SWITCH] == 1
+        assert charger.regs[REG_MIN_SWITCH_INTERVAL] == 15
+        assert all(charger.regs.get(address, 0) != 0xDEAD for address in RESERVED_REGISTERS)
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+async def test_write_registers_stops_at_first_failure(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    client = FoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    charger = simulator.chargers[1]
+    values = [0, 999, 110, 30, 10, 45, 80, 0, 0, 0, 1, 15]   # 99.9 A: außerhalb 6–32 A
+    try:
+        assert not await asyncio.to_thread(client.write_registers, REG_WORK_MODE, values)
+        assert simulator.requests == 1
+        assert charger.regs[REG_AUTO_PHASE_SWITCH] == 0
+    finally:
+        await asyncio.to_thread(client.disconnect)
+        await simulator.stop()
@@ -0,0 +1,165 @@
+"""Register map tests: table consistency, read planner and block decoders."""
+from __future__ import annotations
+
+import struct
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.foxess_charger.const import (
+    DOMAIN, REG_AMBIENT_TEMP, REG_DEVICE_ADDRESS, REG_L1_VOLTAGE, REG_PORT_TEMP,
+    REG_RFID_CARD, REG_STOP_REASON, REG_TOTAL_ENERGY, REG_WORK_MODE,
+)
+from custom_components.foxess_charger.modbus_client import AsyncFoxESSModbusClient
+from custom_components.foxess_charger.registers import (
+    ACCESS_WRITE, ALL_TIERS, MAX_READ_GAP, READ_PLAN, REGISTER_MAP, REGISTERS,
+    TIER_CONFIG, TIER_KEYS, TIER_LIVE, TIER_STATIC,
+    WRITE_ONLY_REGISTERS, ReadBlock, RegisterDef, plan_reads, read_plan,
+)
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+# ── Registertabelle ───────────────────────────────────────────────────────────
+
+def test_register_table_is_consistent() -> None:
+    assert len(REGISTER_MAP) == len(REGISTERS)
+    covered = [a for reg in REGISTERS for a in range(reg.address, reg.end)]
+    assert len(covered) == len(set(covered))   # keine Überlappung
+    for reg in REGISTERS:
+        assert (reg.tier is None) == (reg.access == ACCESS_WRITE), reg.key
+    assert set().union(*TIER_KEYS.values()) == {
+        reg.key for reg in REGISTERS if reg.tier is not None
+    }
+
+
+def test_register_conversions() -> None:
+    temp    = REGISTER_MAP["port_temp_raw"]
+    voltage = REGISTER_MAP["l1_voltage_raw"]
+    energy  = REGISTER_MAP["total_energy_raw"]
+    assert temp.to_ha(750) == 25.0
+    assert temp.to_ha(0xFFFF) is None and temp.to_ha(None) is None
+    assert temp.to_raw(25.0) == 750
+    assert voltage.to_ha(2305) == 230.5
+    assert energy.to_ha(123456) == 12345.6
+    assert REGISTER_MAP["status"].to_ha(3) == 3
+    assert REGISTER_MAP["max_charging_current_raw"].to_raw(13.2) == 132
+
+
+async def test_entities_follow_register_table(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    charger.regs[REG_PORT_TEMP]    = 812       # 31.2 °C
+    charger.regs[REG_AMBIENT_TEMP] = 0xFFFF    # Sentinel: kein Messwert
+    charger.regs[REG_L1_VOLTAGE]   = 2317
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry = await async_setup_charger(hass, simulator)
+            assert coordinator_of(hass, entry).data.keys() == {
+                reg.key for reg in REGISTERS if reg.tier is not None
+            }
+            registry = er.async_get(hass)
+
+            def state(platform: str, key: str) -> str:
+                entity_id = registry.async_get_entity_id(
+                    platform, DOMAIN, f"{entry.entry_id}_{key}",
+                )
+                return hass.states.get(entity_id).state
+
+            assert state("sensor", "port_temperature") == "31.2"
+            assert state("sensor", "ambient_temperature") == "unknown"
+            assert state("sensor", "l1_voltage") == "231.7"
+            assert state("number", "max_charging_current") == "16.0"
+    finally:
+        await simulator.stop()
+
+
+# ── Read-Planner ──────────────────────────────────────────────────────────────
+
+def test_plan_merges_small_gaps() -> None:
+    registers = [
+        RegisterDef("a", 0x10), RegisterDef("b", 0x11, width=2),
+        RegisterDef("c", 0x13 + MAX_READ_GAP),       # Lücke = MAX_READ_GAP → mitgelesen
+        RegisterDef("d", 0x20),                      # größere Lücke → eigener Block
+    ]
+    blocks = plan_reads(list(reversed(registers)))
+    assert [(block.address, block.count) for block in blocks] == [(0x10, 8), (0x20, 1)]
+    assert blocks[0].keys == ("a", "b", "c")
+
+
+def test_plan_respects_max_count() -> None:
+    registers = [RegisterDef(f"r{n}", 0x100 + n) for n in range(10)]
+    blocks = plan_reads(registers, max_count=4)
+    assert [(block.address, block.count) for block in blocks] == [
+        (0x100, 4), (0x104, 4), (0x108, 2),
+    ]
+
+
+def test_plan_per_tier() -> None:
+    assert [(b.address, b.count) for b in read_plan(frozenset({TIER_LIVE}))] == [
+        (REG_STOP_REASON, 28),
+    ]
+    assert [(b.address, b.count) for b in read_plan(frozenset({TIER_LIVE, TIER_STATIC}))] == [
+        (REG_DEVICE_ADDRESS, 30),
+    ]
+    assert [(b.address, b.count) for b in READ_PLAN] == [
+        (REG_DEVICE_ADDRESS, 30), (REG_WORK_MODE, 12),
+    ]
+    assert read_plan(ALL_TIERS) is READ_PLAN
+    # Write-Only Kommandos werden nie gepollt
+    assert not {
+        reg.address for block in READ_PLAN for reg in block.registers
+    } & WRITE_ONLY_REGISTERS
+    assert read_plan(frozenset({TIER_CONFIG}))[0].address == REG_WORK_MODE
+
+
+async def test_plan_reads_whole_map_in_two_requests(simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    try:
+        payloads = await client.read_blocks([(b.address, b.count) for b in READ_PLAN])
+        assert simulator.requests == len(READ_PLAN) == 2
+        assert all(payload is not None for payload in payloads)
+        # Reservierte Lücke 0x3007–0x3009 wird mitgelesen statt gesplittet
+        assert [len(payload) for payload in payloads] == [60, 24]
+    finally:
+        await client.disconnect()
+        await simulator.stop()
+
+
+# ── Block-Decoder ─────────────────────────────────────────────────────────────
+
+def test_decoder_skips_gaps_and_joins_uint32() -> None:
+    block = ReadBlock(0x10, 6, (
+        RegisterDef("a", 0x10), RegisterDef("b", 0x13), RegisterDef("c", 0x14, width=2),
+    ))
+    assert block.decoder.format == ">H4xHI"
+    payload = struct.pack(">6H", 7, 0xFFFF, 0xFFFF, 9, 0x0001, 0x0002)
+    assert block.decode(payload) == {"a": 7, "b": 9, "c": 0x00010002}
+    assert block.decode(memoryview(payload)) == block.decode(payload)
+
+
+async def test_decode_matches_register_values(simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    charger.plug_in(rfid=0x12345678)
+    charger._set_uint32(REG_TOTAL_ENERGY, 0x0001_86A0)   # 10000.0 kWh, High-Word ≠ 0
+    await simulator.start()
+    client = AsyncFoxESSModbusClient("127.0.0.1", simulator.port, 1)
+    try:
+        payloads = await client.read_blocks([(b.address, b.count) for b in READ_PLAN])
+        data: dict[str, int] = {}
+        for block, payload in zip(READ_PLAN, payloads):
+            data.update(block.decode(payload))
+
+        for block in READ_PLAN:
+            for reg in block.registers:
+                words = [charger.regs[reg.address + n] for n in range(reg.width)]
+                expected = words[0] if reg.width == 1 else words[0] << 16 | words[1]
+                assert data[reg.key] == expected, reg.key
+        assert data["total_energy_raw"] == 100000
+        assert data["rfid_card"] == 0x12345678 == (
+            charger.regs[REG_RFID_CARD] << 16 | charger.regs[REG_RFID_CARD + 1]
+        )
+    finally:
+        await client.disconnect()
+        await simulator.stop()
@@ -0,0 +1,72 @@
+"""Sensor tests: deadband filtering and the max_silence heartbeat."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.foxess_charger.const import CONF_MAX_SILENCE, DOMAIN, REG_L1_VOLTAGE
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+async def _voltage(hass, simulator: ChargerSimulator, **options):
+    """Coordinator und Abfrage des L1-Spannungssensors (Deadband 1 V)."""
+    entry     = await async_setup_charger(hass, simulator, **options)
+    registry  = er.async_get(hass)
+    entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{entry.entry_id}_l1_voltage")
+    return coordinator_of(hass, entry), lambda: hass.states.get(entity_id).state
+
+
+async def test_deadband_suppresses_small_changes(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, state = await _voltage(hass, simulator)
+            assert state() == "230.0"
+
+            charger.regs[REG_L1_VOLTAGE] = 2305   # +0.5 V: unter dem Deadband
+            await coordinator.async_refresh()
+            assert coordinator.data["l1_voltage_raw"] == 2305
+            assert state() == "230.0"
+
+            charger.regs[REG_L1_VOLTAGE] = 2312   # +1.2 V zum publizierten Wert
+            await coordinator.async_refresh()
+            assert state() == "231.2"
+
+            charger.regs[REG_L1_VOLTAGE] = 0      # Wechsel auf 0 immer publizieren
+            await coordinator.async_refresh()
+            assert state() == "0.0"
+    finally:
+        await simulator.stop()
+
+
+async def test_heartbeat_publishes_suppressed_value(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, state = await _voltage(hass, simulator, **{CONF_MAX_SILENCE: 0.3})
+            charger.regs[REG_L1_VOLTAGE] = 2304
+            await coordinator.async_refresh()
+            assert state() == "230.0"
+            # Kein weiterer Poll: der Timer publiziert den stehengebliebenen Wert
+            await asyncio.sleep(0.5)
+            assert state() == "230.4"
+    finally:
+        await simulator.stop()
+
+
+async def test_max_silence_zero_disables_deadband(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, state = await _voltage(hass, simulator, **{CONF_MAX_SILENCE: 0})
+            charger.regs[REG_L1_VOLTAGE] = 2301
+            await coordinator.async_refresh()
+            assert state() == "230.1"
+    finally:
+        await simulator.stop()
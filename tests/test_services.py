@@ -0,0 +1,111 @@
+"""Service tests: apply_profile writes only the requested registers."""
+from __future__ import annotations
+
+import pytest
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import device_registry as dr
+
+from custom_components.foxess_charger.const import (
+    DOMAIN, REG_AUTO_PHASE_SWITCH, REG_MAX_CHARGING_CURRENT, REG_MIN_SWITCH_INTERVAL,
+    REG_TIME_VALIDITY, REG_WORK_MODE,
+)
+from custom_components.foxess_charger.modbus_client import FC_WRITE_MULTIPLE
+from custom_components.foxess_charger.services import SERVICE_APPLY_PROFILE
+from custom_components.foxess_charger.simulator import EXC_SERVER_FAILURE, ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+def _record_writes(
+    simulator: ChargerSimulator, slave_id: int = 1,
+) -> list[tuple[int, int, list[int]]]:
+    """Protokolliert die Schreibzugriffe am simulierten Charger."""
+    charger = simulator.chargers[slave_id]
+    writes: list[tuple[int, int, list[int]]] = []
+    write = charger.write
+
+    def recorded(fc: int, address: int, values: list[int]) -> int | None:
+        writes.append((fc, address, list(values)))
+        return write(fc, address, values)
+
+    charger.write = recorded
+    return writes
+
+
+async def test_apply_profile_writes_given_fields(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    writes  = _record_writes(simulator)
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator = coordinator_of(hass, await async_setup_charger(hass, simulator))
+            # Am Gerät geändert, im Cache noch alt: darf nicht zurückgeschrieben werden
+            charger.regs[REG_TIME_VALIDITY] = 50
+            # Vorgemerkter Einzelwert geht vor dem Profil raus, das Profil gewinnt
+            coordinator.write_queue.async_enqueue(
+                REG_MAX_CHARGING_CURRENT, 130, "max_charging_current_raw",
+            )
+
+            await hass.services.async_call(DOMAIN, SERVICE_APPLY_PROFILE, {
+                "work_mode":            "Controlled",
+                "max_charging_current": 10,
+                "max_charging_power":   7.4,
+                "min_switch_interval":  10,
+            }, blocking=True)
+
+            assert writes == [
+                (FC_WRITE_MULTIPLE, REG_MAX_CHARGING_CURRENT, [130]),
+                (FC_WRITE_MULTIPLE, REG_WORK_MODE, [0, 100, 74]),
+                (FC_WRITE_MULTIPLE, REG_MIN_SWITCH_INTERVAL, [10]),
+            ]
+            assert charger.regs[REG_TIME_VALIDITY] == 50
+            assert coordinator.data["work_mode"] == 0
+            assert coordinator.data["max_charging_current_raw"] == 100
+            assert coordinator.data["min_switch_interval"] == 10
+    finally:
+        await simulator.stop()
+
+
+async def test_apply_profile_to_selected_device(ha) -> None:
+    simulator = ChargerSimulator("127.0.0.1", 0, slave_ids=[1, 2], tick=3600)
+    writes    = {slave_id: _record_writes(simulator, slave_id) for slave_id in (1, 2)}
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entries = [await async_setup_charger(hass, simulator, slave_id) for slave_id in (1, 2)]
+            device  = dr.async_get(hass).async_get_device({(DOMAIN, entries[1].entry_id)})
+
+            await hass.services.async_call(DOMAIN, SERVICE_APPLY_PROFILE, {
+                "device_id": device.id, "time_validity": 20,
+            }, blocking=True)
+            assert writes == {1: [], 2: [(FC_WRITE_MULTIPLE, REG_TIME_VALIDITY, [20])]}
+
+            await hass.services.async_call(
+                DOMAIN, SERVICE_APPLY_PROFILE, {"auto_phase_switch": True}, blocking=True,
+            )
+            # Ohne device_id: alle Charger
+            assert writes[1] == writes[2][1:] == [
+                (FC_WRITE_MULTIPLE, REG_AUTO_PHASE_SWITCH, [1]),
+            ]
+    finally:
+        await simulator.stop()
+
+
+async def test_apply_profile_errors(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry = await async_setup_charger(hass, simulator)
+            with pytest.raises(vol.Invalid):
+                await hass.services.async_call(DOMAIN, SERVICE_APPLY_PROFILE, {}, blocking=True)
+
+            charger.write = lambda fc, address, values: EXC_SERVER_FAILURE
+            with pytest.raises(HomeAssistantError, match=entry.title):
+                await hass.services.async_call(
+                    DOMAIN, SERVICE_APPLY_PROFILE, {"time_validity": 20}, blocking=True,
+                )
+    finally:
+        await simulator.stop()
@@ -0,0 +1,98 @@
+"""Session tracker tests: detection from polled data and persistence across restarts."""
+from __future__ import annotations
+
+from custom_components.foxess_charger.const import DOMAIN, REG_ACTIVE_POWER, REG_TOTAL_ENERGY
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+def _tracker(hass, entry):
+    return hass.data[DOMAIN][entry.entry_id]["sessions"]
+
+
+async def test_session_from_plug_in_to_stop(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    charger = simulator.chargers[1]
+    charger._set_uint32(REG_TOTAL_ENERGY, 120)   # 12.0 kWh
+    try:
+        async with ha() as hass:
+            entry       = await async_setup_charger(hass, simulator)
+            coordinator = coordinator_of(hass, entry)
+            tracker     = _tracker(hass, entry)
+            assert tracker.active is None
+
+            charger.plug_in(rfid=0x1234ABCD)
+            charger.regs[REG_ACTIVE_POWER] = 74   # 7.4 kW
+            await coordinator.async_refresh()
+            assert tracker.active is not None
+            assert tracker.active.rfid == 0x1234ABCD
+
+            charger._set_uint32(REG_TOTAL_ENERGY, 135)
+            charger.stop(reason=7)
+            await coordinator.async_refresh()
+            assert tracker.active is None
+            session = tracker.sessions[-1]
+            assert session.energy_wh == 1500
+            assert session.peak_w == 7400
+            assert session.stop_reason == 7
+            assert tracker.totals()[0x1234ABCD].sessions == 1
+    finally:
+        await simulator.stop()
+
+
+async def test_optimistic_switch_state_is_not_a_session_end(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry       = await async_setup_charger(hass, simulator)
+            coordinator = coordinator_of(hass, entry)
+            tracker     = _tracker(hass, entry)
+            simulator.chargers[1].plug_in()
+            await coordinator.async_refresh()
+            assert tracker.active is not None
+
+            await hass.services.async_call(
+                "switch", "turn_off", {"entity_id": "switch.foxess_charger_charging"},
+                blocking=True,
+            )
+            # Optimistisch "finished" – die Sitzung endet erst mit dem Poll
+            assert coordinator.data["status"] == 5
+            assert tracker.active is not None
+
+            await coordinator.async_refresh()
+            assert tracker.active is None
+            assert tracker.sessions[-1].stop_reason == 1   # command, vom Gerät gelesen
+    finally:
+        await simulator.stop()
+
+
+async def test_active_session_survives_restart(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    charger = simulator.chargers[1]
+    charger._set_uint32(REG_TOTAL_ENERGY, 120)
+    try:
+        # Beenden ohne Entladen: nur FINAL_WRITE sichert den Zustand
+        async with ha() as hass:
+            entry       = await async_setup_charger(hass, simulator)
+            coordinator = coordinator_of(hass, entry)
+            charger.plug_in()
+            await coordinator.async_refresh()
+            charger._set_uint32(REG_TOTAL_ENERGY, 125)
+            await coordinator.async_refresh()
+            started = _tracker(hass, entry).active.start
+
+        async with ha() as hass:
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            tracker = _tracker(hass, entry)
+            assert tracker.active is not None
+            assert tracker.active.start == started
+
+            charger._set_uint32(REG_TOTAL_ENERGY, 130)
+            charger.stop(reason=1)
+            await coordinator_of(hass, entry).async_refresh()
+            assert tracker.active is None
+            assert tracker.sessions[-1].energy_wh == 1000
+    finally:
+        await simulator.stop()
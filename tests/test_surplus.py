@@ -0,0 +1,113 @@
+"""Surplus controller tests: setpoints, ramp, hysteresis, phase switching and unload order."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from custom_components.foxess_charger.const import (
+    CONF_CONTROL_PERIOD, CONF_GRID_POWER_ENTITY, DOMAIN,
+    REG_AUTO_PHASE_SWITCH, REG_MAX_CHARGING_CURRENT, REG_PHASE_SEQUENCE,
+)
+from custom_components.foxess_charger.fleet import async_get_fleet
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+GRID = "sensor.grid_power"
+
+
+async def _setup(hass, simulator: ChargerSimulator, grid_w: float):
+    """Ladender Charger, Netzsensor mit `grid_w` (+ Bezug / − Einspeisung)."""
+    simulator.chargers[1].plug_in()
+    hass.states.async_set(GRID, str(grid_w), {"unit_of_measurement": "W"})
+    # Lange Regelperiode: Schritte nur über async_evaluate im Test
+    entry = await async_setup_charger(
+        hass, simulator, **{CONF_GRID_POWER_ENTITY: GRID, CONF_CONTROL_PERIOD: 60},
+    )
+    return entry, hass.data[DOMAIN][entry.entry_id]["surplus"]
+
+
+async def test_ramp_up_and_hysteresis(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    charger.regs[REG_AUTO_PHASE_SWITCH]    = 1    # Phasen entscheidet der Charger
+    charger.regs[REG_MAX_CHARGING_CURRENT] = 60   # 6.0 A
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            _entry, surplus = await _setup(hass, simulator, -10000)
+            # 10 kW Überschuss → 14.5 A, aufwärts höchstens +2 A je Periode
+            await surplus.async_evaluate()
+            assert charger.regs[REG_MAX_CHARGING_CURRENT] == 80
+            await surplus.async_evaluate()
+            assert charger.regs[REG_MAX_CHARGING_CURRENT] == 100
+
+            # 10.5 A Ziel: unter der Hysterese, kein Write
+            hass.states.async_set(GRID, str(-10.5 * 690), {"unit_of_measurement": "W"})
+            requests = simulator.requests
+            await surplus.async_evaluate()
+            assert charger.regs[REG_MAX_CHARGING_CURRENT] == 100
+            assert simulator.requests == requests
+
+            # Netzbezug: abwärts sofort, nie unter das Minimum
+            hass.states.async_set(GRID, "0.5", {"unit_of_measurement": "kW"})
+            await surplus.async_evaluate()
+            assert charger.regs[REG_MAX_CHARGING_CURRENT] == 60
+    finally:
+        await simulator.stop()
+
+
+async def test_switches_to_one_phase(ha, simulator: ChargerSimulator) -> None:
+    charger = simulator.chargers[1]
+    charger.regs[REG_MAX_CHARGING_CURRENT] = 160
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            _entry, surplus = await _setup(hass, simulator, -3000)
+            await hass.async_block_till_done()
+            # 3 kW reichen dreiphasig nicht für 6 A, einphasig für 13 A
+            await surplus.async_evaluate()
+            assert charger.regs[REG_PHASE_SEQUENCE] == 1
+            assert charger.regs[REG_MAX_CHARGING_CURRENT] == 130
+    finally:
+        await simulator.stop()
+
+
+async def test_unload_waits_for_running_step(
+    ha, simulator: ChargerSimulator, monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    simulator.chargers[1].regs[REG_AUTO_PHASE_SWITCH] = 1
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            entry, surplus = await _setup(hass, simulator, -10000)
+            coordinator = coordinator_of(hass, entry)
+            connection  = coordinator.client._connection
+            order: list[str] = []
+            release = asyncio.Event()
+            write   = coordinator.async_write_register
+            close   = connection.close
+
+            async def slow_write(*args, **kwargs) -> bool:
+                await release.wait()
+                order.append("write")
+                return await write(*args, **kwargs)
+
+            async def recorded_close() -> None:
+                order.append("close")
+                await close()
+
+            monkeypatch.setattr(coordinator, "async_write_register", slow_write)
+            monkeypatch.setattr(connection, "close", recorded_close)
+            step   = hass.async_create_task(surplus.async_evaluate())
+            unload = hass.async_create_task(hass.config_entries.async_unload(entry.entry_id))
+            await asyncio.sleep(0.05)
+            assert not unload.done()
+
+            release.set()
+            await step
+            assert await unload
+            assert order == ["write", "close"]
+            assert not async_get_fleet(hass)._gateways
+    finally:
+        await simulator.stop()
@@ -0,0 +1,90 @@
+"""Write queue tests: debouncing, coalescing into FC 0x10 runs and skipped no-ops."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.foxess_charger.const import (
+    DOMAIN, REG_MAX_CHARGING_CURRENT, REG_MAX_CHARGING_POWER, REG_TIME_VALIDITY,
+    WRITE_DEBOUNCE_DELAY,
+)
+from custom_components.foxess_charger.modbus_client import FC_WRITE_MULTIPLE
+from custom_components.foxess_charger.simulator import ChargerSimulator
+
+from common import async_setup_charger, coordinator_of
+
+
+async def _setup(hass, simulator: ChargerSimulator):
+    """Coordinator, Setter für Number-Entities und Liste der Writes am Simulator."""
+    charger = simulator.chargers[1]
+    writes: list[tuple[int, int, list[int]]] = []
+    write = charger.write
+
+    def recorded(fc: int, address: int, values: list[int]) -> int | None:
+        writes.append((fc, address, list(values)))
+        return write(fc, address, values)
+
+    charger.write = recorded
+    entry    = await async_setup_charger(hass, simulator)
+    registry = er.async_get(hass)
+
+    async def set_value(key: str, value: float) -> None:
+        entity_id = registry.async_get_entity_id("number", DOMAIN, f"{entry.entry_id}_{key}")
+        await hass.services.async_call(
+            "number", "set_value", {"entity_id": entity_id, "value": value}, blocking=True,
+        )
+
+    return coordinator_of(hass, entry), set_value, writes
+
+
+async def test_last_value_wins_after_debounce(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, set_value, writes = await _setup(hass, simulator)
+            for amps in (10, 12, 13.5):
+                await set_value("max_charging_current", amps)
+            assert not writes
+            # Optimistisch: die Entity zeigt den vorgemerkten Wert
+            assert coordinator.value("max_charging_current_raw") == 135
+
+            await asyncio.sleep(WRITE_DEBOUNCE_DELAY + 0.3)
+            assert writes == [(FC_WRITE_MULTIPLE, REG_MAX_CHARGING_CURRENT, [135])]
+            assert simulator.chargers[1].regs[REG_MAX_CHARGING_CURRENT] == 135
+            assert coordinator.data["max_charging_current_raw"] == 135
+    finally:
+        await simulator.stop()
+
+
+async def test_neighbours_coalesced_into_runs(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, set_value, writes = await _setup(hass, simulator)
+            await set_value("max_charging_power", 7.4)
+            await set_value("time_validity", 45)
+            await set_value("max_charging_current", 12)
+            await coordinator.write_queue.async_flush()
+            # 0x3001–0x3002 in einem Request, 0x3005 separat
+            assert writes == [
+                (FC_WRITE_MULTIPLE, REG_MAX_CHARGING_CURRENT, [120, 74]),
+                (FC_WRITE_MULTIPLE, REG_TIME_VALIDITY, [45]),
+            ]
+            assert simulator.chargers[1].regs[REG_MAX_CHARGING_POWER] == 74
+    finally:
+        await simulator.stop()
+
+
+async def test_unchanged_value_not_written(ha, simulator: ChargerSimulator) -> None:
+    await simulator.start()
+    try:
+        async with ha() as hass:
+            coordinator, set_value, writes = await _setup(hass, simulator)
+            await set_value("max_charging_current", 13)
+            await set_value("max_charging_current", 16)   # bestätigter Stand
+            await coordinator.write_queue.async_flush()
+            assert not writes
+            assert coordinator.write_queue.pending_value("max_charging_current_raw") is None
+    finally:
+        await simulator.stop()
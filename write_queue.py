@@ -0,0 +1,112 @@
+"""Debounced, coalescing write queue for the R/W registers of a FoxESS EV Charger."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import WRITE_DEBOUNCE_DELAY
+from .registers import contiguous_runs
+
+if TYPE_CHECKING:
+    from . import FoxESSChargerCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingWrite:
+    """Letzter noch nicht gesendeter Wert eines Registers."""
+
+    value:     int
+    data_key:  str
+    callbacks: list[CALLBACK_TYPE] = field(default_factory=list)
+
+
+class FoxESSWriteQueue:
+    """
+    Schreib-Queue für die R/W Register (0x3000–0x300B) eines Chargers.
+
+    Werte werden WRITE_DEBOUNCE_DELAY Sekunden gesammelt: pro Register gilt
+    nur der zuletzt gesetzte Wert, Werte gleich dem bestätigten Stand in
+    `coordinator.data` werden verworfen (außer dem Ladestrom im Controlled-
+    Modus, siehe `FoxESSKeepalive.renews_window`), und benachbarte Register gehen
+    zusammen in einem FC 0x10 Request raus. W-Only Kommandos (0x4000–0x4003)
+    laufen nicht über die Queue.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: FoxESSChargerCoordinator,
+                 delay: float = WRITE_DEBOUNCE_DELAY) -> None:
+        self._hass        = hass
+        self._coordinator = coordinator
+        self._delay       = delay
+        self._pending: dict[int, _PendingWrite] = {}   # Adresse → Wert
+        self._unsub: CALLBACK_TYPE | None = None
+
+    def pending_value(self, data_key: str) -> int | None:
+        """Noch nicht gesendeter Wert für `data_key` (für optimistische Anzeige)."""
+        for write in self._pending.values():
+            if write.data_key == data_key:
+                return write.value
+        return None
+
+    @callback
+    def async_enqueue(
+        self, address: int, value: int, data_key: str,
+        on_done: CALLBACK_TYPE | None = None,
+    ) -> None:
+        """
+        Merkt `value` für `address` vor. `on_done` wird nach dem Senden (oder
+        Verwerfen) aufgerufen, damit die Entity ihren Zustand aktualisiert.
+        """
+        write = self._pending.pop(address, None)
+        callbacks = write.callbacks if write else []
+        if on_done is not None:
+            callbacks.append(on_done)
+
+        if (
+            (self._coordinator.data or {}).get(data_key) == value
+            and not self._coordinator.keepalive.renews_window(address)
+        ):
+            _LOGGER.debug("Write 0x%04X = %d übersprungen (unverändert)", address, value)
+            for done in callbacks:
+                done()
+            return
+
+        self._pending[address] = _PendingWrite(value, data_key, callbacks)
+        if self._unsub is None:
+            self._unsub = async_call_later(self._hass, self._delay, self._async_flush_later)
+
+    async def _async_flush_later(self, _now: datetime) -> None:
+        self._unsub = None
+        await self.async_flush()
+
+    async def async_flush(self) -> None:
+        """Sendet alle vorgemerkten Werte sofort."""
+        self.async_cancel()
+        pending, self._pending = self._pending, {}
+        for run in contiguous_runs(pending):
+            writes = [pending[address] for address in run]
+            success = await self._coordinator.async_write_registers(
+                run[0],
+                [write.value for write in writes],
+                [write.data_key for write in writes],
+            )
+            if not success:
+                _LOGGER.error(
+                    "Write 0x%04X–0x%04X failed: %s",
+                    run[0], run[-1], [write.value for write in writes],
+                )
+            for write in writes:
+                for done in write.callbacks:
+                    done()
+
+    @callback
+    def async_cancel(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None